@@ -0,0 +1,6 @@
+"""Benchmarks of the realLoad routes against a local SQLite stand-in of the load DB.
+
+Run them with `python -m pahbar.prediction.services.load.api.realLoad.benchmarks --help`. Results are saved as
+JSON and compared against a stored baseline, so that a regression fails the run. `results/` holds reference runs,
+usable as `--baseline`.
+"""
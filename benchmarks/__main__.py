@@ -0,0 +1,275 @@
+import argparse
+import asyncio
+import contextlib
+import datetime
+import importlib
+import logging
+import os
+import platform
+import sys
+import tempfile
+from concurrent.futures import Executor, Future
+
+import numpy as np
+
+from .baseline import compareResults, loadResults, saveResults
+from .loadClients import driveMixed, driveRoute
+from .localDatabase import createLocalDatabase, databaseSize, installLocalDatabase, seedHourlyLoads
+from .microbenchmarks import dateConversionBenchmarks, fetchFormatBenchmarks, formatLoadsBenchmarks, ingestionBenchmarks
+from .startup import measureStartup
+from .workbooks import loadWorkbookBytes
+from .writeStalls import writeStallBenchmarks
+from .writeThroughput import writeThroughputBenchmarks
+
+ROUTE_MODULES = (
+    "route_fetchLoads", "route_nextDates", "route_lastAvailableDatetime", "route_defineLoadsAsExcel",
+    "route_exportLoads", "route_exportLoadsAsExcel", "route_loadRollups", "route_missingDates",
+    "route_interpolatedDates", "route_metrics",
+)
+
+EXPORT_YEARS = (1, 5, 10)
+"""Lengths of the workbook export scenarios, in years. The longest ones are only full if that many years are
+seeded."""
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def buildApp(metrics: bool):
+    """A FastAPI app with every realLoad route, where the location of a request is taken from its
+    `X-Benchmark-Location` header instead of from an authenticated user."""
+    from fastapi import FastAPI, Request
+
+    from ..instrumentation import InstrumentationMiddleware
+    from ..userLocation import getUserLocation
+
+    app = FastAPI()
+    for module_name in ROUTE_MODULES:
+        module = importlib.import_module(f"..{module_name}", __package__)
+        app.include_router(next(
+            value for name, value in vars(module).items() if name.startswith("route_realLoad_")))
+
+    async def benchmarkLocation(request: Request) -> int:
+        return int(request.headers.get("X-Benchmark-Location", "1"))
+
+    app.dependency_overrides[getUserLocation] = benchmarkLocation
+    if metrics:
+        app.add_middleware(InstrumentationMiddleware)
+
+    return app
+
+
+class EventLoopExecutor(Executor):
+    """Runs each call right away on the calling thread. Given to `runQuery`, it makes DB calls block the event
+    loop, as they did before they were moved to the DB thread pool."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+@contextlib.contextmanager
+def dbCallsOnEventLoop():
+    from .. import dbExecutor
+
+    executor = dbExecutor._DB_EXECUTOR
+    dbExecutor._DB_EXECUTOR = EventLoopExecutor()
+    try:
+        yield
+    finally:
+        dbExecutor._DB_EXECUTOR = executor
+
+
+def routeScenarios(args, end_date: datetime.date):
+    """Request factories of each route benchmark, by name, with the number of requests to send."""
+    from ..dateConversion import ordinalToJalaliDate
+    from ..tehranTime import TEHRAN_TZ
+
+    end_ordinal = end_date.toordinal() - 1
+    last_noon = TEHRAN_TZ.localize(datetime.datetime.combine(end_date, datetime.time(12))).timestamp() - 86400
+
+    def headers(client_id: int) -> dict:
+        return {"X-Benchmark-Location": str(client_id % args.locations + 1)}
+
+    def jalaliRange(days: int):
+        return {"from_date": ordinalToJalaliDate(end_ordinal - days + 1, "%Y/%m/%d"),
+                "to_date": ordinalToJalaliDate(end_ordinal, "%Y/%m/%d")}
+
+    def fetchLoads(response_format: str = "records", accept: str = "application/json"):
+        def request(i: int, client_id: int):
+            # A dashboard asking for a week, somewhere within the last two months
+            first_day = np.random.default_rng(i).integers(7, 60)
+            dates = [("dates", int(last_noon - (first_day - day) * 86400)) for day in range(7)]
+            return "GET", "/realLoad/fetchLoads", {
+                "params": dates + [("format", response_format)], "headers": {**headers(client_id), "Accept": accept}}
+        return request
+
+    def getRoute(url: str, params: dict = None):
+        return lambda i, client_id: ("GET", url, {"params": params or {}, "headers": headers(client_id)})
+
+    upload_from = end_ordinal - args.upload_days + 1
+    uploads = {
+        file_format: [loadWorkbookBytes(upload_from, args.upload_days, file_format, seed) for seed in range(4)]
+        for file_format in ("xlsx", "csv")}
+
+    def upload(file_format: str, streaming: bool = False):
+        media_type = EXCEL_MEDIA_TYPE if file_format == "xlsx" else "text/csv"
+
+        def request(i: int, client_id: int):
+            # Each upload differs from the previous one of its location, so that every day is written
+            content = uploads[file_format][i % len(uploads[file_format])]
+            return "POST", "/realLoad/defineLoadsAsExcel", {
+                "files": {"file": (f"loads.{file_format}", content, media_type)},
+                "params": {"streaming": streaming}, "headers": headers(client_id)}
+        return request
+
+    return {
+        "fetchLoads": (fetchLoads(), args.requests),
+        "fetchLoads.columnar": (fetchLoads("columnar"), args.requests),
+        "fetchLoads.float32": (fetchLoads("columnar", "application/octet-stream"), args.requests),
+        "nextDates": (getRoute("/realLoad/nextDates"), args.requests),
+        "lastAvailableDatetime": (getRoute("/realLoad/lastAvailableDatetime"), args.requests),
+        "loadRollups.monthly": (getRoute("/realLoad/loadRollups", {**jalaliRange(365), "period": "monthly"}),
+                                args.requests),
+        "missingDates": (getRoute("/realLoad/missingDates", jalaliRange(365)), args.requests),
+        "exportLoads.ndjson": (getRoute("/realLoad/exportLoads", jalaliRange(365)), args.upload_requests),
+        **{f"exportLoadsAsExcel.{years}y": (getRoute("/realLoad/exportLoadsAsExcel", jalaliRange(365 * years)),
+                                             args.upload_requests)
+           for years in EXPORT_YEARS},
+        "defineLoadsAsExcel.xlsx.bulk": (upload("xlsx"), args.upload_requests),
+        "defineLoadsAsExcel.csv.bulk": (upload("csv"), args.upload_requests),
+        "defineLoadsAsExcel.csv.streaming": (upload("csv", streaming=True), args.upload_requests),
+        "defineLoadsAsExcel.xlsx.perModel": (upload("xlsx"), args.upload_requests),
+    }
+
+
+def runBenchmarks(args) -> dict:
+    engine = createLocalDatabase(args.database)
+    metadata = installLocalDatabase(engine)
+
+    from ..bulkLoadWriter import REAL_HOURLY_LOAD_TABLE
+
+    end_date = datetime.date.today()
+    if not args.reuse_database:
+        rows = seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, args.locations, args.years, end_date)
+        logging.info(f"Seeded {rows} rows into {args.database}")
+    metadata.reflect(bind=engine)
+
+    from ..dailyRollups import createDailyRollupTable, rebuildDailyRollups
+    from .. import bulkLoadWriter
+
+    createDailyRollupTable(engine)
+    rebuildDailyRollups(range(1, args.locations + 1))
+
+    only = set(args.only.split(",")) if args.only else None
+    benchmarks = {}
+    if only is None or "startup" in only:
+        benchmarks["startup"] = measureStartup(args.database, args.clients, args.requests)
+        logging.info(f"startup: {benchmarks['startup']}")
+
+    app = buildApp(args.metrics)
+    scenarios = routeScenarios(args, end_date)
+    for name, (make_request, requests) in scenarios.items():
+        if only is not None and name not in only:
+            continue
+
+        bulk_write = bulkLoadWriter.BULK_WRITE_ENABLED
+        bulkLoadWriter.BULK_WRITE_ENABLED = not name.endswith(".perModel")
+        try:
+            benchmarks[name] = asyncio.run(driveRoute(app, make_request, args.clients, requests))
+        finally:
+            bulkLoadWriter.BULK_WRITE_ENABLED = bulk_write
+        logging.info(f"{name}: {benchmarks[name]}")
+
+    # Reads of fetchLoads while uploads are written, with the DB calls on the thread pool, then on the event loop.
+    # The response cache is off, so that every read reaches the DB.
+    from ..conditionalResponses import RESPONSE_CACHE
+
+    for name, on_event_loop in (("mixed.threadPool", False), ("mixed.eventLoop", True)):
+        if only is not None and name not in only:
+            continue
+
+        cache_enabled, RESPONSE_CACHE.enabled = RESPONSE_CACHE.enabled, False
+        try:
+            with dbCallsOnEventLoop() if on_event_loop else contextlib.nullcontext():
+                reads, writes = asyncio.run(driveMixed(
+                    app, scenarios["fetchLoads"][0], scenarios["defineLoadsAsExcel.xlsx.bulk"][0],
+                    args.clients, args.requests, 2, args.upload_requests))
+        finally:
+            RESPONSE_CACHE.enabled = cache_enabled
+        benchmarks[f"{name}.reads"], benchmarks[f"{name}.writes"] = reads, writes
+        logging.info(f"{name}: reads {reads}, writes {writes}")
+
+    if only is None or "write" in only:
+        from sqlalchemy import create_engine
+
+        benchmarks.update(writeThroughputBenchmarks(createLocalDatabase(f"{args.database}.write"), args.write_days))
+        if args.postgres_url:
+            benchmarks.update(writeThroughputBenchmarks(create_engine(args.postgres_url), args.write_days))
+
+    if only is None or "writeStall" in only:
+        benchmarks.update(writeStallBenchmarks(
+            engine, createLocalDatabase(f"{args.database}.stall"), args.write_days, args.clients, args.requests))
+
+    if only is None or "micro" in only:
+        benchmarks.update(dateConversionBenchmarks(args.micro_values))
+        benchmarks.update(ingestionBenchmarks(args.upload_days))
+        benchmarks.update(formatLoadsBenchmarks(args.micro_values // 24))
+        benchmarks.update(fetchFormatBenchmarks(args.micro_values // 24))
+
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(), "platform": platform.platform(),
+            "locations": args.locations, "years": args.years, "clients": args.clients,
+            "database_bytes": databaseSize(args.database),
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the realLoad routes against a local SQLite database.")
+    parser.add_argument("--database", default=os.path.join(tempfile.gettempdir(), "realLoad-benchmark.sqlite"),
+                        help="Path of the SQLite database")
+    parser.add_argument("--reuse-database", action="store_true", help="Don't seed the database again")
+    parser.add_argument("--locations", type=int, default=20, help="Number of locations to seed")
+    parser.add_argument("--years", type=float, default=max(EXPORT_YEARS),
+                        help="Years of hourly loads to seed per location")
+    parser.add_argument("--clients", type=int, default=16, help="Number of concurrent clients")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per read route")
+    parser.add_argument("--upload-requests", type=int, default=20, help="Requests per upload and export route")
+    parser.add_argument("--upload-days", type=int, default=365, help="Days per uploaded workbook")
+    parser.add_argument("--write-days", type=int, default=365, help="Days of loads per write throughput run")
+    parser.add_argument("--postgres-url", help="A scratch PostgreSQL database to also measure write throughput on; "
+                                               "its hourly table is dropped and recreated")
+    parser.add_argument("--micro-values", type=int, default=100000, help="Values per microbenchmark")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run; 'micro' for the microbenchmarks, "
+                                         "'startup' for the startup of a fresh worker, "
+                                         "'write' for the write throughput, "
+                                         "'writeStall' for reads while per-row writes run")
+    parser.add_argument("--metrics", action="store_true", help="Run with the instrumentation middleware")
+    parser.add_argument("--output", default="realLoad-benchmark.json", help="Where to save the results")
+    parser.add_argument("--baseline", help="Results to compare against; regressions fail the run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression, as a fraction")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = runBenchmarks(args)
+    saveResults(args.output, results)
+    logging.info(f"Saved the results to {args.output}")
+
+    if args.baseline:
+        regressions = compareResults(results, loadResults(args.baseline), args.tolerance)
+        for regression in regressions:
+            logging.error(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logging.info(f"No regression against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
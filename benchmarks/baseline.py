@@ -0,0 +1,39 @@
+import json
+
+from beartype.typing import Dict, List
+
+HIGHER_IS_BETTER = ("rps", "speedup", "insert_rows_per_second", "update_rows_per_second")
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "peak_rss_mb", "ns_per_value", "mean_response_bytes",
+                   "payload_bytes", "import_seconds", "engines_created", "open_connections")
+
+
+def saveResults(path: str, results: Dict):
+    with open(path, "w") as output:
+        json.dump(results, output, indent=2, sort_keys=True)
+
+
+def loadResults(path: str) -> Dict:
+    with open(path) as stored:
+        return json.load(stored)
+
+
+def compareResults(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of `results` against `baseline`, one line each: a higher-is-better metric that dropped, or a
+    lower-is-better one that grew, by more than `tolerance` (a fraction). Benchmarks missing on either side are
+    ignored."""
+    regressions = []
+    for name, metrics in results["benchmarks"].items():
+        base_metrics = baseline.get("benchmarks", {}).get(name)
+        if base_metrics is None:
+            continue
+
+        for metric, value in metrics.items():
+            base = base_metrics.get(metric)
+            if not isinstance(base, (int, float)) or not isinstance(value, (int, float)) or base <= 0:
+                continue
+            if metric in HIGHER_IS_BETTER and value < base * (1 - tolerance):
+                regressions.append(f"{name}: {metric} dropped from {base} to {value}")
+            elif metric in LOWER_IS_BETTER and value > base * (1 + tolerance):
+                regressions.append(f"{name}: {metric} grew from {base} to {value}")
+
+    return regressions
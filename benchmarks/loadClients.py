@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import os
+import resource
+import threading
+import time
+
+import httpx
+import numpy as np
+from beartype.typing import Any, Callable, Dict, List, Tuple
+
+Request = Tuple[str, str, Dict[str, Any]]
+"""Method, URL and keyword arguments of an `httpx` request."""
+
+RequestFactory = Callable[[int, int], Request]
+"""Builds request number `i` of client `client`."""
+
+
+class RssSampler:
+    """Samples the resident set size of this process in the background and keeps the peak. Falls back to the
+    lifetime peak of `getrusage` where /proc is not available."""
+
+    def __init__(self, interval_seconds: float = 0.005):
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+
+    def __enter__(self):
+        self.peak_bytes = currentRss()
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.peak_bytes = max(self.peak_bytes, currentRss())
+
+
+def currentRss() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def driveRoute(app, make_request: RequestFactory, clients: int, requests: int) -> Dict[str, float]:
+    """Send `requests` requests to the app in-process, from `clients` concurrent clients, and summarize them:
+    requests per second, latency percentiles, errors (4xx and 5xx statuses), peak RSS and response bytes."""
+    transport = httpx.ASGITransport(app=app)
+    latencies: List[float] = []
+    response_bytes: List[int] = []
+    errors = 0
+    counter = itertools.count()
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+        async def runClient(client_id: int):
+            nonlocal errors
+            while (i := next(counter)) < requests:
+                method, url, kwargs = make_request(i, client_id)
+                started = time.perf_counter()
+                response = await client.request(method, url, **kwargs)
+                latencies.append(time.perf_counter() - started)
+                response_bytes.append(len(response.content))
+                if response.status_code >= 400:
+                    errors += 1
+
+        with RssSampler() as rss:
+            started = time.perf_counter()
+            await asyncio.gather(*(runClient(client_id) for client_id in range(clients)))
+            elapsed = time.perf_counter() - started
+
+    return summarize(latencies, elapsed, errors, rss.peak_bytes, response_bytes)
+
+
+async def driveMixed(app, read: RequestFactory, write: RequestFactory, clients: int, requests: int,
+                     write_clients: int, write_requests: int) -> Tuple[Dict[str, float], Dict[str, float]]:
+    """Send reads and writes at the same time, from separate clients, and summarize each as `driveRoute` does.
+    The reads' latency percentiles show how much concurrent writes hold them up."""
+    reads, writes = await asyncio.gather(
+        driveRoute(app, read, clients, requests), driveRoute(app, write, write_clients, write_requests))
+    return reads, writes
+
+
+def summarize(latencies: List[float], elapsed: float, errors: int, peak_rss: int,
+              response_bytes: List[int]) -> Dict[str, float]:
+    latencies_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies) else (np.nan,) * 3
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "peak_rss_mb": round(peak_rss / 2 ** 20, 1),
+        "mean_response_bytes": round(float(np.mean(response_bytes)), 1) if response_bytes else 0.0,
+    }
@@ -0,0 +1,73 @@
+import datetime
+import logging
+import os
+
+import numpy as np
+from sqlalchemy import Column, DateTime, Float, Integer, MetaData, String, Table, create_engine
+from sqlalchemy.engine import Engine
+
+SEED_CHUNK_ROWS = 50000
+"""Rows inserted per executemany while seeding."""
+
+
+def createLocalDatabase(path: str) -> Engine:
+    """A SQLite engine on `path`, usable from the DB thread pool."""
+    return create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+
+
+def installLocalDatabase(engine: Engine) -> MetaData:
+    """Make realLoad run against the local database: its shared engine and metadata, and `DatabaseUtils` for
+    the modules outside of realLoad that create their own."""
+    from pahbar.prediction.services.util import DatabaseUtils
+    from ..dbProvider import useDatabase
+
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    DatabaseUtils.createEngine = lambda *args, **kwargs: engine
+    DatabaseUtils.createMetdata = lambda *args, **kwargs: metadata
+    useDatabase(engine, metadata)
+    return metadata
+
+
+def seedHourlyLoads(engine: Engine, table_name: str, locations: int, years: float, end_date: datetime.date,
+                    seed: int = 0) -> int:
+    """Create the hourly real load table and fill it with synthetic loads: a yearly and a daily cycle plus noise,
+    for locations 1 to `locations`, over the `years` before `end_date`. Returns the number of rows inserted."""
+    metadata = MetaData()
+    table = Table(
+        table_name, metadata,
+        Column("location", Integer, primary_key=True),
+        Column("datetime", DateTime, primary_key=True),
+        Column("load_MWh", Float, nullable=False),
+        Column("source", String(32)),
+    )
+    metadata.drop_all(engine, tables=[table])
+    metadata.create_all(engine, tables=[table])
+
+    hours = int(years * 365.25) * 24
+    first_hour = np.datetime64(end_date, "h") - np.timedelta64(hours, "h")
+    datetimes = first_hour + np.arange(hours).astype("timedelta64[h]")
+    day_of_year = (datetimes.astype("datetime64[D]") - datetimes.astype("datetime64[Y]")).astype(np.int64)
+    hour_of_day = np.arange(hours) % 24
+    shape = (1 + 0.25 * np.sin(2 * np.pi * (day_of_year - 100) / 365.25)) * \
+        (1 + 0.2 * np.sin(2 * np.pi * (hour_of_day - 9) / 24))
+    naive_datetimes = datetimes.astype(datetime.datetime).tolist()
+
+    generator = np.random.default_rng(seed)
+    inserted = 0
+    for location in range(1, locations + 1):
+        loads = np.round(500 + 40 * location * shape + generator.normal(0, 15, hours), 2)
+        with engine.begin() as connection:
+            for start in range(0, hours, SEED_CHUNK_ROWS):
+                connection.execute(table.insert(), [
+                    {"location": location, "datetime": moment, "load_MWh": load, "source": "measured"}
+                    for moment, load in zip(
+                        naive_datetimes[start:start + SEED_CHUNK_ROWS], loads[start:start + SEED_CHUNK_ROWS].tolist())])
+        inserted += hours
+        logging.info(f"Seeded {hours} hours of location {location}")
+
+    return inserted
+
+
+def databaseSize(path: str) -> int:
+    return os.path.getsize(path) if os.path.exists(path) else 0
@@ -0,0 +1,137 @@
+import datetime
+import time
+from types import SimpleNamespace
+
+import jdatetime
+import numpy as np
+import pandas as pd
+from beartype.typing import Callable, Dict
+
+from ..dateConversion import _EPOCH_ORDINAL, jalaliDatesToOrdinals, ordinalsToJalaliDates
+from ..loadFrames import DATE_COLUMN, HOUR_COLUMNS, sheetToLoadFrame
+
+
+def timePerValue(func: Callable[[], object], values: int, repeat: int = 3) -> float:
+    """Best-of-`repeat` time of `func`, in nanoseconds per value processed."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1e9 / values
+
+
+def dateConversionBenchmarks(values: int) -> Dict[str, Dict[str, float]]:
+    """The lookup-table conversions of `dateConversion` against one jdatetime call per value, both ways."""
+    generator = np.random.default_rng(0)
+    ordinals = generator.integers(datetime.date(2000, 1, 1).toordinal(), datetime.date(2030, 1, 1).toordinal(), values)
+    dates = ordinalsToJalaliDates(ordinals)
+    dates_list, ordinals_list = dates.tolist(), ordinals.tolist()
+
+    def jdatetimeToOrdinals():
+        return [jdatetime.date(*map(int, date.split("-"))).togregorian().toordinal() for date in dates_list]
+
+    def jdatetimeToDates():
+        return [jdatetime.date.fromgregorian(date=datetime.date.fromordinal(ordinal)).strftime("%Y-%m-%d")
+                for ordinal in ordinals_list]
+
+    results = {}
+    for name, fast, slow in (
+            ("jalaliToGregorian", lambda: jalaliDatesToOrdinals(dates), jdatetimeToOrdinals),
+            ("gregorianToJalali", lambda: ordinalsToJalaliDates(ordinals), jdatetimeToDates)):
+        fast_ns, slow_ns = timePerValue(fast, values), timePerValue(slow, values, repeat=1)
+        results[f"dateConversion.{name}"] = {
+            "ns_per_value": round(fast_ns, 1), "jdatetime_ns_per_value": round(slow_ns, 1),
+            "speedup": round(slow_ns / fast_ns, 1)}
+
+    return results
+
+
+def ingestionBenchmarks(days: int) -> Dict[str, Dict[str, float]]:
+    """The conversion of an uploaded sheet into hourly loads: the row-by-row loop `defineLoadsAsExcel` used to
+    run against `sheetToLoadFrame`. Model construction, which only the per-model write path does, is left out of
+    both."""
+    from .workbooks import syntheticDayLoads
+
+    first_ordinal = datetime.date(2023, 3, 21).toordinal()
+    sheet = pd.DataFrame(syntheticDayLoads(days), columns=HOUR_COLUMNS)
+    sheet.insert(0, DATE_COLUMN, ordinalsToJalaliDates(np.arange(first_ordinal, first_ordinal + days)))
+
+    def rowByRow():
+        loads = []
+        for _, row in sheet.iterrows():
+            date = str(row[DATE_COLUMN])
+            for hour in range(0, 24):
+                load = row[f"H{hour}"]
+                if pd.isna(load):
+                    continue
+                loads.append((f"{date} {datetime.time(hour=hour).strftime('%H:%M:%S')}", float(load)))
+        return loads
+
+    hours = days * 24
+    row_ns, vectorized_ns = timePerValue(rowByRow, hours, repeat=1), timePerValue(lambda: sheetToLoadFrame(sheet), hours)
+    return {
+        "ingestion.rowByRow": {"ns_per_value": round(row_ns, 1)},
+        "ingestion.vectorized": {"ns_per_value": round(vectorized_ns, 1), "speedup": round(row_ns / vectorized_ns, 1)},
+    }
+
+
+def formatLoadsBenchmarks(days: int) -> Dict[str, Dict[str, float]]:
+    """`format_loads` over DB-like records against `formatHourlyLoads` over the recent load store's arrays."""
+    from ..loadFormats import format_loads, formatHourlyLoads
+
+    from_hour, loads, present, records = _syntheticLoads(days)
+    return {
+        "formatLoads.records": {"ns_per_value": round(timePerValue(lambda: format_loads(records), len(records)), 1)},
+        "formatLoads.arrays": {"ns_per_value": round(
+            timePerValue(lambda: formatHourlyLoads(from_hour, loads, present), len(records)), 1)},
+    }
+
+
+def fetchFormatBenchmarks(days: int) -> Dict[str, Dict[str, float]]:
+    """The formats of `/realLoad/fetchLoads` built from the same DB-like records: the time to build and serialize
+    the payload, per hour, and its size. The records format is serialized as the route does, by FastAPI, and the
+    columnar one both with orjson, if installed, and with `json`."""
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse
+
+    from .. import loadFormats
+    from ..loadFormats import dayLoadMatrix, format_loads, serializeColumnar
+
+    from_hour, _, _, records = _syntheticLoads(days)
+    ordinals = (from_hour // 24 + _EPOCH_ORDINAL + np.arange(days)).tolist()
+    dates = ordinalsToJalaliDates(ordinals).tolist()
+
+    def jsonColumnar() -> bytes:
+        # The supported path, as on a server without orjson
+        encoder, loadFormats.orjson = loadFormats.orjson, None
+        try:
+            return serializeColumnar(dates, dayLoadMatrix(records, ordinals))
+        finally:
+            loadFormats.orjson = encoder
+
+    formats = {
+        "records": lambda: JSONResponse(content=jsonable_encoder(format_loads(records))).body,
+        "columnar": lambda: serializeColumnar(dates, dayLoadMatrix(records, ordinals)),
+        "columnar.json": jsonColumnar,
+        "float32": lambda: dayLoadMatrix(records, ordinals).astype("<f4").tobytes(),
+    }
+
+    return {
+        f"fetchLoadsFormat.{name}": {
+            "ns_per_value": round(timePerValue(serialize, len(records)), 1), "payload_bytes": len(serialize())}
+        for name, serialize in formats.items()}
+
+
+def _syntheticLoads(days: int):
+    """`days` days of random hourly loads from 2023-03-21 (1402/01/01) on: as the first hour, loads and presence mask of the
+    recent load store, and as DB-like records."""
+    from_hour = (datetime.date(2023, 3, 21).toordinal() - _EPOCH_ORDINAL) * 24
+    loads = np.random.default_rng(0).uniform(100, 1500, days * 24)
+    present = np.ones(days * 24, dtype=bool)
+    # Stored as naive local Gregorian datetimes, as the hourly table holds them
+    datetimes = (np.datetime64("1970-01-01T00", "h") + from_hour + np.arange(days * 24)).astype(datetime.datetime)
+    records = [
+        SimpleNamespace(datetime=moment, load_MWh=float(load))
+        for moment, load in zip(datetimes.tolist(), loads.tolist())]
+    return from_hour, loads, present, records
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from beartype.typing import Dict
+from sqlalchemy import MetaData
+
+from pahbar.prediction.services.util import DatabaseUtils
+from .loadClients import driveRoute
+from .localDatabase import createLocalDatabase
+
+
+def measureStartup(database: str, clients: int, requests: int) -> Dict[str, float]:
+    """Start realLoad in a fresh interpreter against the seeded local database, and report how long importing
+    its routes took, how many engines `DatabaseUtils` was asked for, and how many connections were open after
+    `requests` reads from `clients` concurrent clients."""
+    completed = subprocess.run(
+        [sys.executable, "-m", f"{__package__}.startup", database, str(clients), str(requests)],
+        capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def _startup(database: str, clients: int, requests: int) -> Dict[str, float]:
+    engine = createLocalDatabase(database)
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+
+    # The local database has one engine whatever is asked, so count the requests for one: each of them is a
+    # separate pool against the real DB
+    engines_created = 0
+
+    def createEngine(*args, **kwargs):
+        nonlocal engines_created
+        engines_created += 1
+        return engine
+
+    DatabaseUtils.createEngine = createEngine
+    DatabaseUtils.createMetdata = lambda *args, **kwargs: metadata
+
+    from .__main__ import buildApp
+
+    started = time.perf_counter()
+    app = buildApp(metrics=False)
+    import_seconds = time.perf_counter() - started
+    engines_on_import = engines_created
+
+    def lastAvailableDatetime(i: int, client_id: int):
+        return "GET", "/realLoad/lastAvailableDatetime", {"headers": {"X-Benchmark-Location": str(client_id + 1)}}
+
+    asyncio.run(driveRoute(app, lastAvailableDatetime, clients, requests))
+
+    from ..dbProvider import poolStatus
+
+    return {
+        "import_seconds": round(import_seconds, 3),
+        "engines_created_on_import": engines_on_import,
+        "engines_created": engines_created,
+        "open_connections": poolStatus().get("open", 0),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(_startup(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))))
@@ -0,0 +1,40 @@
+import csv
+import io
+
+import numpy as np
+import openpyxl
+
+from ..dateConversion import ordinalsToJalaliDates
+from ..loadFrames import DATE_COLUMN, HOUR_COLUMNS
+
+
+def syntheticDayLoads(days: int, seed: int = 0) -> np.ndarray:
+    """A day x 24 matrix of plausible hourly loads."""
+    generator = np.random.default_rng(seed)
+    daily_cycle = 1 + 0.2 * np.sin(2 * np.pi * (np.arange(24) - 9) / 24)
+    return np.round(800 * daily_cycle + generator.normal(0, 20, (days, 24)), 2)
+
+
+def loadWorkbookBytes(from_ordinal: int, days: int, file_format: str = "xlsx", seed: int = 0) -> bytes:
+    """An upload for `/realLoad/defineLoadsAsExcel`, in the layout it reads: a date column plus H0 to H23, one
+    row per day from `from_ordinal` on. `file_format` is 'xlsx' or 'csv'."""
+    dates = ordinalsToJalaliDates(np.arange(from_ordinal, from_ordinal + days)).tolist()
+    loads = syntheticDayLoads(days, seed).tolist()
+
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([DATE_COLUMN, *HOUR_COLUMNS])
+        for date, day_loads in zip(dates, loads):
+            writer.writerow([date, *day_loads])
+        return buffer.getvalue().encode("utf-8")
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([DATE_COLUMN, *HOUR_COLUMNS])
+    for date, day_loads in zip(dates, loads):
+        sheet.append([date, *day_loads])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,84 @@
+import asyncio
+import datetime
+import time
+
+import numpy as np
+from beartype.typing import Dict
+from sqlalchemy import MetaData, select
+from sqlalchemy.engine import Engine
+
+from ..bulkLoadWriter import REAL_HOURLY_LOAD_TABLE, RealLoadBulkWriter
+from ..dailyRollups import createDailyRollupTable
+from ..dateConversion import ordinalsToJalaliDates
+from ..dbExecutor import runQuery
+from ..loadFrames import dayLoadsToFrame
+from .loadClients import summarize
+from .localDatabase import seedHourlyLoads
+from .workbooks import syntheticDayLoads
+
+
+def writeStallBenchmarks(read_engine: Engine, write_engine: Engine, days: int, readers: int,
+                         reads: int) -> Dict[str, Dict[str, float]]:
+    """Latency of one-day reads on the DB thread pool, from `readers` concurrent readers, while `days` days of
+    loads are written over and over, one row per statement as `writeLoadsToDB` sends them. The write is either
+    called straight from the event loop, as uploads used to await `writeLoadsToDB`, or run through `runQuery`.
+    Reads and writes go to separate databases, so that only the event loop is shared. `write_engine` is meant for
+    a scratch database: its hourly table is recreated empty first."""
+    seedHourlyLoads(write_engine, REAL_HOURLY_LOAD_TABLE, 0, 0, datetime.date.today())
+    createDailyRollupTable(write_engine)
+    write_metadata = MetaData()
+    write_metadata.reflect(bind=write_engine)
+    read_metadata = MetaData()
+    read_metadata.reflect(bind=read_engine)
+    hourly = read_metadata.tables[REAL_HOURLY_LOAD_TABLE]
+
+    first_ordinal = datetime.date(2023, 3, 21).toordinal()
+    dates = ordinalsToJalaliDates(np.arange(first_ordinal, first_ordinal + days))
+    load_frame = dayLoadsToFrame(dates, syntheticDayLoads(days)).assign(source="measured")
+
+    with read_engine.connect() as connection:
+        last = connection.execute(select(hourly.c["datetime"]).order_by(hourly.c["datetime"].desc()).limit(1)).scalar()
+    day_query = (
+        select(hourly.c["datetime"], hourly.c["load_MWh"])
+        .where(hourly.c["location"] == 1)
+        .where(hourly.c["datetime"] >= last - datetime.timedelta(days=1)))
+
+    def readDay() -> list:
+        with read_engine.connect() as connection:
+            return connection.execute(day_query).all()
+
+    def writeLoads():
+        with RealLoadBulkWriter(write_engine, write_metadata, chunk_size=1) as writer:
+            writer.write(1, load_frame)
+
+    async def measure(on_event_loop: bool) -> Dict[str, float]:
+        latencies = []
+        done = asyncio.Event()
+
+        async def read():
+            for _ in range(reads // readers):
+                started = time.perf_counter()
+                await runQuery(readDay)
+                latencies.append(time.perf_counter() - started)
+
+        async def write():
+            while not done.is_set():
+                if on_event_loop:
+                    writeLoads()
+                    await asyncio.sleep(0)
+                else:
+                    await runQuery(writeLoads)
+
+        writer = asyncio.create_task(write())
+        started = time.perf_counter()
+        await asyncio.gather(*(read() for _ in range(readers)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await writer
+        return summarize(latencies, elapsed, 0, 0, [])
+
+    return {
+        f"writeStall.{name}.reads": {
+            metric: value for metric, value in asyncio.run(measure(on_event_loop)).items()
+            if metric in ("requests", "rps", "p50_ms", "p95_ms", "p99_ms")}
+        for name, on_event_loop in (("eventLoop", True), ("threadPool", False))}
@@ -0,0 +1,41 @@
+import datetime
+import time
+
+import numpy as np
+from beartype.typing import Dict
+from sqlalchemy import MetaData
+from sqlalchemy.engine import Engine
+
+from ..bulkLoadWriter import BULK_CHUNK_SIZE, REAL_HOURLY_LOAD_TABLE, RealLoadBulkWriter
+from ..dailyRollups import createDailyRollupTable
+from ..dateConversion import ordinalsToJalaliDates
+from ..loadFrames import dayLoadsToFrame
+from .localDatabase import seedHourlyLoads
+from .workbooks import syntheticDayLoads
+
+
+def writeThroughputBenchmarks(engine: Engine, days: int) -> Dict[str, Dict[str, float]]:
+    """Rows per second `RealLoadBulkWriter` writes into the hourly table, with its multi-row chunks and with one row
+    per statement, as a per-model write path sends them. Each variant first inserts `days` days of new loads,
+    then writes them again over the stored ones, with the daily rollups refreshed in the same transaction as in
+    production. Meant for a scratch database: its hourly table is recreated empty first."""
+    seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, 0, 0, datetime.date.today())
+    createDailyRollupTable(engine)
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+
+    first_ordinal = datetime.date(2023, 3, 21).toordinal()
+    dates = ordinalsToJalaliDates(np.arange(first_ordinal, first_ordinal + days))
+    load_frame = dayLoadsToFrame(dates, syntheticDayLoads(days)).assign(source="measured")
+
+    results = {}
+    for location, (name, chunk_size) in enumerate((("bulk", BULK_CHUNK_SIZE), ("perRow", 1)), 1):
+        rates = {}
+        for write in ("insert", "update"):
+            started = time.perf_counter()
+            with RealLoadBulkWriter(engine, metadata, chunk_size=chunk_size) as writer:
+                writer.write(location, load_frame)
+            rates[f"{write}_rows_per_second"] = round(len(load_frame) / (time.perf_counter() - started), 1)
+        results[f"write.{engine.dialect.name}.{name}"] = rates
+
+    return results
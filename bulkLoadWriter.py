@@ -0,0 +1,181 @@
+import logging
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype.typing import Optional
+from sqlalchemy import Table
+from sqlalchemy.engine import Connection, Engine
+
+from .dateConversion import jalaliDatetimesToGregorian
+from .dbProvider import getEngine, getMetadata
+from .loadWriteEvents import notifyLoadsWritten, notifyTransaction
+
+REAL_HOURLY_LOAD_TABLE = os.getenv("REALLOAD_HOURLY_TABLE", "real_hourly_load")
+"""Name of the hourly real load table, keyed by (location, datetime)."""
+
+BULK_WRITE_ENABLED = os.getenv("REALLOAD_BULK_WRITE", "0") == "1"
+"""Whether uploads are written through `RealLoadBulkWriter` instead of `writeLoadsToDB`. Off by default, as the
+bulk writer upserts straight into `REAL_HOURLY_LOAD_TABLE` and skips the bookkeeping of `writeLoadsToDB`, such
+as the first and last dates of `RealLoadDatesQueries`. Only turn it on with REALLOAD_BULK_WRITE=1 where that
+table is the one `writeLoadsToDB` writes to and its bookkeeping is kept up to date some other way."""
+
+BULK_DIALECTS = ("postgresql", "sqlite")
+"""Dialects with the `INSERT ... ON CONFLICT DO UPDATE` the bulk writer needs."""
+
+BULK_CHUNK_SIZE = int(os.getenv("REALLOAD_BULK_CHUNK_SIZE", "5000"))
+"""Number of rows sent per multi-row upsert."""
+
+
+def bulkWriteEnabled() -> bool:
+    """Whether to write uploads through `RealLoadBulkWriter`: when `BULK_WRITE_ENABLED`, on a DB whose dialect
+    it supports. Otherwise they go through `writeLoadsToDB`."""
+    return BULK_WRITE_ENABLED and getEngine().dialect.name in BULK_DIALECTS
+
+
+class RealLoadBulkWriter:
+    """Writes columnar batches of hourly real loads with chunked, multi-row upserts (`INSERT ... ON CONFLICT DO
+    UPDATE`), all inside one transaction. The transaction is committed when the context exits cleanly and rolled
+    back otherwise. Transaction listeners run right before the commit, and write listeners once it's done:
+
+        with RealLoadBulkWriter(getEngine(), getMetadata()) as writer:
+            writer.write(location, batch)
+
+    With a `replace_source`, a row that already exists is only overwritten when its source is that one, so that,
+    for instance, interpolated loads never replace measured ones. The listeners are then only told about the rows
+    that were actually written.
+    """
+
+    def __init__(
+            self, engine: Engine, metadata, chunk_size: int = BULK_CHUNK_SIZE, replace_source: Optional[str] = None):
+        self._engine = engine
+        self._table: Table = metadata.tables[REAL_HOURLY_LOAD_TABLE]
+        self._chunk_size = chunk_size
+        self._replace_source = replace_source
+        self._connection = None
+        self._transaction = None
+        self._started_at = None
+        self._written = {}
+        self.rows_written = 0
+
+    def __enter__(self):
+        self._connection = self._engine.connect()
+        self._transaction = self._connection.begin()
+        self._started_at = time.perf_counter()
+        self._written = {}
+        self.rows_written = 0
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        written = {location: pd.concat(frames, ignore_index=True) for location, frames in self._written.items()}
+        self._written = {}
+        try:
+            if exc_type is None:
+                try:
+                    for location, frame in written.items():
+                        notifyTransaction(self._connection, location, frame)
+                except Exception:
+                    self._transaction.rollback()
+                    raise
+
+                self._transaction.commit()
+                logging.info(
+                    f"Bulk wrote {self.rows_written} real loads at {self.rowsPerSecond():.0f} rows/s")
+            else:
+                self._transaction.rollback()
+        finally:
+            self._connection.close()
+            self._connection = self._transaction = None
+
+        if exc_type is None:
+            for location, frame in written.items():
+                notifyLoadsWritten(location, frame)
+
+    @property
+    def connection(self) -> Connection:
+        """The connection of the open transaction, to read what it has written so far without taking a second
+        connection from the pool."""
+        return self._connection
+
+    def rowsPerSecond(self) -> float:
+        elapsed = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        return self.rows_written / elapsed if elapsed > 0 else 0.0
+
+    def write(self, location: int, batch: pd.DataFrame) -> int:
+        """Upsert a batch with 'datetime' (Jalali '%Y-%m-%d %H:%M:%S'), 'load_MWh' and 'source' columns for this
+        location. Returns the number of rows written, which leaves out the rows kept by `replace_source`.
+
+        Raises:
+            ValueError: If a datetime of the batch is malformed.
+        """
+        return int(self.writeMask(location, batch).sum())
+
+    def writeMask(self, location: int, batch: pd.DataFrame) -> np.ndarray:
+        """Like `write`, but returns a boolean mask of the rows of the batch that were actually written.
+
+        Raises:
+            ValueError: If a datetime of the batch is malformed.
+        """
+        datetimes = jalaliDatetimesToGregorian(batch["datetime"].to_numpy())
+        loads = batch["load_MWh"].to_numpy(dtype=float)
+        sources = batch["source"].to_numpy(dtype=object)
+
+        statement = self._upsertStatement()
+        returned = []
+        for start in range(0, len(batch), self._chunk_size):
+            stop = start + self._chunk_size
+            rows = [
+                {"location": location, "datetime": datetime, "load_MWh": load, "source": source}
+                for datetime, load, source in zip(
+                    datetimes[start:stop].astype("datetime64[us]").tolist(),
+                    loads[start:stop].tolist(),
+                    sources[start:stop].tolist())]
+            result = self._connection.execute(statement, rows)
+            if self._replace_source is not None:
+                returned.extend(row.datetime for row in result)
+
+        written = np.ones(len(batch), dtype=bool)
+        if self._replace_source is not None:
+            written = np.isin(
+                datetimes.astype("datetime64[us]"), np.array(returned, dtype="datetime64[us]"))
+        self.rows_written += int(written.sum())
+
+        # Kept compact, to notify the write listeners once committed
+        self._written.setdefault(location, []).append(
+            pd.DataFrame({"datetime": datetimes[written], "load_MWh": loads[written], "source": sources[written]}))
+
+        return written
+
+    def _upsertStatement(self):
+        """Raises:
+            NotImplementedError: On a dialect out of `BULK_DIALECTS`. Check `bulkWriteEnabled` first.
+        """
+        dialect = self._engine.dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"Bulk upserts are not supported on '{dialect}'.")
+
+        statement = insert(self._table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[self._table.c["location"], self._table.c["datetime"]],
+            set_={
+                "load_MWh": statement.excluded["load_MWh"],
+                "source": statement.excluded["source"]},
+            where=None if self._replace_source is None else self._table.c["source"] == self._replace_source)
+        if self._replace_source is not None:
+            # Skipped conflicts return nothing, which tells the written rows apart
+            statement = statement.returning(self._table.c["datetime"])
+        return statement
+
+
+@beartype
+def writeLoadFrameToDB(location: int, batch: pd.DataFrame) -> int:
+    """Write a whole columnar batch of real loads for this location in one transaction. Returns the number of
+    rows written."""
+    with RealLoadBulkWriter(getEngine(), getMetadata()) as writer:
+        return writer.write(location, batch)
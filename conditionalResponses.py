@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from beartype.typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from .instrumentation import phase
+from .loadWriteEvents import addWriteListener
+
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("REALLOAD_RESPONSE_CACHE_TTL", "300"))
+"""Lifetime of a cached body. Writes made by other processes only reach this process's cache once it expires."""
+
+
+class LoadVersions:
+    """A per-location version, bumped by every real load write of this process. Only compared within the
+    process, to tell whether a write landed while a body was being built."""
+
+    def __init__(self):
+        self._versions: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def version(self, location: int) -> int:
+        with self._lock:
+            return self._versions.get(location, 0)
+
+    def bump(self, location: int):
+        with self._lock:
+            self._versions[location] = self._versions.get(location, 0) + 1
+
+
+class ResponseCache:
+    """Serialized bodies and their ETags by location and request parameters, at most `maxsize` per location and
+    `max_locations` locations, least recently used first out. A location's bodies are dropped whenever its loads
+    are written by this process, and expire after `ttl_seconds`."""
+
+    def __init__(self, maxsize: int = 32, max_locations: int = 256, ttl_seconds: float = 300.0,
+                 enabled: bool = True):
+        self.maxsize = maxsize
+        self.max_locations = max_locations
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, OrderedDict[str, Tuple[str, bytes, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, location: int, params: str) -> Optional[Tuple[str, bytes]]:
+        """The ETag and body cached for these parameters, unless missing or expired."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(location, {}).get(params)
+            if entry is None or entry[2] < time.monotonic():
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._entries.move_to_end(location)
+            self._entries[location].move_to_end(params)
+            return entry[0], entry[1]
+
+    def put(self, location: int, params: str, etag: str, body: bytes, version: int):
+        """Cache a body built from the data of `version`, unless the location was written since."""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if LOAD_VERSIONS.version(location) != version:
+                return
+
+            bodies = self._entries.setdefault(location, OrderedDict())
+            bodies[params] = (etag, body, time.monotonic() + self.ttl_seconds)
+            bodies.move_to_end(params)
+            self._entries.move_to_end(location)
+            while len(bodies) > self.maxsize:
+                bodies.popitem(last=False)
+            while len(self._entries) > self.max_locations:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, location: Optional[int] = None):
+        with self._lock:
+            if location is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(location, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses,
+                "size": sum(len(bodies) for bodies in self._entries.values()),
+                "bytes": sum(len(entry[1]) for bodies in self._entries.values() for entry in bodies.values())}
+
+
+LOAD_VERSIONS = LoadVersions()
+
+RESPONSE_CACHE = ResponseCache(
+    maxsize=int(os.getenv("REALLOAD_RESPONSE_CACHE_SIZE", "32")),
+    max_locations=int(os.getenv("REALLOAD_RESPONSE_CACHE_LOCATIONS", "256")),
+    ttl_seconds=RESPONSE_CACHE_TTL_SECONDS,
+    enabled=os.getenv("REALLOAD_RESPONSE_CACHE", "1") != "0")
+"""Shared by the real load read routes."""
+
+
+def makeETag(body: bytes) -> str:
+    """A strong ETag of a response body. Derived from the data alone, so that every worker hands out the same ETag
+    for the same loads."""
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+async def conditionalJSONResponse(
+        request: Request, location: int, params: str, produce: Callable[[], Awaitable[Any]],
+        serialize: Optional[Callable[[Any], bytes]] = None, media_type: str = "application/json",
+        headers: Optional[Dict[str, str]] = None) -> Response:
+    """Answer a read route with the ETag of its body. A body cached for the same parameters is used as is; only
+    otherwise is `produce` awaited for the payload, which is then serialized and cached. A matching
+    `If-None-Match` then gets a bare 304. As the ETag is a digest of the body, it holds across workers and
+    restarts, and a 304 from a cache miss still saves sending the body.
+
+    Args:
+        request (Request): The incoming request, for its `If-None-Match` header.
+        location (int): Location whose loads the payload is made of.
+        params (str): Every request parameter the payload depends on, as one string.
+        produce (Callable[[], Awaitable[Any]]): Builds the payload, such as by querying the DB.
+        serialize (Optional[Callable[[Any], bytes]]): Turns the payload into the body. FastAPI's JSON encoding
+            by default.
+        media_type (str): Media type of the body.
+        headers (Optional[Dict[str, str]]): Further headers of the response, which must only depend on `params`.
+
+    Raises:
+        Exception: Whatever `produce` raises.
+    """
+    cached = RESPONSE_CACHE.get(location, params)
+    if cached is None:
+        # Taken before the payload is built, so that a body built while a write lands is not cached
+        version = LOAD_VERSIONS.version(location)
+        payload = await produce()
+        with phase("serialization"):
+            body = serialize(payload) if serialize else JSONResponse(content=jsonable_encoder(payload)).body
+            etag = makeETag(body)
+        RESPONSE_CACHE.put(location, params, etag, body, version)
+    else:
+        etag, body = cached
+    headers = {**(headers or {}), "ETag": etag}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    matching_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if etag in matching_tags or "*" in matching_tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+@addWriteListener
+def _bumpWrittenLocation(location: int, written: pd.DataFrame):
+    LOAD_VERSIONS.bump(location)
+    RESPONSE_CACHE.invalidate(location)
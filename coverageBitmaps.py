@@ -0,0 +1,84 @@
+import time
+
+import numpy as np
+from beartype.typing import Optional
+
+
+class LocationCoverage:
+    """Which hours of a location have a load, and which of those were interpolated, as two bitmaps of one bit
+    per local hour. Bit `i` stands for hour `origin + i`, counted in hours since the epoch."""
+
+    def __init__(self):
+        self.origin: Optional[int] = None
+        self.first_hour: Optional[int] = None
+        self.last_hour: Optional[int] = None
+        self.present = np.zeros(0, dtype=np.uint8)
+        self.interpolated = np.zeros(0, dtype=np.uint8)
+        self.built_at = time.monotonic()
+
+    def mark(self, hours: np.ndarray, interpolated: np.ndarray):
+        """Mark these hours as present, and as interpolated or measured according to the `interpolated` mask."""
+        if not len(hours):
+            return
+
+        low_hour, high_hour = int(hours.min()), int(hours.max())
+        self._reserve(low_hour, high_hour)
+        self.first_hour = low_hour if self.first_hour is None else min(self.first_hour, low_hour)
+        self.last_hour = high_hour if self.last_hour is None else max(self.last_hour, high_hour)
+        offsets = hours - self.origin
+        _setBits(self.present, offsets)
+        _setBits(self.interpolated, offsets[interpolated])
+        _clearBits(self.interpolated, offsets[~interpolated])
+
+    def presentHours(self, from_hour: int, to_hour: int) -> np.ndarray:
+        """Boolean mask of the hours in [from_hour, to_hour) that have a load."""
+        return self._slice(self.present, from_hour, to_hour)
+
+    def interpolatedHours(self, from_hour: int, to_hour: int) -> np.ndarray:
+        """Boolean mask of the hours in [from_hour, to_hour) whose load was interpolated."""
+        return self._slice(self.interpolated, from_hour, to_hour)
+
+    def nbytes(self) -> int:
+        return self.present.nbytes + self.interpolated.nbytes
+
+    def _slice(self, bits: np.ndarray, from_hour: int, to_hour: int) -> np.ndarray:
+        mask = np.zeros(max(to_hour - from_hour, 0), dtype=bool)
+        if self.origin is None:
+            return mask
+
+        low = max(from_hour, self.origin) - self.origin
+        high = min(to_hour, self.origin + len(bits) * 8) - self.origin
+        if low < high:
+            unpacked = np.unpackbits(bits[low // 8:(high + 7) // 8])
+            start = low - (low // 8) * 8
+            mask[low + self.origin - from_hour:high + self.origin - from_hour] = unpacked[start:start + high - low]
+
+        return mask
+
+    def _reserve(self, low_hour: int, high_hour: int):
+        """Grow the bitmaps to cover [low_hour, high_hour]. The origin is kept at a day start, so that shifting it
+        always moves whole bytes."""
+        if self.origin is None:
+            self.origin = low_hour - low_hour % 24
+
+        if low_hour < self.origin:
+            new_origin = low_hour - low_hour % 24
+            padding = np.zeros((self.origin - new_origin) // 8, dtype=np.uint8)
+            self.present = np.concatenate([padding, self.present])
+            self.interpolated = np.concatenate([padding, self.interpolated])
+            self.origin = new_origin
+
+        needed = (high_hour - self.origin) // 8 + 1
+        if needed > len(self.present):
+            # Leave room for about a year of further writes
+            padding = np.zeros(needed - len(self.present) + 365 * 3, dtype=np.uint8)
+            self.present = np.concatenate([self.present, padding])
+            self.interpolated = np.concatenate([self.interpolated, padding])
+
+
+def _setBits(bits: np.ndarray, offsets: np.ndarray):
+    np.bitwise_or.at(bits, offsets >> 3, np.right_shift(0x80, offsets & 7).astype(np.uint8))
+
+
+def _clearBits(bits: np.ndarray, offsets: np.ndarray):
+    np.bitwise_and.at(bits, offsets >> 3, ~np.right_shift(0x80, offsets & 7).astype(np.uint8))
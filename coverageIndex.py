@@ -0,0 +1,153 @@
+import datetime
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytz
+from beartype.typing import Dict, List, Optional
+
+from .coverageBitmaps import LocationCoverage
+from .dateBoundsCache import getDateBounds
+from .dbProvider import getEngine, getMetadata
+from .loadRecords import hourlyRecords
+from .loadWriteEvents import addWriteListener
+from ...db.load import RealHourlyLoadQueries
+
+INTERPOLATED_SOURCE = "interpolated"
+"""The `source` of loads that were filled in by interpolation, rather than measured."""
+
+COVERAGE_REBUILD_SECONDS = float(os.getenv("REALLOAD_COVERAGE_REBUILD_SECONDS", "60"))
+"""Age after which the coverage of a location is rebuilt from the DB, which bounds how long a write that didn't
+notify, such as one from another process, goes unseen."""
+
+_IRAN_TZ = pytz.timezone('Asia/Tehran')
+
+
+class CoverageIndex:
+    """Per-location hourly coverage, built from the DB on first use and then kept up to date by every real load
+    write, so that gap queries never touch the load table."""
+
+    def __init__(self, rebuild_seconds: float = COVERAGE_REBUILD_SECONDS):
+        self.rebuild_seconds = rebuild_seconds
+        self._coverages: Dict[int, LocationCoverage] = {}
+        self._pending_writes: Dict[int, List[pd.DataFrame]] = {}
+        self._build_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def missingDays(self, location: int, from_ordinal: int, to_ordinal: int) -> np.ndarray:
+        """Gregorian ordinals of the days in [from_ordinal, to_ordinal] with at least one hour of missing load.
+
+        Only the days between the first and the last day that have a load are considered, so the days before the
+        location's data starts and after its latest load are never reported, and a location without any load has
+        no missing days.
+        """
+        coverage = self._coverage(location)
+        with self._lock:
+            if coverage.first_hour is None:
+                return np.zeros(0, dtype=np.int64)
+            from_ordinal = max(from_ordinal, _hourOrdinal(coverage.first_hour))
+            to_ordinal = min(to_ordinal, _hourOrdinal(coverage.last_hour))
+            if to_ordinal < from_ordinal:
+                return np.zeros(0, dtype=np.int64)
+
+            from_hour, to_hour = _dayHours(from_ordinal), _dayHours(to_ordinal + 1)
+            present = coverage.presentHours(from_hour, to_hour)
+
+        missing_days = ~present.reshape(-1, 24).all(axis=1)
+        return np.flatnonzero(missing_days) + from_ordinal
+
+    def interpolatedHours(self, location: int, from_ordinal: int, to_ordinal: int) -> np.ndarray:
+        """Local hours since the epoch, within days [from_ordinal, to_ordinal], whose load was interpolated."""
+        from_hour, to_hour = _dayHours(from_ordinal), _dayHours(to_ordinal + 1)
+        coverage = self._coverage(location)
+        with self._lock:
+            interpolated = coverage.interpolatedHours(from_hour, to_hour)
+
+        return np.flatnonzero(interpolated) + from_hour
+
+    def invalidate(self, location: Optional[int] = None):
+        with self._lock:
+            if location is None:
+                self._coverages.clear()
+            else:
+                self._coverages.pop(location, None)
+
+    def onWrite(self, location: int, written: pd.DataFrame):
+        with self._lock:
+            if location in self._pending_writes:
+                self._pending_writes[location].append(written)
+
+            coverage = self._coverages.get(location)
+            if coverage is not None:
+                _markWritten(coverage, written)
+
+    def _coverage(self, location: int) -> LocationCoverage:
+        """Return the coverage of this location, building it from the DB if needed. Only one thread builds a
+        given location at a time, and writes that land meanwhile are replayed on top of the result."""
+        with self._lock:
+            coverage = self._coverages.get(location)
+            if coverage is not None and time.monotonic() - coverage.built_at < self.rebuild_seconds:
+                return coverage
+            build_lock = self._build_locks.setdefault(location, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                coverage = self._coverages.get(location)
+                if coverage is not None and time.monotonic() - coverage.built_at < self.rebuild_seconds:
+                    return coverage
+                self._pending_writes[location] = []
+
+            try:
+                coverage = _buildCoverage(location)
+            except Exception:
+                with self._lock:
+                    self._pending_writes.pop(location, None)
+                raise
+
+            with self._lock:
+                for written in self._pending_writes.pop(location):
+                    _markWritten(coverage, written)
+                self._coverages[location] = coverage
+
+            return coverage
+
+
+def _buildCoverage(location: int) -> LocationCoverage:
+    coverage = LocationCoverage()
+    disco_dates = getDateBounds(location)
+    if disco_dates is None:
+        return coverage
+
+    first_date, last_date = disco_dates.first_date, disco_dates.last_date
+    from_datetime = _IRAN_TZ.localize(datetime.datetime(first_date.year, first_date.month, first_date.day))
+    to_datetime = _IRAN_TZ.localize(
+        datetime.datetime(last_date.year, last_date.month, last_date.day, 23, 59, 59, 999999))
+    with RealHourlyLoadQueries(getEngine(), getMetadata()) as q:
+        db_records = q.selectByDate(location, from_datetime, to_datetime) or []
+
+    hours, _, sources = hourlyRecords(db_records)
+    coverage.mark(hours, sources == INTERPOLATED_SOURCE)
+    return coverage
+
+
+def _markWritten(coverage: LocationCoverage, written: pd.DataFrame):
+    hours = written["datetime"].to_numpy().astype("datetime64[h]").astype(np.int64)
+    coverage.mark(hours, written["source"].to_numpy(dtype=object) == INTERPOLATED_SOURCE)
+
+
+def _dayHours(ordinal: int) -> int:
+    """Local hours since the epoch at the start of this day."""
+    return (ordinal - datetime.date(1970, 1, 1).toordinal()) * 24
+
+
+def _hourOrdinal(hour: int) -> int:
+    """Gregorian ordinal of the day of this local hour since the epoch."""
+    return hour // 24 + datetime.date(1970, 1, 1).toordinal()
+
+
+COVERAGE_INDEX = CoverageIndex()
+"""Shared by the gap endpoints and kept up to date by every real load write."""
+
+addWriteListener(COVERAGE_INDEX.onWrite)
@@ -0,0 +1,166 @@
+import argparse
+import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+from beartype import beartype
+from beartype.typing import Iterable, Optional
+from sqlalchemy import Column, Date, Float, Integer, MetaData, SmallInteger, Table, delete, func, select
+from sqlalchemy.engine import Connection, Engine
+
+from .bulkLoadWriter import REAL_HOURLY_LOAD_TABLE
+from .dbProvider import getEngine, getMetadata
+from .loadWriteEvents import addTransactionListener
+
+ROLLUP_METADATA = MetaData()
+
+DAILY_ROLLUP_TABLE = Table(
+    "real_load_daily_rollup", ROLLUP_METADATA,
+    Column("location", Integer, primary_key=True),
+    Column("date", Date, primary_key=True),
+    Column("energy_MWh", Float, nullable=False),
+    Column("peak_MW", Float, nullable=False),
+    Column("valley_MW", Float, nullable=False),
+    Column("peak_hour", SmallInteger, nullable=False),
+    Column("hours_present", SmallInteger, nullable=False),
+)
+"""One row per location and local Gregorian day, maintained in the same transaction as each bulk real load write.
+The table isn't created at runtime: apply `schema/real_load_daily_rollup.sql` (or run this module's `create`
+command) before deploying, then `rebuild` it."""
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def dailyStats(hours: np.ndarray, loads: np.ndarray) -> pd.DataFrame:
+    """Aggregate hourly loads (with local hours since the epoch) into one row per day: its ordinal, the energy,
+    peak and valley, the hour of the peak, and the number of hours present. Runs in a few vectorized passes."""
+    hours = np.asarray(hours, dtype=np.int64)
+    loads = np.asarray(loads, dtype=np.float64)
+    days = hours // 24
+
+    # Sorted by day, and by descending load within a day, the first row of each day is its peak
+    order = np.lexsort((-loads, days))
+    days, hours, loads = days[order], hours[order], loads[order]
+    starts = np.flatnonzero(np.r_[True, np.diff(days) != 0]) if len(days) else np.array([], dtype=np.int64)
+
+    return pd.DataFrame({
+        "ordinal": days[starts] + _EPOCH.toordinal(),
+        "energy_MWh": np.add.reduceat(loads, starts) if len(starts) else np.array([]),
+        "peak_MW": loads[starts],
+        "valley_MW": np.minimum.reduceat(loads, starts) if len(starts) else np.array([]),
+        "peak_hour": hours[starts] % 24,
+        "hours_present": np.diff(np.r_[starts, len(days)]),
+    })
+
+
+@beartype
+def refreshDailyRollups(connection: Connection, location: int, from_ordinal: int, to_ordinal: int):
+    """Recompute the rollups of days [from_ordinal, to_ordinal] of a location from the hourly table, within the
+    transaction of `connection`."""
+    hourly = getMetadata().tables[REAL_HOURLY_LOAD_TABLE]
+    from_date, to_date = datetime.date.fromordinal(from_ordinal), datetime.date.fromordinal(to_ordinal + 1)
+    rows = connection.execute(
+        select(hourly.c["datetime"], hourly.c["load_MWh"])
+        .where(hourly.c["location"] == location)
+        .where(hourly.c["datetime"] >= datetime.datetime.combine(from_date, datetime.time.min))
+        .where(hourly.c["datetime"] < datetime.datetime.combine(to_date, datetime.time.min))).all()
+
+    stats = dailyStats(
+        np.array([row[0] for row in rows], dtype="datetime64[h]").astype(np.int64),
+        np.array([row[1] for row in rows], dtype=float))
+
+    connection.execute(
+        delete(DAILY_ROLLUP_TABLE)
+        .where(DAILY_ROLLUP_TABLE.c["location"] == location)
+        .where(DAILY_ROLLUP_TABLE.c["date"] >= from_date)
+        .where(DAILY_ROLLUP_TABLE.c["date"] < to_date))
+    if len(stats):
+        connection.execute(DAILY_ROLLUP_TABLE.insert(), [
+            {"location": location, "date": datetime.date.fromordinal(int(row.ordinal)),
+             "energy_MWh": float(row.energy_MWh), "peak_MW": float(row.peak_MW), "valley_MW": float(row.valley_MW),
+             "peak_hour": int(row.peak_hour), "hours_present": int(row.hours_present)}
+            for row in stats.itertuples(index=False)])
+
+
+@beartype
+def selectDailyRollups(location: int, from_ordinal: int, to_ordinal: int) -> pd.DataFrame:
+    """The daily rollups of a location within days [from_ordinal, to_ordinal], in date order, as a frame with
+    the columns of `dailyStats`."""
+    with getEngine().connect() as connection:
+        rows = connection.execute(
+            select(DAILY_ROLLUP_TABLE)
+            .where(DAILY_ROLLUP_TABLE.c["location"] == location)
+            .where(DAILY_ROLLUP_TABLE.c["date"] >= datetime.date.fromordinal(from_ordinal))
+            .where(DAILY_ROLLUP_TABLE.c["date"] <= datetime.date.fromordinal(to_ordinal))
+            .order_by(DAILY_ROLLUP_TABLE.c["date"])).mappings().all()
+
+    return pd.DataFrame({
+        "ordinal": np.array([row["date"].toordinal() for row in rows], dtype=np.int64),
+        "energy_MWh": np.array([row["energy_MWh"] for row in rows], dtype=float),
+        "peak_MW": np.array([row["peak_MW"] for row in rows], dtype=float),
+        "valley_MW": np.array([row["valley_MW"] for row in rows], dtype=float),
+        "peak_hour": np.array([row["peak_hour"] for row in rows], dtype=np.int64),
+        "hours_present": np.array([row["hours_present"] for row in rows], dtype=np.int64),
+    })
+
+
+@beartype
+def rebuildDailyRollups(locations: Optional[Iterable[int]] = None, chunk_days: int = 366):
+    """Recompute every rollup from the hourly table, such as after a back-fill that bypassed the bulk writer.
+    Each location is rebuilt in chunks of `chunk_days`, one transaction per chunk."""
+    hourly = getMetadata().tables[REAL_HOURLY_LOAD_TABLE]
+    with getEngine().connect() as connection:
+        if locations is None:
+            locations = connection.execute(select(hourly.c["location"]).distinct()).scalars().all()
+
+    for location in locations:
+        with getEngine().connect() as connection:
+            first, last = connection.execute(
+                select(func.min(hourly.c["datetime"]), func.max(hourly.c["datetime"]))
+                .where(hourly.c["location"] == location)).one()
+        if first is None:
+            continue
+
+        for from_ordinal in range(first.toordinal(), last.toordinal() + 1, chunk_days):
+            with getEngine().begin() as connection:
+                refreshDailyRollups(
+                    connection, location, from_ordinal, min(from_ordinal + chunk_days - 1, last.toordinal()))
+        logging.info(f"Rebuilt the daily rollups of location {location}")
+
+
+@beartype
+def refreshWrittenRollups(location: int, written: pd.DataFrame):
+    """Refresh the rollups of written loads in a transaction of their own. Only for write paths that don't go
+    through `RealLoadBulkWriter`, such as `writeLoadsToDB`."""
+    with getEngine().begin() as connection:
+        _refreshWrittenDays(connection, location, written)
+
+
+@addTransactionListener
+def _refreshWrittenDays(connection: Connection, location: int, written: pd.DataFrame):
+    if not len(written):
+        return
+
+    days = written["datetime"].to_numpy().astype("datetime64[D]").astype(np.int64) + _EPOCH.toordinal()
+    refreshDailyRollups(connection, location, int(days.min()), int(days.max()))
+
+
+def createDailyRollupTable(engine: Optional[Engine] = None):
+    """Create the rollup table if it doesn't exist, as `schema/real_load_daily_rollup.sql` does. A setup step, for
+    databases without a migration run, such as local or benchmark ones; request paths never call it."""
+    with (engine or getEngine()).begin() as connection:
+        DAILY_ROLLUP_TABLE.create(connection, checkfirst=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or rebuild the daily real load rollups.")
+    parser.add_argument("command", choices=["create", "rebuild"])
+    parser.add_argument("--locations", type=int, nargs="*", help="Only rebuild these locations")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "create":
+        createDailyRollupTable()
+    else:
+        rebuildDailyRollups(args.locations or None)
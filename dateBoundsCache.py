@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+import pandas as pd
+from beartype import beartype
+from beartype.typing import Any, Dict, Optional
+
+from .dbProvider import getEngine, getMetadata
+from .instrumentation import phase
+from .loadWriteEvents import addWriteListener
+from ...db.load import RealLoadDatesQueries
+
+
+class DateBoundsCache:
+    """An in-process cache of the `first_date`/`last_date` row of each location, as read by
+    `RealLoadDatesQueries.select`. Entries are dropped whenever loads of their location are written in this
+    process. Writes made by other processes (other workers, or SQL run against the DB) are only picked up once the
+    entry expires, after `ttl_seconds`.
+
+    Each location has a generation, bumped by every invalidation. A DB read only fills the cache if the
+    generation didn't change while it was in flight, so that bounds read before a write can't be put back after
+    the write dropped them.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.db_reads = 0
+        self._entries: Dict[int, tuple] = {}
+        self._generations: Dict[int, int] = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+
+    def get(self, location: int) -> Optional[Any]:
+        """Return the date bounds of this location, from memory if possible. None means the location has no load.
+
+        Raises:
+            Exception: Whatever `RealLoadDatesQueries` raises on a DB read.
+        """
+        with self._lock:
+            entry = self._entries.get(location) if self.enabled else None
+            if entry is not None and entry[1] >= time.monotonic():
+                self.hits += 1
+                return entry[0]
+            generation = self._generation(location)
+
+        with phase("db_query"), RealLoadDatesQueries(getEngine(), getMetadata()) as q:
+            disco_dates = q.select(location)
+
+        with self._lock:
+            self.db_reads += 1
+            if self.enabled and self._generation(location) == generation:
+                self._entries[location] = (disco_dates, time.monotonic() + self.ttl_seconds)
+
+        return disco_dates
+
+    def invalidate(self, location: Optional[int] = None):
+        """Drop the entry of this location, or every entry if no location is given."""
+        with self._lock:
+            if location is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                self._entries.pop(location, None)
+                self._generations[location] = self._generations.get(location, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """`db_reads_avoided` is the number of requests served from memory."""
+        with self._lock:
+            return {"db_reads_avoided": self.hits, "db_reads": self.db_reads, "size": len(self._entries)}
+
+    def _generation(self, location: int) -> tuple:
+        return self._epoch, self._generations.get(location, 0)
+
+
+DATE_BOUNDS_CACHE = DateBoundsCache(
+    ttl_seconds=float(os.getenv("REALLOAD_DATE_BOUNDS_TTL", "60")),
+    enabled=os.getenv("REALLOAD_DATE_BOUNDS_CACHE", "1") != "0")
+"""Shared by `/realLoad/nextDates` and `/realLoad/lastAvailableDatetime`. With several workers, a write made by
+one of them reaches the others within REALLOAD_DATE_BOUNDS_TTL seconds (60 by default)."""
+
+
+@beartype
+def getDateBounds(location: int) -> Optional[Any]:
+    """The `RealLoadDatesQueries.select` row of this location, served from `DATE_BOUNDS_CACHE`."""
+    return DATE_BOUNDS_CACHE.get(location)
+
+
+@addWriteListener
+def _invalidateWrittenLocation(location: int, written: pd.DataFrame):
+    DATE_BOUNDS_CACHE.invalidate(location)
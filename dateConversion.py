@@ -0,0 +1,231 @@
+import datetime
+import re
+from functools import lru_cache
+
+import jdatetime
+import numpy as np
+from beartype.typing import Dict, Optional, Tuple
+
+JALALI_FIRST_YEAR = 1300
+JALALI_LAST_YEAR = 1500
+"""Jalali years covered by the lookup tables. Dates outside of them fall back to jdatetime."""
+
+_YEAR_STARTS = np.array([
+    jdatetime.date(year, 1, 1).togregorian().toordinal()
+    for year in range(JALALI_FIRST_YEAR, JALALI_LAST_YEAR + 2)], dtype=np.int64)
+"""Gregorian ordinal of the first day of each covered Jalali year, plus that of the year after the last one."""
+
+_MONTH_STARTS = np.array([0, 31, 62, 93, 124, 155, 186, 216, 246, 276, 306, 336], dtype=np.int64)
+"""Day of the year (from 0) on which each Jalali month starts. The first six months have 31 days, the next
+five 30, and Esfand has 29 or 30."""
+
+_EPOCH_ORDINAL = 719163
+"""Gregorian ordinal of 1970-01-01."""
+
+_FORMAT_FIELDS = {"%Y": 4, "%m": 2, "%d": 2, "%H": 2}
+"""Format directives the vectorized formatting supports, with their widths."""
+
+
+def jalaliPartsToOrdinals(years: np.ndarray, months: np.ndarray, days: np.ndarray) -> np.ndarray:
+    """Convert arrays of Jalali years, months and days to Gregorian proleptic ordinals (as in
+    `datetime.date.toordinal`), through the lookup tables.
+
+    Raises:
+        ValueError: If any of the dates is not a valid Jalali date.
+    """
+    years, months, days = (np.asarray(parts, dtype=np.int64) for parts in (years, months, days))
+    in_table = (years >= JALALI_FIRST_YEAR) & (years <= JALALI_LAST_YEAR)
+    year_index = np.clip(years - JALALI_FIRST_YEAR, 0, JALALI_LAST_YEAR - JALALI_FIRST_YEAR)
+    month_index = np.clip(months - 1, 0, 11)
+
+    esfand_days = _YEAR_STARTS[year_index + 1] - _YEAR_STARTS[year_index] - _MONTH_STARTS[11]
+    month_days = np.where(month_index < 6, 31, np.where(month_index < 11, 30, esfand_days))
+    valid = (months >= 1) & (months <= 12) & (days >= 1) & (days <= month_days)
+    if (in_table & ~valid).any():
+        invalid = np.flatnonzero(in_table & ~valid)[0]
+        raise ValueError(f"'{years[invalid]}-{months[invalid]}-{days[invalid]}' is not a valid Jalali date.")
+
+    ordinals = _YEAR_STARTS[year_index] + _MONTH_STARTS[month_index] + days - 1
+    for i in np.flatnonzero(~in_table):
+        ordinals[i] = _jalaliToOrdinal(int(years[i]), int(months[i]), int(days[i]))
+
+    return ordinals
+
+
+def ordinalsToJalaliParts(ordinals: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert an array of Gregorian proleptic ordinals to arrays of Jalali years, months and days, through the
+    lookup tables."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    year_index = np.clip(np.searchsorted(_YEAR_STARTS, ordinals, side="right") - 1, 0, len(_YEAR_STARTS) - 2)
+    day_of_year = ordinals - _YEAR_STARTS[year_index]
+    month_index = np.clip(np.searchsorted(_MONTH_STARTS, day_of_year, side="right") - 1, 0, 11)
+
+    years = year_index + JALALI_FIRST_YEAR
+    months = month_index + 1
+    days = day_of_year - _MONTH_STARTS[month_index] + 1
+
+    for i in np.flatnonzero((ordinals < _YEAR_STARTS[0]) | (ordinals >= _YEAR_STARTS[-1])):
+        years[i], months[i], days[i] = _ordinalToJalali(int(ordinals[i]))
+
+    return years, months, days
+
+
+def jalaliDatesToOrdinals(dates: np.ndarray) -> np.ndarray:
+    """Convert an array of Jalali '%Y-%m-%d' date strings to Gregorian proleptic ordinals. Zero-padded dates are
+    parsed straight from their code points; any other date is parsed once per distinct string.
+
+    Raises:
+        ValueError: If any of the strings is not a valid Jalali date.
+    """
+    return jalaliPartsToOrdinals(*_splitDates(np.asarray(dates, dtype=str)))
+
+
+def jalaliDatetimesToGregorian(datetimes: np.ndarray) -> np.ndarray:
+    """Convert an array of Jalali '%Y-%m-%d %H:%M:%S' strings to naive local Gregorian `datetime64[h]` values.
+    Minutes and seconds are ignored, as loads are hourly.
+
+    Raises:
+        ValueError: If any of the strings is not a valid Jalali datetime.
+    """
+    datetimes = np.ascontiguousarray(np.asarray(datetimes, dtype=str).astype("<U13"))
+    ordinals = jalaliDatesToOrdinals(datetimes.astype("<U10"))
+
+    # Read the two hour digits straight from the unicode code points
+    digits = datetimes.view(np.uint32).reshape(-1, 13)[:, 11:13].astype(np.int64) - ord("0")
+    if ((digits < 0) | (digits > 9)).any():
+        raise ValueError("The given datetimes are not in the proper '1401-01-23 12:00:00' format.")
+    hours = digits[:, 0] * 10 + digits[:, 1]
+
+    return (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]") + hours.astype("timedelta64[h]")
+
+
+def ordinalsToJalaliDates(ordinals: np.ndarray, date_format: str = "%Y-%m-%d") -> np.ndarray:
+    """Format an array of Gregorian proleptic ordinals as Jalali date strings. Formats made of %Y, %m and %d are
+    built straight as code points; any other format goes through jdatetime once per distinct day."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    years, months, days = ordinalsToJalaliParts(ordinals)
+    formatted = _formatFields({"%Y": years, "%m": months, "%d": days}, date_format, len(ordinals))
+    if formatted is not None:
+        return formatted
+
+    unique_ordinals, inverse = np.unique(ordinals, return_inverse=True)
+    unique_dates = np.array(
+        [ordinalToJalaliDate(int(ordinal), date_format) for ordinal in unique_ordinals], dtype=str)
+    return unique_dates[inverse] if len(unique_dates) else np.array([], dtype=str)
+
+
+def hoursToJalaliDatetimes(hours: np.ndarray) -> np.ndarray:
+    """Format an array of local hours since the epoch (`datetime64[h]` as integers) as Jalali
+    '%Y-%m-%d %H:%M:%S' strings."""
+    days, hour_of_day = np.divmod(np.asarray(hours, dtype=np.int64), 24)
+    years, months, days = ordinalsToJalaliParts(days + _EPOCH_ORDINAL)
+
+    return _formatFields(
+        {"%Y": years, "%m": months, "%d": days, "%H": hour_of_day}, "%Y-%m-%d %H:00:00", len(hour_of_day))
+
+
+@lru_cache(maxsize=4096)
+def jalaliDateToOrdinal(date: str) -> int:
+    """Convert a single Jalali date, as '%Y/%m/%d' or '%Y-%m-%d', to a Gregorian proleptic ordinal.
+
+    Raises:
+        ValueError: If the string is not a valid Jalali date.
+    """
+    year, month, day = _splitJalaliDate(date.strip().replace("/", "-"))
+    return int(jalaliPartsToOrdinals(np.array([year]), np.array([month]), np.array([day]))[0])
+
+
+@lru_cache(maxsize=4096)
+def ordinalToJalaliDate(ordinal: int, date_format: str = "%Y-%m-%d") -> str:
+    """Format a single Gregorian proleptic ordinal as a Jalali date string."""
+    return ordinalToJdate(ordinal).strftime(date_format)
+
+
+@lru_cache(maxsize=4096)
+def ordinalToJdate(ordinal: int) -> jdatetime.date:
+    """The `jdatetime.date` of a Gregorian proleptic ordinal, built from the lookup tables."""
+    years, months, days = ordinalsToJalaliParts(np.array([ordinal]))
+    return jdatetime.date(int(years[0]), int(months[0]), int(days[0]))
+
+
+@lru_cache(maxsize=1 << 16)
+def parseJalaliDatetime(text: str) -> Tuple[int, str]:
+    """Parse a single Jalali datetime, as '%Y/%m/%d %H:%M:%S' or '%Y-%m-%d %H:%M:%S'. Returns its Gregorian
+    proleptic ordinal and the datetime as zero-padded '%Y-%m-%d %H:%M:%S'.
+
+    Raises:
+        ValueError: If the string is not a valid Jalali datetime.
+    """
+    try:
+        date, time = text.strip().split(" ")
+        hour, minute, second = (int(part) for part in time.split(":"))
+    except ValueError:
+        raise ValueError(f"'{text}' is not a valid Jalali datetime.")
+    if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59):
+        raise ValueError(f"'{text}' is not a valid Jalali datetime.")
+
+    year, month, day = _splitJalaliDate(date.replace("/", "-"))
+    ordinal = int(jalaliPartsToOrdinals(np.array([year]), np.array([month]), np.array([day]))[0])
+    return ordinal, f"{year:04d}-{month:02d}-{day:02d} {hour:02d}:{minute:02d}:{second:02d}"
+
+
+def _splitDates(dates: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split an array of '%Y-%m-%d' strings into arrays of years, months and days."""
+    if dates.dtype.itemsize == 10 * 4:
+        codes = np.ascontiguousarray(dates).view(np.uint32).reshape(-1, 10).astype(np.int64)
+        digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]] - ord("0")
+        if ((digits >= 0) & (digits <= 9)).all() and (codes[:, [4, 7]] == ord("-")).all():
+            return (
+                digits[:, :4] @ np.array([1000, 100, 10, 1]),
+                digits[:, 4] * 10 + digits[:, 5],
+                digits[:, 6] * 10 + digits[:, 7])
+
+    unique_dates, inverse = np.unique(dates, return_inverse=True)
+    parts = np.array([_splitJalaliDate(date) for date in unique_dates], dtype=np.int64).reshape(-1, 3)[inverse]
+    return parts[:, 0], parts[:, 1], parts[:, 2]
+
+
+@lru_cache(maxsize=4096)
+def _splitJalaliDate(date: str) -> Tuple[int, int, int]:
+    try:
+        year, month, day = (int(part) for part in date.split("-"))
+    except ValueError:
+        raise ValueError(f"'{date}' is not a valid Jalali date.")
+    return year, month, day
+
+
+@lru_cache(maxsize=1024)
+def _jalaliToOrdinal(year: int, month: int, day: int) -> int:
+    """Conversion outside of the lookup tables."""
+    try:
+        return jdatetime.date(year, month, day).togregorian().toordinal()
+    except (TypeError, ValueError):
+        raise ValueError(f"'{year}-{month}-{day}' is not a valid Jalali date.")
+
+
+@lru_cache(maxsize=1024)
+def _ordinalToJalali(ordinal: int) -> Tuple[int, int, int]:
+    """Conversion outside of the lookup tables."""
+    date = jdatetime.date.fromgregorian(date=datetime.date.fromordinal(ordinal))
+    return date.year, date.month, date.day
+
+
+def _formatFields(fields: Dict[str, np.ndarray], date_format: str, count: int) -> Optional[np.ndarray]:
+    """Build the formatted strings as an array of code points, one column per character. Returns None if the
+    format has a directive other than those in `_FORMAT_FIELDS`."""
+    pieces = re.split(r"(%[YmdH])", date_format)
+    if any("%" in piece for piece in pieces[::2]) or any(piece not in fields for piece in pieces[1::2]):
+        return None
+
+    columns = []
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            values = fields[piece]
+            columns.extend(values // 10 ** power % 10 + ord("0") for power in reversed(range(_FORMAT_FIELDS[piece])))
+        else:
+            columns.extend(np.full(count, ord(char)) for char in piece)
+
+    if not columns:
+        return np.full(count, "")
+    codes = np.ascontiguousarray(np.stack(columns, axis=1), dtype=np.uint32)
+    return codes.view(f"<U{len(columns)}").reshape(count)
@@ -0,0 +1,72 @@
+import hashlib
+
+import numpy as np
+from beartype.typing import Dict, Optional
+from sqlalchemy.engine import Connection
+
+from .loadExport import iterDayLoads
+
+
+def hashDayLoads(loads: np.ndarray) -> np.ndarray:
+    """A 16 byte digest of each row of a day x 24 load matrix. Loads are rounded to 6 decimals and missing hours
+    are NaN, so that a day hashes the same whether it comes from a sheet or from the DB."""
+    # Adding 0.0 turns -0.0 into 0.0, and NaNs are rewritten to a single bit pattern
+    canonical = np.round(np.asarray(loads, dtype=np.float64), 6) + 0.0
+    canonical[np.isnan(canonical)] = np.nan
+    canonical = np.ascontiguousarray(canonical, dtype="<f8")
+    return np.array(
+        [hashlib.blake2b(row.tobytes(), digest_size=16).digest() for row in canonical], dtype="S16")
+
+
+EMPTY_DAY_DIGEST = hashDayLoads(np.full((1, 24), np.nan))[0]
+"""Digest of a day without any load."""
+
+
+def storedDayDigests(location: int, ordinals: np.ndarray, connection: Optional[Connection] = None) -> np.ndarray:
+    """The digests of the loads stored in the DB for these days (Gregorian ordinals) of this location, computed
+    from one range read, over `connection` if given. Nothing is kept between calls: another worker, or any write
+    that doesn't go through this process, may have changed a day since, so a digest is only trusted by the request
+    that read it."""
+    if not len(ordinals):
+        return np.zeros(0, dtype="S16")
+
+    read = {
+        ordinal: hashDayLoads(loads[np.newaxis])[0]
+        for _, ordinal, loads in iterDayLoads(
+            location, int(ordinals.min()), int(ordinals.max()), every_day=True, connection=connection)}
+    return np.array([read.get(int(ordinal), EMPTY_DAY_DIGEST) for ordinal in ordinals], dtype="S16")
+
+
+class DeltaFilter:
+    """Keeps only the days of an upload whose loads differ from what's stored, and counts changed, unchanged and
+    new days. Call it on each (ordinals, loads) block of the upload; the stored loads of each block are read from
+    the DB at that moment, over `connection` when it's set, such as the one of the writer streaming the upload, or
+    else over a pooled connection of their own:
+
+        delta = DeltaFilter(location)
+        load_frame = sheetToLoadFrame(df, day_filter=delta)
+        ... write load_frame ...
+    """
+
+    def __init__(self, location: int, connection: Optional[Connection] = None):
+        self.location = location
+        self.connection = connection
+        self.changed = 0
+        self.unchanged = 0
+        self.new = 0
+
+    def __call__(self, ordinals: np.ndarray, loads: np.ndarray) -> np.ndarray:
+        """Return the mask of days to write."""
+        uploaded = hashDayLoads(loads)
+        stored = storedDayDigests(self.location, ordinals, self.connection)
+        keep = uploaded != stored
+        new = keep & (stored == EMPTY_DAY_DIGEST)
+
+        self.new += int(new.sum())
+        self.changed += int((keep & ~new).sum())
+        self.unchanged += int((~keep).sum())
+        return keep
+
+    def counts(self) -> Dict[str, int]:
+        return {"changed": self.changed, "unchanged": self.unchanged, "new": self.new}
+
@@ -0,0 +1,24 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from beartype.typing import Any, Callable
+
+DB_MAX_THREADS = int(os.getenv("REALLOAD_DB_MAX_THREADS", "8"))
+"""Upper bound on the number of realLoad DB calls running at the same time in this worker."""
+
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=DB_MAX_THREADS, thread_name_prefix="realLoad-db")
+
+
+async def runQuery(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking, synchronous DB call (such as a `RealHourlyLoadQueries` session) on the realLoad DB
+    thread pool and await its result, so that the event loop keeps serving other requests meanwhile.
+
+    The pool is separate from the default threadpool of FastAPI. Once `DB_MAX_THREADS` calls are in flight,
+    further calls wait for a free thread instead of opening more connections.
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(_DB_EXECUTOR, call)
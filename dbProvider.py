@@ -0,0 +1,105 @@
+import os
+import threading
+
+from beartype.typing import Dict, Optional
+from sqlalchemy import MetaData
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from .dbExecutor import DB_MAX_THREADS
+
+DB_POOL_SIZE = int(os.getenv("REALLOAD_DB_POOL_SIZE", str(DB_MAX_THREADS)))
+"""Connections kept open by the pool. Defaults to the size of the DB thread pool, which bounds concurrent use."""
+
+DB_MAX_OVERFLOW = int(os.getenv("REALLOAD_DB_MAX_OVERFLOW", "4"))
+"""Connections opened beyond `DB_POOL_SIZE` under bursts, such as from ingestion jobs, and closed once returned."""
+
+DB_POOL_TIMEOUT = float(os.getenv("REALLOAD_DB_POOL_TIMEOUT", "30"))
+"""Seconds to wait for a free connection before failing."""
+
+DB_POOL_RECYCLE = int(os.getenv("REALLOAD_DB_POOL_RECYCLE", "1800"))
+"""Connections older than this many seconds are replaced, before the server or a proxy drops them."""
+
+# DatabaseUtils is only imported when the engine is first needed, so that importing realLoad modules never
+# touches the DB configuration, such as in benchmarks that bring their own engine through `useDatabase`
+_engine: Optional[Engine] = None
+_metadata: Optional[MetaData] = None
+_lock = threading.Lock()
+
+
+def getEngine() -> Engine:
+    """The engine shared by all of realLoad in this process, created on first use. It has one pool, sized from
+    the environment, that checks connections with a ping before handing them out."""
+    global _engine
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                _engine = _createEngine()
+    return _engine
+
+
+def getMetadata() -> MetaData:
+    """The metadata shared by all of realLoad in this process, reflected on first use."""
+    global _metadata
+    if _metadata is None:
+        with _lock:
+            if _metadata is None:
+                from pahbar.prediction.services.util import DatabaseUtils
+
+                _metadata = DatabaseUtils.createMetdata()
+    return _metadata
+
+
+def useDatabase(engine: Engine, metadata: MetaData):
+    """Make realLoad use this engine and metadata from now on. Only meant for tests and benchmarks that bring a
+    local database, before any request is served: the previous engine is disposed, so connections checked out of
+    it meanwhile are closed once returned."""
+    global _engine, _metadata
+    with _lock:
+        previous, _engine, _metadata = _engine, engine, metadata
+
+    if previous is not None and previous is not engine:
+        previous.dispose()
+
+
+def poolStatus() -> Dict[str, int]:
+    """Connections of the shared pool: `open` ones, of which `checked_out` are in use. Empty until the engine
+    is created."""
+    if _engine is None:
+        return {}
+
+    pool = _engine.pool
+    checked_in = pool.checkedin() if hasattr(pool, "checkedin") else 0
+    checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+    return {"open": checked_in + checked_out, "checked_out": checked_out}
+
+
+def dbEngine() -> Engine:
+    """FastAPI dependency giving the shared engine."""
+    return getEngine()
+
+
+def dbMetadata() -> MetaData:
+    """FastAPI dependency giving the shared metadata."""
+    return getMetadata()
+
+
+def _createEngine() -> Engine:
+    """The engine `DatabaseUtils` is configured with, with its pool swapped for one with our settings. Everything
+    else it was created with is kept: its `connect_args`, execution options, dialect options and event listeners.
+    SQLite, used by the benchmarks, keeps its own pool, as that doesn't take these settings."""
+    from pahbar.prediction.services.util import DatabaseUtils
+
+    configured = DatabaseUtils.createEngine()
+    if configured.url.get_backend_name() == "sqlite":
+        return configured
+
+    # Built as `QueuePool.recreate` builds it, so that connections still come from the creator `create_engine`
+    # made out of the configured connect_args, and the pool listeners carry over
+    pool = configured.pool
+    configured.pool = QueuePool(
+        pool._creator, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, timeout=DB_POOL_TIMEOUT,
+        recycle=DB_POOL_RECYCLE, pre_ping=True, echo=pool.echo, logging_name=pool._orig_logging_name,
+        reset_on_return=pool._reset_on_return, _dispatch=pool.dispatch, dialect=pool._dialect)
+    pool.dispose()
+    return configured
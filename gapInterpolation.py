@@ -0,0 +1,157 @@
+import argparse
+import datetime
+import logging
+
+import numpy as np
+import pandas as pd
+import pytz
+from beartype import beartype
+from beartype.typing import Dict, Iterable, List
+from sqlalchemy import distinct, select
+
+from .bulkLoadWriter import REAL_HOURLY_LOAD_TABLE, RealLoadBulkWriter
+from .coverageIndex import INTERPOLATED_SOURCE
+from .dateConversion import hoursToJalaliDatetimes, jalaliDateToOrdinal
+from .dbProvider import getEngine, getMetadata
+from .loadRecords import hourlyRecords
+from ...db.load import RealHourlyLoadQueries
+
+INTERPOLATION_METHODS = ("linear", "seasonal")
+
+SEASONAL_DAYS = 7
+"""Number of previous days whose same hour is averaged by the seasonal method."""
+
+_IRAN_TZ = pytz.timezone('Asia/Tehran')
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+@beartype
+def interpolateGaps(
+        location: int, from_ordinal: int, to_ordinal: int, method: str = "seasonal",
+        seasonal_days: int = SEASONAL_DAYS) -> np.ndarray:
+    """Fill the missing hours of a location within days [from_ordinal, to_ordinal] (Gregorian ordinals) and save
+    them with the 'interpolated' source. Only gaps between two known loads are filled; nothing is extrapolated.
+    Returns the filled hours, as local hours since the epoch.
+
+    Only missing or previously interpolated hours are written: a load that lands in a gap while it's being filled
+    is kept, and its hour is left out of the returned ones.
+
+    With the 'seasonal' method a missing hour gets the mean of the same hour over the previous `seasonal_days`
+    days, falling back to 'linear' interpolation between its neighbouring hours when those are missing too.
+
+    Raises:
+        ValueError: If the method is unknown.
+    """
+    if method not in INTERPOLATION_METHODS:
+        raise ValueError(f"Unknown interpolation method '{method}', expected one of {INTERPOLATION_METHODS}.")
+
+    # Read a few extra days before the range, for the seasonal profile
+    read_from_ordinal = from_ordinal - seasonal_days
+    loads = _readHourlyLoads(location, read_from_ordinal, to_ordinal)
+
+    filled = fillGaps(loads, method, seasonal_days)
+    target = np.zeros(len(loads), dtype=bool)
+    target[(from_ordinal - read_from_ordinal) * 24:] = True
+    filled_index = np.flatnonzero(np.isnan(loads) & ~np.isnan(filled) & target)
+    if not len(filled_index):
+        return filled_index
+
+    hours = filled_index + (read_from_ordinal - _EPOCH.toordinal()) * 24
+    with RealLoadBulkWriter(getEngine(), getMetadata(), replace_source=INTERPOLATED_SOURCE) as writer:
+        written = writer.writeMask(location, pd.DataFrame({
+            "datetime": hoursToJalaliDatetimes(hours),
+            "load_MWh": filled[filled_index],
+            "source": INTERPOLATED_SOURCE}))
+
+    return hours[written]
+
+
+def fillGaps(loads: np.ndarray, method: str, seasonal_days: int = SEASONAL_DAYS) -> np.ndarray:
+    """Fill the NaNs of an hourly series, which starts at a day start, in one vectorized pass. NaNs before the
+    first or after the last known load are left as they are."""
+    known = np.flatnonzero(~np.isnan(loads))
+    filled = loads.copy()
+    if len(known) < 2:
+        return filled
+
+    interior = np.zeros(len(loads), dtype=bool)
+    interior[known[0]:known[-1] + 1] = True
+    gaps = np.isnan(loads) & interior
+
+    linear = np.interp(np.arange(len(loads)), known, loads[known])
+    if method == "linear":
+        filled[gaps] = linear[gaps]
+        return filled
+
+    # Same hour of the previous days, as a (lag, day, hour) stack
+    days = -(-len(loads) // 24)
+    matrix = np.full(days * 24, np.nan)
+    matrix[:len(loads)] = loads
+    matrix = matrix.reshape(days, 24)
+    lagged = np.full((seasonal_days, days, 24), np.nan)
+    for lag in range(1, seasonal_days + 1):
+        lagged[lag - 1, lag:] = matrix[:-lag]
+
+    counts = (~np.isnan(lagged)).sum(axis=0)
+    sums = np.nansum(lagged, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        seasonal = np.where(counts > 0, sums / counts, np.nan).ravel()[:len(loads)]
+
+    filled[gaps] = np.where(np.isnan(seasonal[gaps]), linear[gaps], seasonal[gaps])
+    return filled
+
+
+@beartype
+def interpolateAllLocations(
+        locations: Iterable[int], from_ordinal: int, to_ordinal: int,
+        method: str = "seasonal") -> Dict[int, int]:
+    """Run `interpolateGaps` for several locations, such as in the nightly batch. A failing location is logged
+    and skipped. Returns the number of filled hours per location."""
+    filled_hours = {}
+    for location in locations:
+        try:
+            filled_hours[location] = len(interpolateGaps(location, from_ordinal, to_ordinal, method))
+        except Exception as e:
+            logging.error(f"Could not interpolate the loads of location {location}: {e}")
+
+    return filled_hours
+
+
+def storedLocations() -> List[int]:
+    """The locations that have at least one hourly load."""
+    table = getMetadata().tables[REAL_HOURLY_LOAD_TABLE]
+    with getEngine().connect() as connection:
+        return sorted(connection.execute(select(distinct(table.c["location"]))).scalars().all())
+
+
+def _readHourlyLoads(location: int, from_ordinal: int, to_ordinal: int) -> np.ndarray:
+    """Hourly loads of days [from_ordinal, to_ordinal] as one array, with NaN for missing hours."""
+    first_day, last_day = datetime.date.fromordinal(from_ordinal), datetime.date.fromordinal(to_ordinal)
+    from_datetime = _IRAN_TZ.localize(datetime.datetime(first_day.year, first_day.month, first_day.day))
+    to_datetime = _IRAN_TZ.localize(
+        datetime.datetime(last_day.year, last_day.month, last_day.day, 23, 59, 59, 999999))
+    with RealHourlyLoadQueries(getEngine(), getMetadata()) as q:
+        db_records = q.selectByDate(location, from_datetime, to_datetime) or []
+
+    loads = np.full((to_ordinal - from_ordinal + 1) * 24, np.nan)
+    hours, db_loads, _ = hourlyRecords(db_records)
+    index = hours - (from_ordinal - _EPOCH.toordinal()) * 24
+    in_range = (index >= 0) & (index < len(loads))
+    loads[index[in_range]] = db_loads[in_range]
+
+    return loads
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill the missing hours of real load, for the nightly batch.")
+    parser.add_argument(
+        "--locations", type=int, nargs="+", help="Locations to fill; defaults to every location with hourly loads")
+    parser.add_argument("--from-date", required=True, help="Jalali start date as '%%Y/%%m/%%d'")
+    parser.add_argument("--to-date", required=True, help="Jalali end date (inclusive) as '%%Y/%%m/%%d'")
+    parser.add_argument("--method", choices=INTERPOLATION_METHODS, default="seasonal")
+    args = parser.parse_args()
+
+    filled = interpolateAllLocations(
+        args.locations or storedLocations(), jalaliDateToOrdinal(args.from_date), jalaliDateToOrdinal(args.to_date), args.method)
+    for location, count in filled.items():
+        print(f"Location {location}: {count} hours filled")
@@ -0,0 +1,35 @@
+from beartype.typing import ClassVar, List, Optional
+from pydantic import BaseModel, Field
+
+
+class IngestionJobStatus(BaseModel):
+    """Progress of a background real load upload."""
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2b8c1e9a4d4b7f",
+                "status": "writing",
+                "rows_parsed": 87600,
+                "rows_written": 40000,
+                "errors": [],
+                "eta_seconds": 12.5,
+            }
+        }
+
+        frozen = True
+
+    STATUSES: ClassVar[List[str]] = ["queued", "parsing", "writing", "done", "failed"]
+    """The possible values of `status`, in the order a job goes through them."""
+
+    job_id: str = Field(..., title="Identifier of the job, as returned by the upload")
+
+    status: str = Field(..., title="One of 'queued', 'parsing', 'writing', 'done' or 'failed'")
+
+    rows_parsed: int = Field(0, title="Number of hourly loads parsed from the file so far")
+
+    rows_written: int = Field(0, title="Number of hourly loads written to the database so far")
+
+    errors: List[str] = Field([], title="Errors that failed the job, if any")
+
+    eta_seconds: Optional[float] = Field(None, title="Estimated seconds until the job is done, if known")
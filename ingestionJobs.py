@@ -0,0 +1,267 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from beartype.typing import List, Optional, Set, Tuple
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, Text, delete, func, select, update
+from sqlalchemy.engine import Engine
+
+from .bulkLoadWriter import BULK_CHUNK_SIZE, RealLoadBulkWriter, bulkWriteEnabled
+from .dayDigests import DeltaFilter
+from .dbExecutor import runQuery
+from .dbProvider import getEngine, getMetadata
+from .loadFileReader import readLoadSheet
+from .loadFrames import dayLoadsToFrame, sheetToDayLoads
+from .modelLoadWriter import loadFrameToModels, writeLoadModels
+from .models import IngestionJobStatus
+
+JOB_PARSE_PROCESSES = int(os.getenv("REALLOAD_JOB_PARSE_PROCESSES", "2"))
+"""Size of the process pool parsing uploaded files."""
+
+JOB_DB_CONCURRENCY = int(os.getenv("REALLOAD_JOB_DB_CONCURRENCY", "2"))
+"""Number of jobs allowed to write to the database at the same time."""
+
+MAX_JOBS_PER_LOCATION = int(os.getenv("REALLOAD_MAX_JOBS_PER_LOCATION", "1"))
+"""Number of unfinished jobs a single location may have, so that one DISCo can't starve the others."""
+
+JOB_RETENTION_SECONDS = float(os.getenv("REALLOAD_JOB_RETENTION_SECONDS", "3600"))
+"""How long the status of a finished job is kept around for polling."""
+
+JOB_STALE_SECONDS = float(os.getenv("REALLOAD_JOB_STALE_SECONDS", "900"))
+"""An unfinished job whose row wasn't updated for this long is taken as lost with the worker running it, such as
+on a restart: it's reported as failed, and no longer counts against `MAX_JOBS_PER_LOCATION`."""
+
+JOB_PROGRESS_SECONDS = float(os.getenv("REALLOAD_JOB_PROGRESS_SECONDS", "1"))
+"""Least time between two saves of the number of rows written, while a job writes."""
+
+UNFINISHED_STATUSES = ("queued", "parsing", "writing")
+
+JOB_METADATA = MetaData()
+
+INGESTION_JOB_TABLE = Table(
+    "real_load_ingestion_job", JOB_METADATA,
+    Column("job_id", String(32), primary_key=True),
+    Column("location", Integer, nullable=False, index=True),
+    Column("status", String(16), nullable=False),
+    Column("rows_parsed", Integer, nullable=False),
+    Column("rows_written", Integer, nullable=False),
+    Column("rows_to_write", Integer, nullable=False),
+    Column("errors", Text, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Column("writing_started_at", Float),
+    Column("finished_at", Float),
+)
+"""One row per upload job, shared by all workers, so that any of them answers a status poll and the limit of
+unfinished jobs holds across them. Times are epoch seconds. Apply `schema/real_load_ingestion_job.sql` (or
+`createIngestionJobTable`) before deploying."""
+
+
+class TooManyJobsError(Exception):
+    """Raised when a location already has `MAX_JOBS_PER_LOCATION` unfinished jobs."""
+
+
+@dataclass
+class _Job:
+    job_id: str
+    location: int
+    status: str = "queued"
+    rows_parsed: int = 0
+    rows_written: int = 0
+    rows_to_write: int = 0
+    errors: List[str] = field(default_factory=list)
+    updated_at: float = field(default_factory=time.time)
+    writing_started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def toStatus(self) -> IngestionJobStatus:
+        status, errors = self.status, list(self.errors)
+        if status in UNFINISHED_STATUSES and self.updated_at < time.time() - JOB_STALE_SECONDS:
+            status = "failed"
+            errors.append("The worker running this job stopped before it finished.")
+
+        eta_seconds = None
+        if status == "writing" and self.rows_written:
+            rate = self.rows_written / max(self.updated_at - self.writing_started_at, 1e-3)
+            eta_seconds = max((self.rows_to_write - self.rows_written) / rate - (time.time() - self.updated_at), 0.0)
+        elif status == "done":
+            eta_seconds = 0.0
+
+        return IngestionJobStatus(
+            job_id=self.job_id, status=status, rows_parsed=self.rows_parsed,
+            rows_written=self.rows_written, errors=errors, eta_seconds=eta_seconds)
+
+    def toRow(self) -> dict:
+        return {
+            "job_id": self.job_id, "location": self.location, "status": self.status,
+            "rows_parsed": self.rows_parsed, "rows_written": self.rows_written, "rows_to_write": self.rows_to_write,
+            "errors": json.dumps(self.errors), "updated_at": self.updated_at,
+            "writing_started_at": self.writing_started_at, "finished_at": self.finished_at}
+
+
+_TASKS: Set[asyncio.Task] = set()
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+_PARSE_SEMAPHORE: Optional[asyncio.Semaphore] = None
+_DB_SEMAPHORE: Optional[asyncio.Semaphore] = None
+
+
+async def submitJob(location: int, path: str, filename: Optional[str]) -> str:
+    """Start ingesting an uploaded file, saved at `path`, in the background. The file is deleted once parsed.
+    Returns the id of the new job.
+
+    Raises:
+        TooManyJobsError: If this location already has too many unfinished jobs, over all workers.
+    """
+    job = _Job(job_id=uuid.uuid4().hex, location=location)
+    await runQuery(_insertJob, job)
+
+    task = asyncio.get_running_loop().create_task(_runJob(job, path, filename))
+    _TASKS.add(task)
+    task.add_done_callback(_TASKS.discard)
+    return job.job_id
+
+
+def getJobStatus(job_id: str, location: int) -> Optional[IngestionJobStatus]:
+    """Return the status of a job of this location, whichever worker runs it, or None if no such job exists.
+    Reads the job table, so run it through `runQuery`."""
+    with getEngine().connect() as connection:
+        row = connection.execute(
+            select(INGESTION_JOB_TABLE)
+            .where(INGESTION_JOB_TABLE.c["job_id"] == job_id)
+            .where(INGESTION_JOB_TABLE.c["location"] == location)).mappings().first()
+
+    if row is None:
+        return None
+
+    return _Job(**{**row, "errors": json.loads(row["errors"])}).toStatus()
+
+
+def createIngestionJobTable(engine: Optional[Engine] = None):
+    """Create the job table if it doesn't exist, as `schema/real_load_ingestion_job.sql` does. A setup step, for
+    databases without a migration run, such as local or benchmark ones; request paths never call it."""
+    with (engine or getEngine()).begin() as connection:
+        INGESTION_JOB_TABLE.create(connection, checkfirst=True)
+
+
+def parseLoadFile(path: str, filename: Optional[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Read and validate an uploaded file into its dates, ordinals and day x 24 load matrix (see
+    `sheetToDayLoads`). Runs in the parsing process pool."""
+    with open(path, "rb") as file:
+        return sheetToDayLoads(readLoadSheet(file, filename))
+
+
+async def _runJob(job: _Job, path: str, filename: Optional[str]):
+    global _PARSE_SEMAPHORE, _DB_SEMAPHORE
+    if _DB_SEMAPHORE is None:
+        _PARSE_SEMAPHORE = asyncio.Semaphore(JOB_PARSE_PROCESSES)
+        _DB_SEMAPHORE = asyncio.Semaphore(JOB_DB_CONCURRENCY)
+
+    try:
+        # The job stays queued until a parsing process is free for it
+        async with _PARSE_SEMAPHORE:
+            job.status = "parsing"
+            await runQuery(_saveJob, job)
+            try:
+                dates, ordinals, loads = await asyncio.get_running_loop().run_in_executor(
+                    _parsePool(), parseLoadFile, path, filename)
+            finally:
+                os.remove(path)
+
+        # Only the days that differ from the stored loads are written
+        delta = DeltaFilter(job.location)
+        keep = await runQuery(delta, ordinals, loads)
+        load_frame = dayLoadsToFrame(dates[keep], loads[keep]).assign(source="manual")
+        job.rows_parsed = int((~np.isnan(loads)).sum())
+        job.rows_to_write = len(load_frame)
+
+        async with _DB_SEMAPHORE:
+            job.status = "writing"
+            job.writing_started_at = time.time()
+            await runQuery(_saveJob, job)
+            if bulkWriteEnabled():
+                await runQuery(_writeLoadFrame, job, load_frame)
+            else:
+                # writeLoadsToDB writes all at once, so there's no progress to report meanwhile
+                await writeLoadModels(job.location, load_frame, await runQuery(loadFrameToModels, load_frame))
+                job.rows_written = len(load_frame)
+
+        job.status = "done"
+    except Exception as e:
+        logging.error(f"Real load upload job {job.job_id} failed: {e}")
+        job.errors.append(str(e))
+        if job.status == "writing":
+            # The transaction was rolled back
+            job.rows_written = 0
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+        try:
+            await runQuery(_saveJob, job)
+        except Exception as e:
+            logging.error(f"Could not save the outcome of real load upload job {job.job_id}: {e}")
+
+
+def _insertJob(job: _Job):
+    """Add the row of a new job, once the jobs of its location allow it. Finished jobs past their retention are
+    dropped meanwhile.
+
+    Raises:
+        TooManyJobsError: If the location already has `MAX_JOBS_PER_LOCATION` unfinished jobs.
+    """
+    now = time.time()
+    with getEngine().begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Two workers counting at once would otherwise both see room for their job
+            connection.execute(select(func.pg_advisory_xact_lock(job.location)))
+        connection.execute(
+            delete(INGESTION_JOB_TABLE)
+            .where(INGESTION_JOB_TABLE.c["finished_at"] < now - JOB_RETENTION_SECONDS))
+        unfinished = connection.execute(
+            select(func.count())
+            .where(INGESTION_JOB_TABLE.c["location"] == job.location)
+            .where(INGESTION_JOB_TABLE.c["status"].in_(UNFINISHED_STATUSES))
+            .where(INGESTION_JOB_TABLE.c["updated_at"] >= now - JOB_STALE_SECONDS)).scalar()
+        if unfinished >= MAX_JOBS_PER_LOCATION:
+            raise TooManyJobsError(f"Location {job.location} already has {unfinished} unfinished upload jobs.")
+
+        job.updated_at = now
+        connection.execute(INGESTION_JOB_TABLE.insert(), [job.toRow()])
+
+
+def _saveJob(job: _Job):
+    job.updated_at = time.time()
+    with getEngine().begin() as connection:
+        connection.execute(
+            update(INGESTION_JOB_TABLE)
+            .where(INGESTION_JOB_TABLE.c["job_id"] == job.job_id)
+            .values(job.toRow()))
+
+
+def _writeLoadFrame(job: _Job, load_frame: pd.DataFrame):
+    """Write in one transaction, chunk by chunk, saving the progress at most every `JOB_PROGRESS_SECONDS`. SQLite
+    only allows one writer at a time, which the upload is, so progress is only saved once it's done there."""
+    save_progress = getEngine().dialect.name != "sqlite"
+    with RealLoadBulkWriter(getEngine(), getMetadata()) as writer:
+        for start in range(0, len(load_frame), BULK_CHUNK_SIZE):
+            writer.write(job.location, load_frame.iloc[start:start + BULK_CHUNK_SIZE])
+            job.rows_written = writer.rows_written
+            if save_progress and time.time() - job.updated_at >= JOB_PROGRESS_SECONDS:
+                try:
+                    _saveJob(job)
+                except Exception as e:
+                    logging.warning(f"Could not save the progress of real load upload job {job.job_id}: {e}")
+
+
+def _parsePool() -> ProcessPoolExecutor:
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        _PARSE_POOL = ProcessPoolExecutor(max_workers=JOB_PARSE_PROCESSES)
+
+    return _PARSE_POOL
+
@@ -0,0 +1,315 @@
+import bisect
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from beartype.typing import Dict, Iterator, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("REALLOAD_METRICS", "1") != "0"
+"""Whether phases, requests and rows are recorded at all."""
+
+PROFILE_THRESHOLD_SECONDS = float(os.getenv("REALLOAD_PROFILE_THRESHOLD_MS", "0")) / 1000
+"""Requests running longer than this get their stacks sampled and logged. 0 disables the profiler."""
+
+PROFILE_INTERVAL_SECONDS = float(os.getenv("REALLOAD_PROFILE_INTERVAL_MS", "10")) / 1000
+"""Time between two stack samples of a slow request."""
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+"""Upper bounds (seconds) of the latency histogram buckets."""
+
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+"""Upper bounds (bytes) of the payload size histogram buckets."""
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects it."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Histograms and counters by metric name and labels. Thread safe, since phases are recorded from the DB
+    threads as well as from the event loop."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, labels: Labels, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, labels: Labels, amount: float = 1):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + amount
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._help[name] = (kind, help_text)
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(
+                (key, list(h.buckets), list(h.counts), h.sum) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        described = set()
+
+        def header(name: str):
+            if name not in described and name in self._help:
+                kind, help_text = self._help[name]
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"])
+            described.add(name)
+
+        for (name, labels), buckets, counts, total in histograms:
+            header(name)
+            cumulative = 0
+            for bound, count in zip([*buckets, "+Inf"], counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_formatLabels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{name}_sum{_formatLabels(labels)} {total}")
+            lines.append(f"{name}_count{_formatLabels(labels)} {cumulative}")
+
+        for (name, labels), value in counters:
+            header(name)
+            lines.append(f"{name}{_formatLabels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+METRICS.describe("realload_request_seconds", "histogram", "Latency of realLoad requests, by route and status.")
+METRICS.describe("realload_phase_seconds", "histogram", "Time spent in each phase of a request, by route.")
+METRICS.describe("realload_response_bytes", "histogram", "Size of realLoad response bodies, by route.")
+METRICS.describe("realload_rows_total", "counter", "Rows read, parsed or written, by route and phase.")
+
+
+class RequestTimings:
+    """Phases and rows recorded during one request. They're flushed to `METRICS` once the request is over and
+    its route is known; anything recorded later, such as by a background job the request started, goes
+    straight to `METRICS` under the same route."""
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.started = time.perf_counter()
+        self.loop_thread = threading.get_ident()
+        self.active_threads: Counter = Counter()
+        self.samples: Counter = Counter()
+        self._phases: List[Tuple[str, float]] = []
+        self._rows: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+
+    def addPhase(self, name: str, seconds: float):
+        with self._lock:
+            if self.route is None:
+                self._phases.append((name, seconds))
+                return
+        METRICS.observe("realload_phase_seconds", (("route", self.route), ("phase", name)), seconds)
+
+    def addRows(self, name: str, count: int):
+        with self._lock:
+            if self.route is None:
+                self._rows.append((name, count))
+                return
+        METRICS.increment("realload_rows_total", (("route", self.route), ("phase", name)), count)
+
+    def flush(self, route: str):
+        with self._lock:
+            self.route = route
+            phases, rows = self._phases, self._rows
+            self._phases, self._rows = [], []
+
+        for name, seconds in phases:
+            METRICS.observe("realload_phase_seconds", (("route", route), ("phase", name)), seconds)
+        for name, count in rows:
+            METRICS.increment("realload_rows_total", (("route", route), ("phase", name)), count)
+
+
+_TIMINGS: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("realload_timings", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a step of the current request, such as `with phase("db_query"): ...`. Works across `runQuery`,
+    which carries the context to the DB thread. Outside of a request, the step is recorded under the route
+    'background'."""
+    if not METRICS_ENABLED:
+        yield
+        return
+
+    timings = _TIMINGS.get()
+    thread = threading.get_ident()
+    if timings is not None:
+        with timings._lock:
+            timings.active_threads[thread] += 1
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        if timings is not None:
+            with timings._lock:
+                timings.active_threads[thread] -= 1
+                if not timings.active_threads[thread]:
+                    del timings.active_threads[thread]
+        recordPhase(name, elapsed)
+
+
+def recordPhase(name: str, seconds: float):
+    """Record a step timed by other means, such as a FastAPI dependency."""
+    if not METRICS_ENABLED:
+        return
+
+    timings = _TIMINGS.get()
+    if timings is None:
+        METRICS.observe("realload_phase_seconds", (("route", "background"), ("phase", name)), seconds)
+    else:
+        timings.addPhase(name, seconds)
+
+
+def recordRows(name: str, count: int):
+    """Count rows read, parsed or written by a step of the current request."""
+    if not METRICS_ENABLED:
+        return
+
+    timings = _TIMINGS.get()
+    if timings is None:
+        METRICS.increment("realload_rows_total", (("route", "background"), ("phase", name)), count)
+    else:
+        timings.addRows(name, count)
+
+
+async def phaseStart() -> float:
+    """A FastAPI dependency returning the time it was resolved at. Declared right before another dependency, it
+    lets a route time that dependency with `recordPhase`. Being a coroutine function, it's resolved on the event
+    loop rather than sent to the thread pool, which would add a hop to the time it measures."""
+    return time.perf_counter()
+
+
+class InstrumentationMiddleware:
+    """ASGI middleware recording the latency, status and body size of every request, by route template, and
+    flushing the phases recorded meanwhile. Add it to the app with `app.add_middleware(InstrumentationMiddleware)`.
+    Being a plain ASGI middleware, it neither buffers nor delays streamed bodies."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _TIMINGS.set(timings)
+        response = {"status": "500", "bytes": 0}
+
+        async def instrumentedSend(message):
+            if message["type"] == "http.response.start":
+                response["status"] = str(message["status"])
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        _SAMPLER.track(timings)
+        try:
+            await self.app(scope, receive, instrumentedSend)
+        finally:
+            _TIMINGS.reset(token)
+            _SAMPLER.untrack(timings)
+            elapsed = time.perf_counter() - timings.started
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+
+            timings.flush(route)
+            METRICS.observe("realload_request_seconds", (("route", route), ("status", response["status"])), elapsed)
+            METRICS.observe("realload_response_bytes", (("route", route),), response["bytes"], SIZE_BUCKETS)
+            with timings._lock:
+                samples = Counter(timings.samples)
+            if samples:
+                _logProfile(route, elapsed, samples)
+
+
+class _StackSampler:
+    """A single daemon thread sampling, every `PROFILE_INTERVAL_SECONDS`, the stacks of the threads working on
+    requests that have been running for longer than `PROFILE_THRESHOLD_SECONDS`: the event loop thread, plus the
+    DB threads inside one of their phases. Idle otherwise, so it costs a wake-up per interval."""
+
+    def __init__(self):
+        self._requests: Dict[int, RequestTimings] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def track(self, timings: RequestTimings):
+        if PROFILE_THRESHOLD_SECONDS <= 0:
+            return
+
+        with self._lock:
+            self._requests[id(timings)] = timings
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="realLoad-profiler", daemon=True)
+                self._thread.start()
+
+    def untrack(self, timings: RequestTimings):
+        with self._lock:
+            self._requests.pop(id(timings), None)
+
+    def _run(self):
+        while True:
+            time.sleep(PROFILE_INTERVAL_SECONDS)
+            now = time.perf_counter()
+            with self._lock:
+                slow = [t for t in self._requests.values() if now - t.started > PROFILE_THRESHOLD_SECONDS]
+            if not slow:
+                continue
+
+            frames = sys._current_frames()
+            for timings in slow:
+                with timings._lock:
+                    threads = {timings.loop_thread, *timings.active_threads}
+                for thread in threads:
+                    frame = frames.get(thread)
+                    if frame is not None:
+                        stack = ";".join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})"
+                                         for f in traceback.extract_stack(frame))
+                        with timings._lock:
+                            timings.samples[stack] += 1
+
+
+_SAMPLER = _StackSampler()
+
+
+def _logProfile(route: str, elapsed: float, samples: Counter):
+    """Log the most sampled stacks of a slow request, in the folded format flame graph tools read."""
+    folded = "\n".join(f"{stack} {count}" for stack, count in samples.most_common(20))
+    logging.warning(f"Slow request to {route} took {elapsed:.3f}s; sampled stacks:\n{folded}")
+
+
+def _formatLabels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escapeLabel(value)}"' for key, value in labels) + "}"
+
+
+def _escapeLabel(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,101 @@
+import base64
+import contextlib
+import datetime
+import os
+
+import numpy as np
+from beartype.typing import Iterator, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+
+from .bulkLoadWriter import REAL_HOURLY_LOAD_TABLE
+from .dateConversion import ordinalsToJalaliDates
+from .dbProvider import getEngine, getMetadata
+
+EXPORT_FETCH_ROWS = int(os.getenv("REALLOAD_EXPORT_FETCH_ROWS", "5000"))
+"""Number of rows fetched at a time from the server-side cursor."""
+
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+def iterDayLoads(
+        location: int, from_ordinal: int, to_ordinal: int,
+        every_day: bool = False, connection: Optional[Connection] = None) -> Iterator[Tuple[str, int, np.ndarray]]:
+    """Yield (Jalali '%Y-%m-%d' date, Gregorian ordinal, 24 hourly loads) for each day in [from_ordinal,
+    to_ordinal] that has a positive load, in date order. Like `format_loads`, hours without a positive load are
+    0.0. Rows are read through a server-side cursor, so memory use doesn't depend on the length of the range.
+
+    With `every_day`, every day of the range is yielded instead, and hours are left as stored, with NaN where no
+    load exists. This is the layout `/realLoad/defineLoadsAsExcel` reads back.
+
+    Rows are read over `connection` when given, such as to see the uncommitted writes of its transaction, and it's
+    left open. Otherwise a connection is taken from the pool for the duration of the iteration.
+    """
+    table = getMetadata().tables[REAL_HOURLY_LOAD_TABLE]
+    query = (
+        select(table.c["datetime"], table.c["load_MWh"])
+        .where(table.c["location"] == location)
+        .where(table.c["datetime"] >= datetime.datetime.combine(
+            datetime.date.fromordinal(from_ordinal), datetime.time.min))
+        .where(table.c["datetime"] < datetime.datetime.combine(
+            datetime.date.fromordinal(to_ordinal + 1), datetime.time.min))
+        .order_by(table.c["datetime"]))
+
+    def emptyDay() -> np.ndarray:
+        return np.full(24, np.nan) if every_day else np.zeros(24)
+
+    def dayRows(ordinal: int, loads: np.ndarray, until_ordinal: int) -> Iterator[Tuple[str, int, np.ndarray]]:
+        """The row of this day, if it's to be yielded, then the empty days up to `until_ordinal` (excluded)."""
+        if every_day or (loads > 0).any():
+            yield _dayRow(ordinal, loads)
+        if every_day:
+            for empty_ordinal in range(ordinal + 1, until_ordinal):
+                yield _dayRow(empty_ordinal, emptyDay())
+
+    current_ordinal, current_loads = from_ordinal, emptyDay()
+    with contextlib.nullcontext(connection) if connection is not None else getEngine().connect() as connection:
+        result = connection.execution_options(stream_results=True, yield_per=EXPORT_FETCH_ROWS).execute(query)
+        for partition in result.partitions():
+            hours = np.array([row[0] for row in partition], dtype="datetime64[h]").astype(np.int64)
+            loads = np.array([row[1] for row in partition], dtype=float)
+            ordinals, hour_of_day = np.divmod(hours, 24)
+            ordinals += _EPOCH.toordinal()
+
+            # Split the partition where the day changes
+            for segment in np.split(np.arange(len(hours)), np.flatnonzero(np.diff(ordinals)) + 1):
+                if not len(segment):
+                    continue
+                ordinal = int(ordinals[segment[0]])
+                if ordinal != current_ordinal:
+                    yield from dayRows(current_ordinal, current_loads, ordinal)
+                    current_ordinal, current_loads = ordinal, emptyDay()
+
+                segment_loads = loads[segment]
+                kept = np.ones(len(segment), dtype=bool) if every_day else segment_loads > 0
+                current_loads[hour_of_day[segment][kept]] = segment_loads[kept]
+
+    yield from dayRows(current_ordinal, current_loads, to_ordinal + 1)
+
+
+def encodeCursor(next_ordinal: int) -> str:
+    """An opaque token to resume an export from this day on."""
+    return base64.urlsafe_b64encode(f"day:{next_ordinal}".encode()).decode()
+
+
+def decodeCursor(cursor: str) -> int:
+    """The day an export resumes from.
+
+    Raises:
+        ValueError: If the token is not a valid cursor.
+    """
+    try:
+        prefix, ordinal = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+        if prefix != "day":
+            raise ValueError
+        return int(ordinal)
+    except Exception:
+        raise ValueError("The given cursor is not valid.")
+
+
+def _dayRow(ordinal: int, loads: np.ndarray) -> Tuple[str, int, np.ndarray]:
+    return str(ordinalsToJalaliDates(np.array([ordinal]))[0]), ordinal, loads
@@ -0,0 +1,79 @@
+import csv
+import io
+import os
+
+import openpyxl
+import pandas as pd
+from beartype.typing import BinaryIO, Iterator, List, Optional, Sequence
+
+from .loadFrames import DayFilter, sheetBlocksToLoadFrames
+
+STREAM_BLOCK_ROWS = int(os.getenv("REALLOAD_STREAM_BLOCK_ROWS", "500"))
+"""Number of sheet rows (days) validated and written at a time by the streaming upload mode."""
+
+
+def isCsvFile(filename: Optional[str]) -> bool:
+    return bool(filename) and filename.lower().endswith(".csv")
+
+
+def readLoadSheet(file: BinaryIO, filename: Optional[str]) -> pd.DataFrame:
+    """Read a whole uploaded sheet, either an Excel workbook or a CSV file, into a DataFrame."""
+    if isCsvFile(filename):
+        return pd.read_csv(file, encoding="utf-8-sig")
+
+    return pd.read_excel(file)
+
+
+def streamLoadFrames(
+        file: BinaryIO, filename: Optional[str], block_rows: int = STREAM_BLOCK_ROWS,
+        day_filter: Optional[DayFilter] = None) -> Iterator[pd.DataFrame]:
+    """Read an uploaded sheet row by row and yield validated hourly load frames (see `sheetToLoadFrame`), one per
+    block of `block_rows` days. Only one block is held in memory at a time, whatever the size of the file.
+    Excel workbooks are read with openpyxl in read-only mode; CSV files skip Excel parsing altogether.
+
+    Raises:
+        ValueError: As soon as a block fails validation.
+    """
+    rows = _iterCsvRows(file) if isCsvFile(filename) else _iterExcelRows(file)
+    return sheetBlocksToLoadFrames(_iterBlocks(rows, block_rows), day_filter)
+
+
+def _iterBlocks(rows: Iterator[Sequence], block_rows: int) -> Iterator[pd.DataFrame]:
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The uploaded file is empty.")
+    columns = [str(column).strip() if column is not None else "" for column in header]
+
+    block: List[Sequence] = []
+    for row in rows:
+        if all(value is None or value == "" for value in row):
+            continue
+
+        row = list(row[:len(columns)]) + [None] * (len(columns) - len(row))
+        block.append([None if value == "" else value for value in row])
+        if len(block) == block_rows:
+            yield pd.DataFrame(block, columns=columns)
+            block = []
+
+    if block:
+        yield pd.DataFrame(block, columns=columns)
+
+
+def _iterExcelRows(file: BinaryIO) -> Iterator[Sequence]:
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"Error reading Excel file: {e}")
+
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _iterCsvRows(file: BinaryIO) -> Iterator[Sequence]:
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    finally:
+        text.detach()
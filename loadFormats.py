@@ -0,0 +1,87 @@
+import json
+
+import numpy as np
+from beartype.typing import List
+
+from .dateConversion import ordinalsToJalaliDates
+from .loadFrames import HOUR_COLUMNS
+from .loadRecords import hourlyRecords
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_EPOCH_ORDINAL = 719163
+"""Gregorian ordinal of 1970-01-01."""
+
+
+def format_loads(loads):
+    """One row per local day with a positive load, sorted by date: its Jalali '%Y-%m-%d' date and H0..H23, with
+    0.0 for the hours without a positive load. The datetimes of the records are normalized by `hourlyRecords`,
+    so that any stored representation is grouped into the right day."""
+    hours, values, _ = hourlyRecords(loads)
+    positive = values > 0
+    return formatDays(hours[positive], values[positive])
+
+
+def formatHourlyLoads(from_hour: int, loads: np.ndarray, present: np.ndarray) -> list:
+    """`format_loads` of the hourly loads from the recent load store, starting at local hour `from_hour`."""
+    positive = present & (loads > 0)
+    return formatDays(from_hour + np.flatnonzero(positive), loads[positive])
+
+
+def formatDays(hours: np.ndarray, values: np.ndarray) -> list:
+    """The rows of `format_loads` of these loads, given at local hours since the epoch. A later load of the same
+    hour wins."""
+    if not len(hours):
+        return []
+
+    days, hour_of_day = np.divmod(hours, 24)
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    day_loads = np.zeros((len(unique_days), 24))
+    day_loads[day_index, hour_of_day] = values
+
+    dates = ordinalsToJalaliDates(unique_days + _EPOCH_ORDINAL)
+    return [
+        {"date": date, **dict(zip(HOUR_COLUMNS, hours))}
+        for date, hours in zip(dates.tolist(), day_loads.tolist())]
+
+
+def hourlyLoadRow(from_hour: int, loads: np.ndarray, present: np.ndarray) -> np.ndarray:
+    """The row of `/realLoad/fetchLoads?format=columnar` of one local day, from its hourly loads in the recent load store starting at
+    local hour `from_hour`."""
+    row = np.zeros(24)
+    positive = present & (loads > 0)
+    row[(from_hour + np.flatnonzero(positive)) % 24] = loads[positive]
+    return row
+
+
+def dayLoadMatrix(records: list, ordinals: List[int]) -> np.ndarray:
+    """The rows of `/realLoad/fetchLoads?format=columnar` of the local days with these Gregorian ordinals, from DB records: the positive
+    loads at their hour of the day, and 0.0 elsewhere, as `format_loads` does. Records of other days are
+    ignored."""
+    matrix = np.zeros((len(ordinals), 24))
+    hours, loads, _ = hourlyRecords(records)
+    if not len(hours) or not len(ordinals):
+        return matrix
+
+    # Find the row of each record's day by a binary search over the sorted days
+    days, hour_of_day = np.divmod(hours, 24)
+    day_numbers = np.asarray(ordinals, dtype=np.int64) - _EPOCH_ORDINAL
+    order = np.argsort(day_numbers)
+    position = np.minimum(np.searchsorted(day_numbers[order], days), len(order) - 1)
+    rows = np.where(day_numbers[order][position] == days, order[position], -1)
+
+    kept = (rows >= 0) & (loads > 0)
+    matrix[rows[kept], hour_of_day[kept]] = loads[kept]
+    return matrix
+
+
+def serializeColumnar(dates: List[str], matrix: np.ndarray) -> bytes:
+    """The JSON body of the columnar format. The `json` encoding is the supported path, and gives the same values
+    as `format_loads` does; orjson, when installed, encodes the matrix straight from NumPy to the same JSON,
+    faster."""
+    if orjson is not None:
+        return orjson.dumps({"dates": dates, "loads": matrix}, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps({"dates": dates, "loads": matrix.tolist()}, separators=(",", ":")).encode()
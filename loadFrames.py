@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from beartype.typing import Callable, Iterable, Iterator, Optional, Tuple
+
+from .dateConversion import jalaliDatesToOrdinals
+
+DATE_COLUMN = "date"
+HOUR_COLUMNS = [f"H{hour}" for hour in range(0, 24)]
+HOUR_STRINGS = np.array([f"{hour:02d}:00:00" for hour in range(0, 24)])
+
+DayFilter = Callable[[np.ndarray, np.ndarray], np.ndarray]
+"""Given the ordinals of a block of days and their day x 24 load matrix, returns the mask of days to keep."""
+
+
+def sheetToLoadFrame(df: pd.DataFrame, day_filter: Optional[DayFilter] = None) -> pd.DataFrame:
+    """Convert a sheet of daily loads (a 'date' column, as Jalali '%Y-%m-%d', plus hourly H0..H23 columns) into
+    a long frame of hourly loads, with 'datetime' (Jalali '%Y-%m-%d %H:%M:%S') and 'load_MWh' columns. Empty
+    cells are dropped. The whole sheet is validated with array operations, never row by row. Only the days kept
+    by `day_filter`, if given, are converted.
+
+    Raises:
+        ValueError: If a column is missing, a date is malformed or dates are not consecutive, or a load is not a
+            non-negative number.
+    """
+    dates, ordinals, loads = sheetToDayLoads(df)
+    if day_filter is not None:
+        keep = day_filter(ordinals, loads)
+        dates, loads = dates[keep], loads[keep]
+
+    return dayLoadsToFrame(dates, loads)
+
+
+def sheetBlocksToLoadFrames(
+        blocks: Iterable[pd.DataFrame], day_filter: Optional[DayFilter] = None) -> Iterator[pd.DataFrame]:
+    """Same as `sheetToLoadFrame`, for a sheet that arrives as consecutive blocks of rows. Each block is validated
+    (including date continuity with the previous block) and converted as soon as it arrives, so the first bad
+    block raises before the following ones are even read."""
+    last_ordinal = None
+    for block in blocks:
+        dates, ordinals, loads = sheetToDayLoads(block)
+        if not len(dates):
+            continue
+
+        if last_ordinal is not None and ordinals[0] != last_ordinal + 1:
+            raise ValueError(f"Dates must be consecutive, but '{dates[0]}' does not follow the previous date.")
+        last_ordinal = ordinals[-1]
+
+        if day_filter is not None:
+            keep = day_filter(ordinals, loads)
+            dates, loads = dates[keep], loads[keep]
+
+        yield dayLoadsToFrame(dates, loads)
+
+
+def sheetToDayLoads(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Validate a sheet and return its normalized dates, their Gregorian ordinals and its day x 24 load matrix,
+    with NaN for empty cells.
+
+    Raises:
+        ValueError: As `sheetToLoadFrame` does.
+    """
+    missing_columns = [column for column in [DATE_COLUMN, *HOUR_COLUMNS] if column not in df.columns]
+    if missing_columns:
+        raise ValueError(f"Missing columns: {', '.join(missing_columns)}")
+
+    if df.empty:
+        return np.array([], dtype=str), np.array([], dtype=np.int64), np.empty((0, 24), dtype=np.float64)
+
+    dates = df[DATE_COLUMN].astype(str).str.strip().str.replace("/", "-", regex=False)
+    malformed = ~dates.str.fullmatch(r"\d{4}-\d{2}-\d{2}")
+    if malformed.any():
+        raise ValueError(f"The date '{df[DATE_COLUMN][malformed].iloc[0]}' is not in the proper '1401-01-23' format.")
+
+    dates = dates.to_numpy(dtype=str)
+    ordinals = jalaliDatesToOrdinals(dates)
+    gaps = np.flatnonzero(np.diff(ordinals) != 1)
+    if len(gaps):
+        raise ValueError(f"Dates must be consecutive, but '{dates[gaps[0] + 1]}' follows '{dates[gaps[0]]}'.")
+
+    raw_loads = df[HOUR_COLUMNS]
+    loads = raw_loads.apply(pd.to_numeric, errors="coerce")
+    non_numeric = loads.isna() & raw_loads.notna()
+    if non_numeric.to_numpy().any():
+        row, column = np.argwhere(non_numeric.to_numpy())[0]
+        raise ValueError(f"The load of {HOUR_COLUMNS[column]} on '{dates[row]}' is not a proper number.")
+
+    loads = loads.to_numpy(dtype=np.float64)
+    if (loads < 0).any():
+        row, column = np.argwhere(loads < 0)[0]
+        raise ValueError(f"The load of {HOUR_COLUMNS[column]} on '{dates[row]}' is negative.")
+
+    return dates, ordinals, loads
+
+
+def dayLoadsToFrame(dates: np.ndarray, loads: np.ndarray) -> pd.DataFrame:
+    """Melt the day x hour matrix into hourly rows, dropping the empty cells."""
+    present = ~np.isnan(loads).ravel()
+    day_index, hour_index = np.divmod(np.flatnonzero(present), 24)
+    datetimes = np.char.add(np.char.add(dates[day_index], " "), HOUR_STRINGS[hour_index])
+
+    return pd.DataFrame({"datetime": datetimes, "load_MWh": loads.ravel()[present]})
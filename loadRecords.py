@@ -0,0 +1,80 @@
+import datetime
+
+import numpy as np
+from beartype.typing import Sequence, Tuple
+
+from .dateConversion import jalaliDatesToOrdinals
+from .tehranTime import toLocalHour
+
+_EPOCH_ORDINAL = 719163
+"""Gregorian ordinal of 1970-01-01."""
+
+_JALALI_YEAR_LIMIT = 1700
+"""Dates written with a lower year are Jalali, and the others Gregorian."""
+
+
+def localHours(values: Sequence) -> np.ndarray:
+    """Local hours since the epoch of stored load datetimes, whatever their representation.
+
+    The hourly real load table stores naive local Gregorian datetimes, which is what the realLoad writers write.
+    Query classes may hand them back as `datetime` objects or as strings, so both are accepted: naive datetimes
+    are read as local time, aware ones are converted to Tehran time, and strings are read as
+    '%Y-%m-%d %H:%M:%S' ('/' separators and a 'T' also work), in Gregorian or, for years before 1700, Jalali.
+    Minutes and seconds are ignored.
+
+    Raises:
+        ValueError: If a string is not a valid datetime.
+    """
+    hours = np.empty(len(values), dtype=np.int64)
+    texts = []
+    text_index = []
+    for i, value in enumerate(values):
+        if isinstance(value, str):
+            texts.append(value)
+            text_index.append(i)
+        elif isinstance(value, datetime.datetime):
+            hours[i] = toLocalHour(value)
+        elif isinstance(value, datetime.date):
+            hours[i] = (value.toordinal() - _EPOCH_ORDINAL) * 24
+        else:
+            hours[i] = toLocalHour(value.astype("datetime64[us]").astype(datetime.datetime))
+
+    if texts:
+        hours[text_index] = _textLocalHours(np.array(texts, dtype=str))
+
+    return hours
+
+
+def hourlyRecords(records: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The local hours (as `localHours`), loads and sources of DB load records. Records without a datetime or a
+    load are ignored, and a missing source reads as None.
+
+    Raises:
+        ValueError: As `localHours` does.
+    """
+    records = [load for load in records if hasattr(load, "datetime") and hasattr(load, "load_MWh")]
+    return (
+        localHours([load.datetime for load in records]),
+        np.array([load.load_MWh for load in records], dtype=float),
+        np.array([getattr(load, "source", None) for load in records], dtype=object))
+
+
+def _textLocalHours(texts: np.ndarray) -> np.ndarray:
+    texts = np.char.replace(np.char.replace(np.char.strip(texts), "/", "-"), "T", " ")
+    codes = np.ascontiguousarray(np.char.ljust(texts, 13).astype("<U13")).view(np.uint32).reshape(-1, 13)
+    digits = codes.astype(np.int64) - ord("0")
+    if not ((digits[:, :4] >= 0) & (digits[:, :4] <= 9)).all():
+        raise ValueError("The stored datetimes are not in the '%Y-%m-%d %H:%M:%S' format.")
+
+    # A date without a time stands for its first hour
+    hour_digits = digits[:, 11:13]
+    has_hour = ((hour_digits >= 0) & (hour_digits <= 9)).all(axis=1)
+    hour_of_day = np.where(has_hour, hour_digits[:, 0] * 10 + hour_digits[:, 1], 0)
+
+    dates = texts.astype("<U10")
+    jalali = digits[:, :4] @ np.array([1000, 100, 10, 1]) < _JALALI_YEAR_LIMIT
+    ordinals = np.empty(len(texts), dtype=np.int64)
+    ordinals[jalali] = jalaliDatesToOrdinals(dates[jalali])
+    ordinals[~jalali] = dates[~jalali].astype("datetime64[D]").astype(np.int64) + _EPOCH_ORDINAL
+
+    return (ordinals - _EPOCH_ORDINAL) * 24 + hour_of_day
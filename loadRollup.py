@@ -0,0 +1,38 @@
+from beartype.typing import ClassVar
+from pydantic import BaseModel, Field
+
+
+class LoadRollup(BaseModel):
+    """Aggregated real load of a day or of a month."""
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "date": "1401/01/23",
+                "energy_MWh": 24150.5,
+                "peak_MW": 1320.0,
+                "peak_hour": 21,
+                "valley_MW": 705.2,
+                "hours_present": 24,
+            }
+        }
+
+        frozen = True
+
+    DATE_FORMAT: ClassVar[str] = "%Y/%m/%d"
+    """The format of a daily rollup's date"""
+
+    MONTH_FORMAT: ClassVar[str] = "%Y/%m"
+    """The format of a monthly rollup's date"""
+
+    date: str = Field(..., title="The Jalali day as '%Y/%m/%d', or month as '%Y/%m'")
+
+    energy_MWh: float = Field(..., title="Sum of the hourly loads")
+
+    peak_MW: float = Field(..., title="Highest hourly load")
+
+    peak_hour: int = Field(..., title="Hour of the day (0 to 23) of the highest load")
+
+    valley_MW: float = Field(..., title="Lowest hourly load")
+
+    hours_present: int = Field(..., title="Number of hours with a load")
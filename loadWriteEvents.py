@@ -0,0 +1,45 @@
+import logging
+
+import pandas as pd
+from beartype.typing import Callable, List
+from sqlalchemy.engine import Connection
+
+WriteListener = Callable[[int, pd.DataFrame], None]
+"""Called with a location and the hourly loads just written for it. The frame has a 'datetime' column of naive
+local Gregorian `datetime64` values (whole hours), plus 'load_MWh' and 'source' columns."""
+
+TransactionListener = Callable[[Connection, int, pd.DataFrame], None]
+"""Like `WriteListener`, but called with the connection of the write, before its transaction is committed."""
+
+_WRITE_LISTENERS: List[WriteListener] = []
+_TRANSACTION_LISTENERS: List[TransactionListener] = []
+
+
+def addWriteListener(listener: WriteListener) -> WriteListener:
+    """Register a listener notified after every committed real load write. Can be used as a decorator."""
+    _WRITE_LISTENERS.append(listener)
+    return listener
+
+
+def notifyLoadsWritten(location: int, written: pd.DataFrame):
+    """Must be called by every real load write path, once its transaction is committed. A failing listener is
+    logged and never fails the write."""
+    for listener in _WRITE_LISTENERS:
+        try:
+            listener(location, written)
+        except Exception as e:
+            logging.error(f"Real load write listener {listener.__name__} failed: {e}")
+
+
+def addTransactionListener(listener: TransactionListener) -> TransactionListener:
+    """Register a listener that runs inside the transaction of every bulk real load write, such as to maintain
+    derived tables. Can be used as a decorator."""
+    _TRANSACTION_LISTENERS.append(listener)
+    return listener
+
+
+def notifyTransaction(connection: Connection, location: int, written: pd.DataFrame):
+    """Must be called by bulk write paths right before committing. Unlike write listeners, a failing transaction
+    listener raises, so that the whole write is rolled back."""
+    for listener in _TRANSACTION_LISTENERS:
+        listener(connection, location, written)
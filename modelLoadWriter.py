@@ -0,0 +1,54 @@
+import asyncio
+import logging
+
+import pandas as pd
+from beartype.typing import List
+
+from pahbar.prediction.services.load.api.realLoad.route_defineLoads import writeLoadsToDB
+from pahbar.prediction.services.load.model.prediction.features.daily.load import RealLoadModel
+from .dailyRollups import refreshWrittenRollups
+from .dateConversion import jalaliDatetimesToGregorian
+from .dbExecutor import runQuery
+from .loadWriteEvents import notifyLoadsWritten
+
+
+def loadFrameToModels(load_frame: pd.DataFrame) -> List[RealLoadModel]:
+    """Build the `RealLoadModel` of each row of a frame with 'datetime' (Jalali '%Y-%m-%d %H:%M:%S'),
+    'load_MWh' and 'source' columns.
+
+    Raises:
+        Exception: Whatever `RealLoadModel` raises for a load it rejects.
+    """
+    return [
+        RealLoadModel(datetime=datetime_str, load_MWh=load, source=source)
+        for datetime_str, load, source in zip(
+            load_frame["datetime"].tolist(), load_frame["load_MWh"].tolist(), load_frame["source"].tolist())]
+
+
+async def writeLoadModels(location: int, load_frame: pd.DataFrame, models: List[RealLoadModel]):
+    """Write the models of `load_frame` through `writeLoadsToDB`, with all of its bookkeeping, then notify the write
+    listeners, as `RealLoadBulkWriter` does on commit, and refresh the daily rollups. The loads are committed by
+    then, so a failing refresh is logged rather than failing the write; the rollups of those days stay stale until
+    they're written again or rebuilt.
+
+    Raises:
+        Exception: Whatever `writeLoadsToDB` raises.
+    """
+    await runQuery(_writeModels, location, models)
+
+    written = pd.DataFrame({
+        "datetime": jalaliDatetimesToGregorian(load_frame["datetime"].to_numpy()),
+        "load_MWh": load_frame["load_MWh"].to_numpy(),
+        "source": load_frame["source"].to_numpy()})
+    notifyLoadsWritten(location, written)
+
+    try:
+        await runQuery(refreshWrittenRollups, location, written)
+    except Exception as e:
+        logging.error(f"Could not refresh the daily rollups of location {location} after a real load write: {e}")
+
+
+def _writeModels(location: int, models: List[RealLoadModel]):
+    """Run `writeLoadsToDB` to completion on the calling DB thread. It's a coroutine function, but its SQLAlchemy
+    calls block, so it gets an event loop of its own there rather than stalling the one serving requests."""
+    asyncio.run(writeLoadsToDB(location, models))
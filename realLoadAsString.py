@@ -1,10 +1,11 @@
-import jdatetime
+from datetime import date
+
 from beartype import beartype
-from jdatetime import datetime as jdatetime
 from pydantic import BaseModel, Field, ValidationError
 
 from pahbar.prediction.services.load.model.prediction.features.daily.load import RealLoadModel
 from pahbar.prediction.services.load.model.prediction.features.daily.load import dailyRealLoad
+from ..dateConversion import ordinalToJalaliDate, parseJalaliDatetime
 
 
 class RealLoadAsString(BaseModel):
@@ -23,8 +24,7 @@ class RealLoadAsString(BaseModel):
         Returns:
             _type_: _description_
         """
-        load_date = jdatetime.date.fromgregorian(
-            date=load.date).strftime(RealLoadAsString.DATE_FORMAT)
+        load_date = ordinalToJalaliDate(load.date.toordinal(), RealLoadAsString.DATE_FORMAT)
         loadDict = {
             f"H{i}": round(load.loads[hour].load_MW, ndeciaml)
             for i, hour in enumerate(RealLoadModel.Hour, 1)}
@@ -33,14 +33,7 @@ class RealLoadAsString(BaseModel):
     @beartype
     def toDailyRealLoad(self, location_id: int) -> RealLoadModel:
         try:
-            datetime_jdatetime = jdatetime.strptime(self.datetime, "%Y/%m/%d %H:%M:%S")
-
-            datetime = datetime_jdatetime.replace(minute=0, second=0)
-
-            load_date = datetime.togregorian()
-
-            to_datetime_formatted_str = datetime_jdatetime.strftime("%Y-%m-%d %H:%M:%S")
-
+            ordinal, to_datetime_formatted_str = parseJalaliDatetime(self.datetime)
 
         except ValueError:
             raise ValueError("The given datetime string is not in the proper '1401/01/23 12:00:00' format")
@@ -52,7 +45,7 @@ class RealLoadAsString(BaseModel):
             raise ValueError("The given load is not a proper number.")
 
 
-        if load_date.year > 2100:
+        if date.fromordinal(ordinal).year > 2100:
             raise ValueError("The given date for load is incorrect. Probably it's in Jalali format.")
 
         try:
@@ -0,0 +1,224 @@
+import datetime
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from beartype.typing import Dict, List, Optional, Tuple
+
+from .dbProvider import getEngine, getMetadata
+from .loadRecords import hourlyRecords
+from .loadWriteEvents import addWriteListener
+from .tehranTime import TEHRAN_TZ
+from ...db.load import RealHourlyLoadQueries
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+class LoadRing:
+    """The hourly loads of one location over a sliding window of the last days, as a float64 ring buffer plus a
+    presence mask. Hour `h` (local hours since the epoch) lives in slot `h % len(loads)`, and the window is
+    [end_hour - len(loads), end_hour)."""
+
+    def __init__(self, days: int):
+        # float64, as stored in the DB, so that loads read from the ring are exactly those read from the DB
+        self.loads = np.zeros(days * 24, dtype=np.float64)
+        self.present = np.zeros(days * 24, dtype=bool)
+        self.end_hour: Optional[int] = None
+        self.built_at = time.monotonic()
+
+    @property
+    def start_hour(self) -> int:
+        return self.end_hour - len(self.loads)
+
+    def advance(self, end_hour: int) -> Tuple[int, int]:
+        """Slide the window so that it ends at `end_hour`, clearing the slots of the hours that enter it. Returns the
+        range of hours [from, to) that entered the window, and that must now be read from the DB."""
+        from_hour = end_hour - len(self.loads) if self.end_hour is None else max(self.end_hour, end_hour - len(self.loads))
+        if from_hour < end_hour:
+            slots = np.arange(from_hour, end_hour) % len(self.loads)
+            self.loads[slots] = 0.0
+            self.present[slots] = False
+        self.end_hour = max(end_hour, self.end_hour or end_hour)
+        return from_hour, end_hour
+
+    def mark(self, hours: np.ndarray, loads: np.ndarray):
+        """Store these loads, ignoring the hours out of the window. NaN loads are stored as absent."""
+        within = (hours >= self.start_hour) & (hours < self.end_hour)
+        slots = hours[within] % len(self.loads)
+        self.loads[slots] = np.nan_to_num(loads[within])
+        self.present[slots] = ~np.isnan(loads[within])
+
+    def read(self, from_hour: int, to_hour: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Copies of the loads and presence mask of hours [from_hour, to_hour), or None if they're not all
+        within the window."""
+        if from_hour < self.start_hour or to_hour > self.end_hour:
+            return None
+        slots = np.arange(from_hour, to_hour) % len(self.loads)
+        return self.loads[slots], self.present[slots]
+
+    def nbytes(self) -> int:
+        return self.loads.nbytes + self.present.nbytes
+
+
+class RecentLoadStore:
+    """An opt-in, in-process copy of the last `days` days of hourly load of the most recently read locations.
+    A location's ring is filled from the DB on first use, slid forward day by day, and kept up to date by every
+    real load write. Memory is bounded by `max_locations` rings of `days * 24 * 9` bytes each.
+
+    Rings are rebuilt after `rebuild_seconds`, which bounds how long a write that didn't notify, such as one from
+    another process, goes unseen.
+    """
+
+    def __init__(self, days: int = 42, max_locations: int = 64, rebuild_seconds: float = 60.0,
+                 enabled: bool = False):
+        self.days = days
+        self.max_locations = max_locations
+        self.rebuild_seconds = rebuild_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._rings: "OrderedDict[int, LoadRing]" = OrderedDict()
+        self._pending_writes: Dict[int, List[pd.DataFrame]] = {}
+        self._build_locks: Dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def hourlyLoads(self, location: int, from_hour: int, to_hour: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """The loads and the presence mask of hours [from_hour, to_hour) of this location (local hours
+        since the epoch), or None if the store is disabled or doesn't cover the whole range.
+
+        Raises:
+            Exception: Whatever `RealHourlyLoadQueries` raises when a ring is filled.
+        """
+        if not self.enabled:
+            return None
+
+        ring = self._ring(location)
+        with self._lock:
+            result = ring.read(from_hour, to_hour)
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return result
+
+    def invalidate(self, location: Optional[int] = None):
+        with self._lock:
+            if location is None:
+                self._rings.clear()
+            else:
+                self._rings.pop(location, None)
+
+    def onWrite(self, location: int, written: pd.DataFrame):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if location in self._pending_writes:
+                self._pending_writes[location].append(written)
+
+            ring = self._rings.get(location)
+            if ring is not None:
+                _markWritten(ring, written)
+
+    def stats(self) -> Dict[str, int]:
+        """`bytes` is the memory held by all the rings; each ring takes `bytes_per_location`."""
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses, "locations": len(self._rings),
+                "bytes_per_location": self.days * 24 * (np.dtype(np.float64).itemsize + 1),
+                "bytes": sum(ring.nbytes() for ring in self._rings.values())}
+
+    def _ring(self, location: int) -> LoadRing:
+        """Return the ring of this location, filling or sliding it from the DB if needed. Only one thread fills a
+        given location at a time, and writes that land meanwhile are replayed on top of the result."""
+        end_hour = _todayEndHour()
+        with self._lock:
+            ring = self._rings.get(location)
+            if self._isCurrent(ring, end_hour):
+                self._rings.move_to_end(location)
+                return ring
+            build_lock = self._build_locks.setdefault(location, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                ring = self._rings.get(location)
+                if self._isCurrent(ring, end_hour):
+                    return ring
+                if ring is None or time.monotonic() - ring.built_at >= self.rebuild_seconds:
+                    ring = LoadRing(self.days)
+                else:
+                    # Slide a copy, so that readers never see the cleared slots before they're filled again
+                    ring = _copyRing(ring)
+                self._pending_writes[location] = []
+
+            try:
+                from_hour, to_hour = ring.advance(end_hour)
+                hours, loads = _readHourlyLoads(location, from_hour, to_hour)
+                ring.mark(hours, loads)
+            except Exception:
+                with self._lock:
+                    self._pending_writes.pop(location, None)
+                raise
+
+            with self._lock:
+                for written in self._pending_writes.pop(location):
+                    _markWritten(ring, written)
+                self._rings[location] = ring
+                self._rings.move_to_end(location)
+                while len(self._rings) > self.max_locations:
+                    self._rings.popitem(last=False)
+
+            logging.info(
+                f"Filled hours [{from_hour}, {to_hour}) of the recent load ring of location {location}; "
+                f"{len(self._rings)} rings hold {self.stats()['bytes']} bytes")
+            return ring
+
+    def _isCurrent(self, ring: Optional[LoadRing], end_hour: int) -> bool:
+        return (ring is not None and ring.end_hour >= end_hour
+                and time.monotonic() - ring.built_at < self.rebuild_seconds)
+
+
+RECENT_LOAD_STORE = RecentLoadStore(
+    days=int(os.getenv("REALLOAD_RECENT_DAYS", "42")),
+    max_locations=int(os.getenv("REALLOAD_RECENT_MAX_LOCATIONS", "64")),
+    rebuild_seconds=float(os.getenv("REALLOAD_RECENT_REBUILD_SECONDS", "60")),
+    enabled=os.getenv("REALLOAD_RECENT_CACHE", "0") == "1")
+"""Serves `/realLoad/fetchLoads` when enabled, with REALLOAD_RECENT_CACHE=1."""
+
+addWriteListener(RECENT_LOAD_STORE.onWrite)
+
+
+def _todayEndHour() -> int:
+    """The end of the window: the first hour of tomorrow, local time."""
+    today = datetime.datetime.now(TEHRAN_TZ).date()
+    return (today.toordinal() + 1 - _EPOCH.toordinal()) * 24
+
+
+def _readHourlyLoads(location: int, from_hour: int, to_hour: int) -> Tuple[np.ndarray, np.ndarray]:
+    if from_hour >= to_hour:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    from_datetime = TEHRAN_TZ.localize(_EPOCH + datetime.timedelta(hours=from_hour))
+    to_datetime = TEHRAN_TZ.localize(_EPOCH + datetime.timedelta(hours=to_hour, microseconds=-1))
+    with RealHourlyLoadQueries(getEngine(), getMetadata()) as q:
+        db_records = q.selectByDate(location, from_datetime, to_datetime) or []
+
+    hours, loads, _ = hourlyRecords(db_records)
+    return hours, loads
+
+
+def _markWritten(ring: LoadRing, written: pd.DataFrame):
+    hours = written["datetime"].to_numpy().astype("datetime64[h]").astype(np.int64)
+    ring.mark(hours, written["load_MWh"].to_numpy(dtype=float))
+
+
+def _copyRing(ring: LoadRing) -> LoadRing:
+    copy = LoadRing(len(ring.loads) // 24)
+    copy.loads[:], copy.present[:] = ring.loads, ring.present
+    copy.end_hour, copy.built_at = ring.end_hour, ring.built_at
+    return copy
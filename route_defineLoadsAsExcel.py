@@ -1,26 +1,25 @@
-import datetime
 import logging
-from beartype.typing import Dict
-from beartype.typing import List
+from beartype.typing import BinaryIO, Dict
+from beartype.typing import List, Optional, Union
 
-import pandas as pd
-from fastapi import APIRouter, Depends, UploadFile
+from fastapi import APIRouter, Depends, Query, UploadFile
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 
-from pahbar.prediction.services.auth.db import UserQueries
-from pahbar.prediction.services.auth.model import User
-from pahbar.prediction.services.auth.utils.get_current_user import get_current_user
-from pahbar.prediction.services.load.api.realLoad.route_defineLoads import writeLoadsToDB
 from pahbar.prediction.services.load.exc import APIException
-from pahbar.prediction.services.load.model.prediction.features.daily.load import RealLoadModel
-from pahbar.prediction.services.util import DatabaseUtils
+from .bulkLoadWriter import RealLoadBulkWriter, bulkWriteEnabled, writeLoadFrameToDB
+from .dayDigests import DeltaFilter
+from .dbExecutor import runQuery
+from .dbProvider import getEngine, getMetadata
+from .instrumentation import phase, recordRows
+from .loadFileReader import readLoadSheet, streamLoadFrames
+from .loadFrames import sheetToLoadFrame
+from .modelLoadWriter import loadFrameToModels, writeLoadModels
+from .userLocation import getUserLocation
 
 END_POINT = "/realLoad/defineLoadsAsExcel"
 route_realLoad_defineLoadsAsExcel = APIRouter()
 
-DB_ENGINE = DatabaseUtils.createEngine()
-DB_METADATA = DatabaseUtils.createMetdata()
-
 extra_responses = {
     400: {
         "model": APIException,
@@ -32,49 +31,100 @@ extra_responses = {
 
 
 @route_realLoad_defineLoadsAsExcel.post(
-    END_POINT, response_model=Dict[str, List], responses=extra_responses)
+    END_POINT, response_model=Dict[str, Union[List[str], int]], responses=extra_responses)
 async def defineRealLoadAsExcelFile(
-        file: UploadFile, user: User = Depends(get_current_user)) -> dict[str, List[str]]:
+        file: UploadFile, streaming: bool = Query(False),
+        loc_id: int = Depends(getUserLocation)) -> Dict[str, Union[List[str], int]]:
     """Set or replace real loads, using an excel file format. The excel file must contain a column, with name "تاریخ" together with 24 other columns named H1 to H24, each of which represent the load of a particular hour. Note that the dates have to be consecutive and no date must be missing in between, otherwise a '400' error is returned.
+
+    A CSV file with the same columns is accepted as well. With `streaming`, the file is read, validated and written block by block with bounded memory, and the first bad block fails the whole upload. Streaming writes through the bulk writer, so it is refused with a '400' error where that is off (REALLOAD_BULK_WRITE).
+
+    Only days that differ from the stored loads are written. The response counts the 'changed', 'unchanged' and 'new' days of the file.
     """
-    user_obj = UserQueries(DB_ENGINE, DB_METADATA)
-    user_db = user_obj.get_user_by_username(user.username)
-    loc_id = user_db.location
+    delta = DeltaFilter(loc_id)
+    if streaming:
+        if not bulkWriteEnabled():
+            raise HTTPException(
+                status_code=400, detail="Streaming uploads are not enabled on this server; upload without `streaming`.")
+
+        try:
+            with phase("excel_stream"):
+                rows_written = await runQuery(streamLoadFileToDB, loc_id, file.file, file.filename, delta)
+            recordRows("db_write", rows_written)
+        except ValueError as e:
+            logging.error(f"Could not convert uploaded data to loads: {e}")
+            raise HTTPException(
+                status_code=400, detail=str(e))
+        except Exception as e:
+            logging.error(f"Could not write loads to the database: {e}")
+            raise HTTPException(
+                status_code=500, detail=str(e))
+
+        return {"message": ["داده بار با موفقیت ثبت شد"], **delta.counts()}
 
     try:
-        df = pd.read_excel(file.file)
+        with phase("excel_parse"):
+            df = await run_in_threadpool(readLoadSheet, file.file, file.filename)
+        recordRows("excel_parse", len(df))
     except Exception as e:
-        logging.error(f"Could not read Excel file: {e}")
+        logging.error(f"Could not read uploaded file: {e}")
         raise HTTPException(
             status_code=400, detail="Error reading Excel file.")
 
-        # Convert Excel data to loadCorrection objects
+    # Convert Excel data to hourly loads, validated as whole columns, keeping only the days that changed
     try:
-        loads = []
-        for index, row in df.iterrows():
-            date = str(row["date"])
-            for hour in range(0, 24):
-                time = datetime.time(hour=hour, minute=0, second=0)
-                datetime_str = f"{date} {time.strftime('%H:%M:%S')}"
-                load = row[f"H{hour}"]
-                if pd.isna(load):
-                    continue
-                load = RealLoadModel(
-                    datetime=datetime_str,
-                    load_MWh=float(load),
-                    source="manual"
-                )
-                loads.append(load)
+        with phase("excel_convert"):
+            load_frame = await runQuery(sheetToLoadFrame, df, delta)
     except Exception as e:
-        logging.error(f"Could not convert Excel data to loadCorrection objects: {e}")
+        logging.error(f"Could not convert Excel data to loads: {e}")
         raise HTTPException(
             status_code=400, detail=str(e))
-        # Write loads to the database
+
+    load_frame = load_frame.assign(source="manual")
+    bulk_write = bulkWriteEnabled()
+    if not bulk_write:
+        # Models are only built here, at the DB boundary. A load they reject is the upload's fault.
+        try:
+            with phase("validation"):
+                loads = loadFrameToModels(load_frame)
+        except Exception as e:
+            logging.error(f"Could not convert Excel data to loadCorrection objects: {e}")
+            raise HTTPException(
+                status_code=400, detail=str(e))
+
+    # Write loads to the database
     try:
-        await writeLoadsToDB(loc_id, loads)
+        with phase("db_write"):
+            if bulk_write:
+                await runQuery(writeLoadFrameToDB, loc_id, load_frame)
+            else:
+                await writeLoadModels(loc_id, load_frame, loads)
+        recordRows("db_write", len(load_frame))
     except Exception as e:
         logging.error(f"Could not write loads to the database: {e}")
         raise HTTPException(
             status_code=500, detail=str(e))
 
-    return {"message": ["داده بار با موفقیت ثبت شد"]}
+    return {"message": ["داده بار با موفقیت ثبت شد"], **delta.counts()}
+
+
+def streamLoadFileToDB(
+        location: int, file: BinaryIO, filename: Optional[str], delta: Optional[DeltaFilter] = None) -> int:
+    """Stream an uploaded file into the DB in one transaction, block by block, through `RealLoadBulkWriter`. Only
+    call it when `bulkWriteEnabled`. Only the days kept by `delta` are written; it reads the stored days over the
+    writer's connection, so the upload holds a single pooled connection. Returns the number of rows written.
+
+    Raises:
+        ValueError: If a block of the file is not valid. Nothing is written in this case.
+    """
+    with RealLoadBulkWriter(getEngine(), getMetadata()) as writer:
+        if delta is not None:
+            delta.connection = writer.connection
+        try:
+            for load_frame in streamLoadFrames(file, filename, day_filter=delta):
+                writer.write(location, load_frame.assign(source="manual"))
+        finally:
+            if delta is not None:
+                delta.connection = None
+
+    return writer.rows_written
@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import logging
+
+from beartype.typing import Iterator, Optional
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+from fastapi.responses import StreamingResponse
+
+from pahbar.prediction.services.load.exc import APIException
+from .dateConversion import jalaliDateToOrdinal
+from .loadExport import decodeCursor, encodeCursor, iterDayLoads
+from .loadFrames import DATE_COLUMN, HOUR_COLUMNS
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/exportLoads"
+
+route_realLoad_exportLoads = APIRouter()
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_exportLoads.get(END_POINT, responses=extra_responses, response_class=StreamingResponse)
+async def exportRealLoads(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        export_format: str = Query("ndjson", alias="format", description="Either 'ndjson' or 'csv'"),
+        cursor: Optional[str] = Query(None, description="The cursor of the last row received, to resume an export"),
+        loc_id: int = Depends(getUserLocation)) -> StreamingResponse:
+    """Stream the real loads between `from_date` and `to_date` as one row per day (date plus H0 to H23, as in `/realLoad/fetchLoads`), either as NDJSON or as CSV. Rows are sent as they are read, with constant memory. Each row carries a `cursor`; passing the cursor of the last row received resumes the export right after it.
+
+    If reading fails once the rows have started, the response is aborted rather than ended, so a client sees a broken transfer instead of a complete-looking export, and can resume it with its last cursor.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"format must be one of {', '.join(EXPORT_FORMATS)}.")
+
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    if cursor is not None:
+        try:
+            # A cursor past to_date, such as the last one of a finished export, resumes into an empty export
+            from_ordinal = max(from_ordinal, decodeCursor(cursor))
+        except ValueError as e:
+            raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    rows = _ndjsonRows if export_format == "ndjson" else _csvRows
+    return StreamingResponse(rows(loc_id, from_ordinal, to_ordinal), media_type=EXPORT_FORMATS[export_format])
+
+
+def _ndjsonRows(location: int, from_ordinal: int, to_ordinal: int) -> Iterator[str]:
+    try:
+        for date, ordinal, loads in iterDayLoads(location, from_ordinal, to_ordinal):
+            row = {DATE_COLUMN: date, **dict(zip(HOUR_COLUMNS, loads.tolist())), "cursor": encodeCursor(ordinal + 1)}
+            yield json.dumps(row) + "\n"
+    except Exception as e:
+        # The status line is already sent, so the error can only abort the response: re-raised, the connection is
+        # dropped mid-body instead of being ended cleanly, and the client knows to resume with its last cursor.
+        logging.error(f"Real load export of location {location} failed: {e}")
+        raise
+
+
+def _csvRows(location: int, from_ordinal: int, to_ordinal: int) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([DATE_COLUMN, *HOUR_COLUMNS, "cursor"])
+    try:
+        for date, ordinal, loads in iterDayLoads(location, from_ordinal, to_ordinal):
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([date, *loads.tolist(), encodeCursor(ordinal + 1)])
+        yield buffer.getvalue()
+    except Exception as e:
+        logging.error(f"Real load export of location {location} failed: {e}")
+        raise
@@ -0,0 +1,80 @@
+import logging
+import math
+import os
+import tempfile
+
+import openpyxl
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+
+from pahbar.prediction.services.load.exc import APIException
+from .dateConversion import jalaliDateToOrdinal
+from .dbExecutor import runQuery
+from .loadExport import iterDayLoads
+from .loadFrames import DATE_COLUMN, HOUR_COLUMNS
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/exportLoadsAsExcel"
+
+route_realLoad_exportLoadsAsExcel = APIRouter()
+
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+    500: {
+        "model": APIException,
+        "description": "فایل اکسل ساخته نشد. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_exportLoadsAsExcel.get(END_POINT, responses=extra_responses, response_class=FileResponse)
+async def exportRealLoadsAsExcel(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        loc_id: int = Depends(getUserLocation)) -> FileResponse:
+    """Download the real loads between `from_date` and `to_date` as an Excel file, in the exact layout `/realLoad/defineLoadsAsExcel` accepts: a `date` column plus H0 to H23, one row per day, with empty cells where no load exists. The file can thus be edited and uploaded back as is.
+    """
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    try:
+        path = await runQuery(writeLoadsWorkbook, loc_id, from_ordinal, to_ordinal)
+    except Exception as e:
+        logging.error(f"Could not export the loads of location {loc_id} as Excel: {e}")
+        raise exceptions.HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "فایل اکسل ساخته نشد. دوباره تلاش کنید.")
+
+    filename = f"realLoad_{from_date.replace('/', '-')}_{to_date.replace('/', '-')}.xlsx"
+    return FileResponse(
+        path, media_type=EXCEL_MEDIA_TYPE, filename=filename, background=BackgroundTask(os.remove, path))
+
+
+def writeLoadsWorkbook(location: int, from_ordinal: int, to_ordinal: int) -> str:
+    """Write the loads to a temporary workbook and return its path. The workbook is write-only, so rows go
+    straight to disk and memory stays bounded whatever the length of the range."""
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([DATE_COLUMN, *HOUR_COLUMNS])
+    for date, _, loads in iterDayLoads(location, from_ordinal, to_ordinal, every_day=True):
+        sheet.append([date, *(None if math.isnan(load) else load for load in loads.tolist())])
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx") as temporary:
+        path = temporary.name
+    try:
+        workbook.save(path)
+    except Exception:
+        os.remove(path)
+        raise
+
+    return path
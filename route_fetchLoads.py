@@ -1,17 +1,22 @@
 import logging
-from collections import defaultdict
-from datetime import datetime
-from typing import List
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
-import pytz
+import numpy as np
 from fastapi import APIRouter
-from fastapi import HTTPException, Depends, Query
+from fastapi import HTTPException, Depends, Query, Request, Response
 from fastapi import status
 
-from pahbar.prediction.services.auth.db import UserQueries
-from pahbar.prediction.services.auth.model import User
-from pahbar.prediction.services.auth.utils.get_current_user import get_current_user
-from pahbar.prediction.services.util import DatabaseUtils
+from .conditionalResponses import conditionalJSONResponse
+from .dateConversion import ordinalsToJalaliDates
+from .dbExecutor import runQuery
+from .dbProvider import getEngine, getMetadata
+from .instrumentation import phase, recordRows
+from .loadFormats import dayLoadMatrix, formatDays, formatHourlyLoads, format_loads, hourlyLoadRow, serializeColumnar
+from .loadRecords import hourlyRecords
+from .recentLoadStore import RECENT_LOAD_STORE
+from .tehranTime import TEHRAN_TZ, localDayBounds, toLocalHour
+from .userLocation import getUserLocation
 from ...db.load import RealHourlyLoadQueries
 from ...exc import APIException
 from ...model.location import DISCo
@@ -20,8 +25,12 @@ END_POINT = "/realLoad/fetchLoads"
 
 route_realLoad_fetchLoads = APIRouter()
 
-DB_ENGINE = DatabaseUtils.createEngine()
-DB_METADATA = DatabaseUtils.createMetdata()
+_EPOCH_ORDINAL = 719163
+"""Gregorian ordinal of 1970-01-01."""
+
+FETCH_FORMATS = ("records", "columnar")
+
+OCTET_STREAM_MEDIA_TYPE = "application/octet-stream"
 
 responses = {
     400: {
@@ -36,58 +45,196 @@ responses = {
 @route_realLoad_fetchLoads.get(
     END_POINT, description=(
             "Fetch the loads for the given timestamp. The timestamp should be provided in Unix format (seconds since the epoch). "
-            "This endpoint uses the same date for both `fromDate` and `toDate`. Timestamps are truncated to the hour, ignoring minutes, seconds, and microseconds."
+            "This endpoint uses the same date for both `fromDate` and `toDate`. Timestamps are truncated to the hour, ignoring minutes, seconds, and microseconds. "
+            "With `format=columnar`, the response is `{\"dates\": [...], \"loads\": [[H0, ..., H23], ...]}`, one row per requested date, "
+            "or, when `application/octet-stream` is accepted, the rows as little-endian float32 with the dates in the `X-Load-Dates` header."
     ))
 async def fetchRealLoads(
+        request: Request,
         dates: List[int]= Query(),
-        user: User = Depends(get_current_user)):
+        response_format: str = Query("records", alias="format", description="Either 'records' or 'columnar'"),
+        loc_id: int = Depends(getUserLocation)) -> Response:
     """
     Fetch the loads for a given timestamp. This assumes that both `fromDate` and `toDate` are derived
     from the same timestamp provided via `dates`. If no load exists for the given timestamp,
     the returned model has empty string for load of each hour.
+
+    The columnar format has a row for every requested date, in request order, with 0.0 for the hours without a
+    positive load, and skips the per-hour objects altogether.
+
+    The response carries an ETag, and `If-None-Match` is answered with 304 until loads of this location are written.
     """
+    if response_format not in FETCH_FORMATS:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"format must be one of {', '.join(FETCH_FORMATS)}.")
+
     try:
-        # Iterate over dates
-        formatted_loads = []
-        for date in dates:
-            date_datetime = datetime.utcfromtimestamp(date).replace(tzinfo=pytz.utc)
-            iran_tz = pytz.timezone('Asia/Tehran')
-            dt_local = date_datetime.astimezone(iran_tz)
+        # Bound every requested timestamp to its local day, all at once
+        ordinals, day_starts, day_ends = localDayBounds(np.array(dates, dtype=np.int64))
+
+        # Only the distinct days need datetimes
+        bounds = {}
+        for ordinal, day_start, day_end in zip(ordinals.tolist(), day_starts.tolist(), day_ends.tolist()):
+            if ordinal not in bounds:
+                bounds[ordinal] = (
+                    datetime.fromtimestamp(day_start, TEHRAN_TZ),
+                    TEHRAN_TZ.normalize(datetime.fromtimestamp(day_end, TEHRAN_TZ) - timedelta(microseconds=1)))
+        days = [bounds[ordinal] for ordinal in ordinals.tolist()]
+        day_dates = ordinalsToJalaliDates(ordinals).tolist() if response_format == "columnar" else None
+
+    except (ValueError, OverflowError, OSError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid Unix timestamp format."
+        )
+
+    params = f"fetchLoads:{','.join(map(str, dates))}"
+    if response_format == "records":
+        return await conditionalJSONResponse(request, loc_id, params, lambda: fetchFormattedLoads(loc_id, days))
+
+    if OCTET_STREAM_MEDIA_TYPE in request.headers.get("accept", ""):
+        return await conditionalJSONResponse(
+            request, loc_id, f"{params}:float32", lambda: fetchLoadMatrix(loc_id, days),
+            serialize=lambda matrix: matrix.astype("<f4").tobytes(), media_type=OCTET_STREAM_MEDIA_TYPE,
+            headers={"X-Load-Dates": ",".join(day_dates), "Vary": "Accept"})
+
+    return await conditionalJSONResponse(
+        request, loc_id, f"{params}:columnar", lambda: fetchLoadMatrix(loc_id, days),
+        serialize=lambda matrix: serializeColumnar(day_dates, matrix), headers={"Vary": "Accept"})
+
+
+async def fetchFormattedLoads(location: int, days: List[Tuple[datetime, datetime]]):
+    """The payload of `/realLoad/fetchLoads`: the formatted loads of each requested day, in request order."""
+    if not days:
+        return {"ExpectedLoad": []}
+
+    loads_by_day = await runQuery(queryRealLoadsByDays, location, days)
+
+    # Keep the order (and repetitions) of the requested dates
+    formatted_loads = []
+    for from_datetime, _ in days:
+        formatted_loads.extend(loads_by_day[from_datetime.date()])
+
+    if not formatted_loads:
+        return {"ExpectedLoad": []}
+
+    return formatted_loads
+
+
+async def fetchLoadMatrix(location: int, days: List[Tuple[datetime, datetime]]) -> np.ndarray:
+    """The payload of `/realLoad/fetchLoads?format=columnar`: a day×24 matrix of the loads of each requested day,
+    in request order."""
+    if not days:
+        return np.zeros((0, 24))
+
+    return await runQuery(queryLoadMatrix, location, days)
+
+
+def queryRealLoadsByDays(location: int, days: List[Tuple[datetime, datetime]]) -> Dict[date, list]:
+    """Query the loads of several local days at once. Days are de-duplicated and adjacent days are merged into a
+    single `selectByDate` range, all over one DB session. Returns the formatted loads of each day, keyed by its
+    local date, exactly as `queryRealLoadsFromDB` would have returned them for that day alone. When the recent
+    load store covers every day, the DB isn't read at all."""
+    day_bounds = {}
+    for from_datetime, to_datetime in days:
+        day_bounds.setdefault(from_datetime.date(), (from_datetime, to_datetime))
 
-            # Align to the start of the hour
-            date_datetime = dt_local.replace(minute=0, second=0, microsecond=0)
+    recent_loads, db_records = readDayLoads(location, day_bounds)
+    if recent_loads is not None:
+        return {day: formatHourlyLoads(*hourly) for day, hourly in recent_loads.items()}
 
-            # Set the same timestamp for fromDate and toDate
-            from_datetime = dt_local.replace(hour=0, minute=0, second=0, microsecond=0)
+    # Split the rows back into days in a single pass, keyed by the local day of their normalized datetime
+    hours, loads, _ = hourlyRecords(db_records)
+    positive = loads > 0
+    formatted_days = formatDays(hours[positive], loads[positive])
+    day_ordinals = np.unique(hours[positive] // 24) + _EPOCH_ORDINAL
+    loads_by_ordinal = dict(zip(day_ordinals.tolist(), formatted_days))
 
-            # Align to the end of the day (23:59:59)
-            to_datetime = date_datetime.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return {
+        day: [loads_by_ordinal[day.toordinal()]] if day.toordinal() in loads_by_ordinal else []
+        for day in day_bounds}
 
-            # Query the database
-            user_obj = UserQueries(DB_ENGINE, DB_METADATA)
-            user_db = user_obj.get_user_by_username(user.username)
-            loc_id = user_db.location
 
-            loads = queryRealLoadsFromDB(loc_id, from_datetime, to_datetime)
-            formatted_loads.extend(loads)
+def queryLoadMatrix(location: int, days: List[Tuple[datetime, datetime]]) -> np.ndarray:
+    """The columnar counterpart of `queryRealLoadsByDays`: one row of 24 loads per requested day, in request order
+    and with repetitions, with the positive loads at their hour of the day and 0.0 elsewhere. The rows are filled
+    straight from the DB rows or the recent load store, without building a record per hour."""
+    day_bounds = {}
+    for from_datetime, to_datetime in days:
+        day_bounds.setdefault(from_datetime.date(), (from_datetime, to_datetime))
+    day_rows = {day: row for row, day in enumerate(day_bounds)}
 
-        if not formatted_loads:
-            return {"ExpectedLoad": []}
+    recent_loads, db_records = readDayLoads(location, day_bounds)
+    if recent_loads is not None:
+        matrix = np.stack([hourlyLoadRow(*recent_loads[day]) for day in day_bounds])
+    else:
+        matrix = dayLoadMatrix(db_records, [day.toordinal() for day in day_bounds])
 
-        return formatted_loads
+    return matrix[[day_rows[from_datetime.date()] for from_datetime, _ in days]]
 
-    except (ValueError, OverflowError):
+
+def readDayLoads(location: int, day_bounds: Dict[date, Tuple[datetime, datetime]]) \
+        -> Tuple[Optional[Dict[date, Tuple[int, np.ndarray, np.ndarray]]], list]:
+    """Read the loads of these days, either all from the recent load store, as the first local hour, loads and
+    presence mask of each day, or else all from the DB, as its records. The other one is returned as None or
+    empty.
+
+    Raises:
+        HTTPException: 500 if the loads could not be read.
+    """
+    try:
+        recent_loads = {}
+        with phase("recent_loads"):
+            for day, (from_datetime, to_datetime) in day_bounds.items():
+                from_hour = toLocalHour(from_datetime)
+                hourly = RECENT_LOAD_STORE.hourlyLoads(location, from_hour, toLocalHour(to_datetime) + 1)
+                if hourly is None:
+                    break
+                recent_loads[day] = (from_hour, *hourly)
+            else:
+                return recent_loads, []
+
+        db_records = []
+        with phase("db_query"), RealHourlyLoadQueries(getEngine(), getMetadata()) as q:
+            for from_datetime, to_datetime in mergeAdjacentDays(day_bounds):
+                db_records.extend(q.selectByDate(location, from_datetime, to_datetime) or [])
+        recordRows("db_query", len(db_records))
+    except Exception as e:
+        logging.error(f"Could not read loads from DB: {e}")
         raise HTTPException(
-            status_code=400,
-            detail="Invalid Unix timestamp format."
-        )
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e))
+
+    return None, db_records
+
+
+def mergeAdjacentDays(day_bounds: Dict[date, Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Merge the (from, to) bounds of consecutive days into the fewest possible ranges."""
+    ranges = []
+    previous_day = None
+    for day in sorted(day_bounds):
+        from_datetime, to_datetime = day_bounds[day]
+        if previous_day is not None and day - previous_day == timedelta(days=1):
+            ranges[-1] = (ranges[-1][0], to_datetime)
+        else:
+            ranges.append((from_datetime, to_datetime))
+        previous_day = day
+
+    return ranges
 
 
 def queryRealLoadsFromDB(location: int, from_datetime: datetime, to_datetime: datetime):
     """Query loads from db. If no load exists for a given timestamp, then the returned model has empty string for load of each hour of that day."""
     try:
-        with RealHourlyLoadQueries(DB_ENGINE, DB_METADATA) as q:
+        # The first whole hour from `from_datetime` on, up to the hour of `to_datetime`
+        from_hour = toLocalHour(from_datetime + timedelta(hours=1, microseconds=-1))
+        hourly = RECENT_LOAD_STORE.hourlyLoads(location, from_hour, toLocalHour(to_datetime) + 1)
+        if hourly is not None:
+            return formatHourlyLoads(from_hour, *hourly)
+
+        with phase("db_query"), RealHourlyLoadQueries(getEngine(), getMetadata()) as q:
             db_records = q.selectByDate(location, from_datetime, to_datetime)
+            recordRows("db_query", len(db_records or []))
             if db_records:
                 return format_loads(db_records)
             else:
@@ -97,26 +244,3 @@ def queryRealLoadsFromDB(location: int, from_datetime: datetime, to_datetime: da
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e))
-
-
-def format_loads(loads):
-    # Initialize a dictionary to hold data by date, with all hours initially set to 0.0
-    date_loads = defaultdict(lambda: {f"H{i}": 0.0 for i in range(0, 24)})
-
-    for load in loads:
-        # Ensure the outage has the expected fields
-        if hasattr(load, 'datetime') and hasattr(load, 'load_MWh'):
-            date = load.datetime[:10]  # Extract date
-            hour = int(load.datetime[11:13])  # Extract hour (e.g., "14" -> Hour 14)
-
-            # Only update if load_MWh is greater than 0
-            if load.load_MWh > 0:
-                date_loads[date][f"H{hour}"] = load.load_MWh
-
-    # Create the final formatted list of loads
-    formatted_loads = [
-        {"date": date, **hours} for date, hours in date_loads.items()
-    ]
-
-    # Return sorted list by date
-    return formatted_loads
@@ -0,0 +1,81 @@
+import logging
+import os
+import shutil
+import tempfile
+
+from beartype.typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, UploadFile
+from fastapi import status
+from fastapi.concurrency import run_in_threadpool
+
+from pahbar.prediction.services.load.exc import APIException
+from .dbExecutor import runQuery
+from .ingestionJobs import TooManyJobsError, getJobStatus, submitJob
+from .models import IngestionJobStatus
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/defineLoadsAsJob"
+STATUS_END_POINT = "/realLoad/ingestionJobs/{job_id}"
+
+route_realLoad_ingestionJobs = APIRouter()
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "فایل ارسالی قابل خواندن نیست."},
+    429: {
+        "model": APIException,
+        "description": "بارگذاری قبلی هنوز در حال انجام است. بعدا تلاش کنید."},
+}
+
+status_responses = {
+    404: {
+        "model": APIException,
+        "description": "کار بارگذاری یافت نشد."},
+}
+
+
+@route_realLoad_ingestionJobs.post(
+    END_POINT, status_code=status.HTTP_202_ACCEPTED, response_model=Dict[str, str], responses=extra_responses)
+async def defineRealLoadAsJob(
+        file: UploadFile, loc_id: int = Depends(getUserLocation)) -> Dict[str, str]:
+    """Set or replace real loads from an Excel or CSV file (same layout as `/realLoad/defineLoadsAsExcel`) in the background. Returns the id of the job at once; its progress is then polled at `/realLoad/ingestionJobs/{job_id}`.
+    """
+    try:
+        path = await run_in_threadpool(_saveUpload, file)
+    except Exception as e:
+        logging.error(f"Could not save uploaded file: {e}")
+        raise HTTPException(
+            status_code=400, detail="Error reading uploaded file.")
+
+    try:
+        job_id = await submitJob(loc_id, path, file.filename)
+    except TooManyJobsError as e:
+        os.remove(path)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+
+    return {"job_id": job_id}
+
+
+@route_realLoad_ingestionJobs.get(
+    STATUS_END_POINT, response_model=IngestionJobStatus, responses=status_responses)
+async def getIngestionJobStatus(
+        job_id: str, loc_id: int = Depends(getUserLocation)) -> IngestionJobStatus:
+    """Returns the progress of a background upload: rows parsed and written, errors and the estimated time left.
+    """
+    job_status = await runQuery(getJobStatus, job_id, loc_id)
+    if job_status is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="کار بارگذاری یافت نشد.")
+
+    return job_status
+
+
+def _saveUpload(file: UploadFile) -> str:
+    """Copy the upload to a temporary file that outlives the request."""
+    suffix = os.path.splitext(file.filename or "")[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temporary:
+        shutil.copyfileobj(file.file, temporary)
+
+    return temporary.name
@@ -0,0 +1,57 @@
+import logging
+
+from beartype.typing import List
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+
+from pahbar.prediction.services.load.exc import APIException
+from .dateConversion import hoursToJalaliDatetimes, jalaliDateToOrdinal
+from .dbExecutor import runQuery
+from .gapInterpolation import INTERPOLATION_METHODS, interpolateGaps
+from .models import InterpolatedDate
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/interpolateGaps"
+
+route_realLoad_interpolateGaps = APIRouter()
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+    500: {
+        "model": APIException,
+        "description": "درونیابی بار انجام نشد. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_interpolateGaps.post(
+    END_POINT, response_model=List[InterpolatedDate], responses=extra_responses)
+async def interpolateRealLoadGaps(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        method: str = Query("seasonal", description=f"One of {', '.join(INTERPOLATION_METHODS)}"),
+        loc_id: int = Depends(getUserLocation)) -> List[InterpolatedDate]:
+    """Fill the missing hours of real load between `from_date` and `to_date`, and return the hours that were filled. The 'seasonal' method uses the same hour of the previous days, falling back to 'linear' interpolation between neighbouring hours. Only gaps between two known loads are filled.
+    """
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    if method not in INTERPOLATION_METHODS:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"method must be one of {', '.join(INTERPOLATION_METHODS)}.")
+
+    try:
+        hours = await runQuery(interpolateGaps, loc_id, from_ordinal, to_ordinal, method)
+    except Exception as e:
+        logging.error(f"Could not interpolate the loads of location {loc_id}: {e}")
+        raise exceptions.HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "درونیابی بار انجام نشد. دوباره تلاش کنید.")
+
+    return [InterpolatedDate(datetime=datetime) for datetime in hoursToJalaliDatetimes(hours).tolist()]
@@ -0,0 +1,52 @@
+import logging
+
+from beartype.typing import List
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+
+from pahbar.prediction.services.load.exc import APIException
+from .coverageIndex import COVERAGE_INDEX
+from .dateConversion import hoursToJalaliDatetimes, jalaliDateToOrdinal
+from .dbExecutor import runQuery
+from .models import InterpolatedDate
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/interpolatedDates"
+
+route_realLoad_interpolatedDates = APIRouter()
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+    500: {
+        "model": APIException,
+        "description": "مشکلی وجود دارد. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_interpolatedDates.get(
+    END_POINT, response_model=List[InterpolatedDate], responses=extra_responses)
+async def getInterpolatedDates(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        loc_id: int = Depends(getUserLocation)) -> List[InterpolatedDate]:
+    """Returns the hours between `from_date` and `to_date` whose real load was interpolated rather than measured. Served from the in-memory hourly coverage of this user's location, not from the load table.
+    """
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    try:
+        hours = await runQuery(COVERAGE_INDEX.interpolatedHours, loc_id, from_ordinal, to_ordinal)
+    except Exception as e:
+        logging.error(f"Could not build the coverage of location {loc_id}: {e}")
+        raise exceptions.HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "مشکلی وجود دارد. دوباره تلاش کنید.")
+
+    return [InterpolatedDate(datetime=datetime) for datetime in hoursToJalaliDatetimes(hours).tolist()]
@@ -1,23 +1,19 @@
-import jdatetime
 from beartype import beartype
 from beartype.typing import Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
-from pahbar.prediction.services.auth.db import UserQueries
-from pahbar.prediction.services.auth.model import User
-from pahbar.prediction.services.auth.utils.get_current_user import get_current_user
 from pahbar.prediction.services.load.exc import APIException
-from pahbar.prediction.services.util import DatabaseUtils
+from .conditionalResponses import conditionalJSONResponse
+from .dateBoundsCache import getDateBounds
+from .dateConversion import ordinalToJalaliDate
+from .dbExecutor import runQuery
+from .userLocation import getUserLocation
 from .models import LastAvailableDatetime
-from ...db.load import RealLoadDatesQueries
 
 END_POINT = "/realLoad/lastAvailableDatetime"
 
 route_realLoad_lastAvailableDatetime = APIRouter()
 
-DB_ENGINE = DatabaseUtils.createEngine()
-DB_METADATA = DatabaseUtils.createMetdata()
-
 extra_responses = {
     500: {
         "model": APIException,
@@ -29,15 +25,13 @@ extra_responses = {
     END_POINT, response_model=Optional[LastAvailableDatetime], responses=extra_responses
 )
 async def getLastAvailableLoadDatetime(
-        user: User = Depends(get_current_user)) -> Optional[LastAvailableDatetime]:
-    """Returns the last date for which a load exists for this user.  
+        request: Request,
+        loc_id: int = Depends(getUserLocation)) -> Response:
+    """Returns the last date for which a load exists for this user. The response carries an ETag, and `If-None-Match` is answered with 304 until loads are written.
     """
 
-    user_obj = UserQueries(DB_ENGINE, DB_METADATA)
-    user_db = user_obj.get_user_by_username(user.username)
-    loc_id = user_db.location
-
-    return generateLastAvailableDatetime(loc_id)
+    return await conditionalJSONResponse(
+        request, loc_id, "lastAvailableDatetime", lambda: runQuery(generateLastAvailableDatetime, loc_id))
 
 
 @beartype
@@ -47,11 +41,10 @@ def generateLastAvailableDatetime(location: int) -> Optional[LastAvailableDateti
         sqlAlchemy.exceptions.HTTPException: In case something goes wrong.
     """
     try:
-        with RealLoadDatesQueries(DB_ENGINE, DB_METADATA) as q:
-            disco_dates = q.select(location)
+        disco_dates = getDateBounds(location)
+        last_date = disco_dates.last_date
         return LastAvailableDatetime(
-            date=jdatetime.datetime.fromgregorian(datetime=disco_dates.last_date).strftime(
-                LastAvailableDatetime.DATE_FORMAT))
+            date=f"{ordinalToJalaliDate(last_date.toordinal())} {last_date.strftime('%H:%M:%S')}")
     except Exception as e:
         raise HTTPException(
             status_code=500, detail="آخرین زمان مجاز یافت نشد")
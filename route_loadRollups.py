@@ -0,0 +1,85 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from beartype.typing import List
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+
+from pahbar.prediction.services.load.exc import APIException
+from .dailyRollups import selectDailyRollups
+from .dateConversion import jalaliDateToOrdinal, ordinalsToJalaliDates
+from .dbExecutor import runQuery
+from .models import LoadRollup
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/loadRollups"
+
+route_realLoad_loadRollups = APIRouter()
+
+ROLLUP_PERIODS = ("daily", "monthly")
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+    500: {
+        "model": APIException,
+        "description": "مشکلی وجود دارد. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_loadRollups.get(
+    END_POINT, response_model=List[LoadRollup], responses=extra_responses)
+async def getLoadRollups(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        period: str = Query("daily", description="Either 'daily' or 'monthly' (Jalali months)"),
+        loc_id: int = Depends(getUserLocation)) -> List[LoadRollup]:
+    """Returns the energy, peak and valley of real load for each day or Jalali month between `from_date` and `to_date`. These are read from precomputed daily rollups, not from the hourly loads. Days without any load are left out.
+    """
+    if period not in ROLLUP_PERIODS:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, f"period must be one of {', '.join(ROLLUP_PERIODS)}.")
+
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    try:
+        rollups = await runQuery(selectDailyRollups, loc_id, from_ordinal, to_ordinal)
+    except Exception as e:
+        logging.error(f"Could not read the load rollups of location {loc_id}: {e}")
+        raise exceptions.HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "مشکلی وجود دارد. دوباره تلاش کنید.")
+
+    if period == "daily":
+        rollups = rollups.assign(date=ordinalsToJalaliDates(rollups["ordinal"].to_numpy(), LoadRollup.DATE_FORMAT))
+    else:
+        rollups = monthlyRollups(rollups)
+
+    return [
+        LoadRollup(**row)
+        for row in rollups[["date", "energy_MWh", "peak_MW", "peak_hour", "valley_MW", "hours_present"]]
+        .to_dict(orient="records")]
+
+
+def monthlyRollups(daily: pd.DataFrame) -> pd.DataFrame:
+    """Aggregate daily rollups, in date order, into Jalali months. The peak hour of a month is that of its peak day."""
+    months = ordinalsToJalaliDates(daily["ordinal"].to_numpy(), LoadRollup.MONTH_FORMAT)
+    grouped = daily.assign(date=months).groupby("date", sort=False)
+    peak_rows = grouped["peak_MW"].idxmax().to_numpy()
+
+    return pd.DataFrame({
+        "date": grouped.size().index.to_numpy(),
+        "energy_MWh": grouped["energy_MWh"].sum().to_numpy(),
+        "peak_MW": grouped["peak_MW"].max().to_numpy(),
+        "peak_hour": daily["peak_hour"].to_numpy()[peak_rows] if len(peak_rows) else np.array([], dtype=np.int64),
+        "valley_MW": grouped["valley_MW"].min().to_numpy(),
+        "hours_present": grouped["hours_present"].sum().to_numpy(),
+    })
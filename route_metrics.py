@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .conditionalResponses import RESPONSE_CACHE
+from .dateBoundsCache import DATE_BOUNDS_CACHE
+from .dbProvider import poolStatus
+from .instrumentation import METRICS
+from .recentLoadStore import RECENT_LOAD_STORE
+from .userLocation import USER_LOCATION_CACHE
+
+END_POINT = "/metrics"
+
+route_realLoad_metrics = APIRouter()
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_CACHES = {
+    "userLocation": USER_LOCATION_CACHE,
+    "dateBounds": DATE_BOUNDS_CACHE,
+    "recentLoads": RECENT_LOAD_STORE,
+    "responses": RESPONSE_CACHE,
+}
+
+
+@route_realLoad_metrics.get(END_POINT, response_class=PlainTextResponse, include_in_schema=False)
+async def getMetrics() -> PlainTextResponse:
+    """The realLoad metrics in the Prometheus text format: per-route request latency, status and payload size,
+    per-route and per-phase latency and row counts, the statistics of the in-process caches, and the connections
+    of the DB pool.
+    """
+    lines = [
+        "# HELP realload_cache Statistics of the realLoad in-process caches.",
+        "# TYPE realload_cache gauge"]
+    for cache, cache_object in _CACHES.items():
+        for stat, value in cache_object.stats().items():
+            lines.append(f'realload_cache{{cache="{cache}",stat="{stat}"}} {value}')
+
+    lines += [
+        "# HELP realload_db_pool Connections of the realLoad DB pool of this worker.",
+        "# TYPE realload_db_pool gauge"]
+    for stat, value in poolStatus().items():
+        lines.append(f'realload_db_pool{{stat="{stat}"}} {value}')
+
+    return PlainTextResponse(METRICS.render() + "\n".join(lines) + "\n", media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,56 @@
+import logging
+
+from beartype.typing import List
+from fastapi import APIRouter, Depends, Query
+from fastapi import exceptions, status
+
+from pahbar.prediction.services.load.exc import APIException
+from .coverageIndex import COVERAGE_INDEX
+from .dateConversion import jalaliDateToOrdinal, ordinalsToJalaliDates
+from .dbExecutor import runQuery
+from .models import MissingDate
+from .userLocation import getUserLocation
+
+END_POINT = "/realLoad/missingDates"
+
+route_realLoad_missingDates = APIRouter()
+
+extra_responses = {
+    400: {
+        "model": APIException,
+        "description": "تاریخهای ارسالی اشتباه هستند. دوباره تلاش کنید."},
+    500: {
+        "model": APIException,
+        "description": "مشکلی وجود دارد. دوباره تلاش کنید."},
+}
+
+
+@route_realLoad_missingDates.get(
+    END_POINT, response_model=List[MissingDate], responses=extra_responses)
+async def getMissingDates(
+        from_date: str = Query(..., description="Jalali start date as '%Y/%m/%d', such as 1401/02/31"),
+        to_date: str = Query(..., description="Jalali end date (inclusive) as '%Y/%m/%d', such as 1401/02/31"),
+        loc_id: int = Depends(getUserLocation)) -> List[MissingDate]:
+    """Returns the days between `from_date` and `to_date` for which at least one hour of real load is missing. Served from the in-memory hourly coverage of this user's location, not from the load table.
+
+    The range is clamped to the days between the first and the last load of the location: days before its data starts or after its latest load are not reported as missing, and a location without any load has no missing days.
+    """
+    try:
+        from_ordinal, to_ordinal = jalaliDateToOrdinal(from_date), jalaliDateToOrdinal(to_date)
+    except ValueError as e:
+        raise exceptions.HTTPException(status.HTTP_400_BAD_REQUEST, str(e))
+
+    if to_ordinal < from_ordinal:
+        raise exceptions.HTTPException(
+            status.HTTP_400_BAD_REQUEST, "from_date can't be greater than to_date.")
+
+    try:
+        missing_days = await runQuery(COVERAGE_INDEX.missingDays, loc_id, from_ordinal, to_ordinal)
+    except Exception as e:
+        logging.error(f"Could not build the coverage of location {loc_id}: {e}")
+        raise exceptions.HTTPException(
+            status.HTTP_500_INTERNAL_SERVER_ERROR, "مشکلی وجود دارد. دوباره تلاش کنید.")
+
+    return [
+        MissingDate(date=date)
+        for date in ordinalsToJalaliDates(missing_days, MissingDate.DATE_FORMAT).tolist()]
@@ -1,26 +1,23 @@
 import logging
+from datetime import date
 
-import jdatetime
 from beartype import beartype
 from beartype.typing import Optional
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from fastapi import exceptions, status
 
-from pahbar.prediction.services.auth.db import UserQueries
-from pahbar.prediction.services.auth.model import User
-from pahbar.prediction.services.auth.utils.get_current_user import get_current_user
 from pahbar.prediction.services.featureBuilder.exc import APIException
-from pahbar.prediction.services.util import DatabaseUtils
+from .conditionalResponses import conditionalJSONResponse
+from .dateBoundsCache import getDateBounds
+from .dateConversion import ordinalToJdate
+from .dbExecutor import runQuery
+from .userLocation import getUserLocation
 from .models import RealLoadNextDates
-from ...db.load import RealLoadDatesQueries
 
 END_POINT = "/realLoad/nextDates"
 
 route_realLoad_nextDates = APIRouter()
 
-DB_ENGINE = DatabaseUtils.createEngine()
-DB_METADATA = DatabaseUtils.createMetdata()
-
 extra_responses = {
     500: {
         "model": APIException,
@@ -32,18 +29,19 @@ extra_responses = {
     END_POINT, response_model=Optional[RealLoadNextDates],
     responses=extra_responses)
 async def getRealLoadNextDates(
-        user: User = Depends(get_current_user)) -> Optional[RealLoadNextDates]:
+        request: Request,
+        loc_id: int = Depends(getUserLocation)) -> Response:
     """Returns the 'next' dates for which we're allowed to define real load. That is, if real load is not available from some date in the past, this function returns an interval from that day up until yesterday. These date ranges are used by the front end to present a possible range of dates for defining real load. The dates comply to the following logic:
 
     -   First day with missing load is potentially the next date after last available day in db.
         If load is already provided up until yesterday, then we needn't go a day further
     -   Defaults are naturally set to first_missing_load_date for 'from' and yesterday for 'to'. Of course, these two could be equal.
     -   End dates are naturally yesterday for both 'to' and 'from'.
+
+    The response carries an ETag, and `If-None-Match` is answered with 304 until loads are written or the day changes.
     """
-    user_obj = UserQueries(DB_ENGINE, DB_METADATA)
-    user_db = user_obj.get_user_by_username(user.username)
-    loc_id = user_db.location
-    return generateNextDate(loc_id)
+    return await conditionalJSONResponse(
+        request, loc_id, f"nextDates:{date.today().isoformat()}", lambda: runQuery(generateNextDate, loc_id))
 
 
 @beartype
@@ -59,8 +57,7 @@ def generateNextDate(location: int) -> Optional[RealLoadNextDates]:
         sqlAlchemy.exceptions.HTTPException: In case something goes wrong.
     """
     try:
-        with RealLoadDatesQueries(DB_ENGINE, DB_METADATA) as q:
-            disco_dates = q.select(location)
+        disco_dates = getDateBounds(location)
 
     except Exception as e:
         logging.error(f"Cound not fetch dates from db: {e}")
@@ -71,24 +68,21 @@ def generateNextDate(location: int) -> Optional[RealLoadNextDates]:
         return None
 
     # First day with missing load is potentially the next date after last available day in db.
-    first_missing_load_date = (jdatetime.datetime.fromgregorian(
-        datetime=disco_dates.last_date) + jdatetime.timedelta(days=1))
-    yesterday = jdatetime.datetime.now() + jdatetime.timedelta(days=-1)
+    first_missing_load_ordinal = disco_dates.last_date.toordinal() + 1
+    yesterday_ordinal = date.today().toordinal() - 1
 
     # If load is already provided up until yesterday, then we needn't go a day further.
-    if yesterday < first_missing_load_date:
-        first_missing_load_date = yesterday
+    first_missing_load_ordinal = min(first_missing_load_ordinal, yesterday_ordinal)
 
-    to_start = from_start = jdatetime.date.fromgregorian(
-        date=disco_dates.first_date)
+    to_start = from_start = ordinalToJdate(disco_dates.first_date.toordinal())
 
     # Defaults are naturally set to first_missing_load_date for 'from' and yesterday for 'to'. Of course, these two could be equal.
-    from_default = first_missing_load_date.date()
-    to_default = yesterday.date()
+    from_default = ordinalToJdate(first_missing_load_ordinal)
+    to_default = ordinalToJdate(yesterday_ordinal)
 
     # End dates are naturally yesterday for both 'to' and 'from'
-    from_end = yesterday.date()
-    to_end = yesterday.date()
+    from_end = to_default
+    to_end = to_default
 
     try:
         return RealLoadNextDates.create(
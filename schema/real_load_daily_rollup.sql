@@ -0,0 +1,14 @@
+-- Daily real load rollups, maintained by realLoad in the same transaction as each real load write
+-- (see dailyRollups.py). Apply before deploying, then fill it from the hourly table with:
+--     python -m pahbar.prediction.services.load.api.realLoad.dailyRollups rebuild
+
+CREATE TABLE IF NOT EXISTS real_load_daily_rollup (
+    location      INTEGER          NOT NULL,
+    date          DATE             NOT NULL,
+    "energy_MWh"  DOUBLE PRECISION NOT NULL,
+    "peak_MW"     DOUBLE PRECISION NOT NULL,
+    "valley_MW"   DOUBLE PRECISION NOT NULL,
+    peak_hour     SMALLINT         NOT NULL,
+    hours_present SMALLINT         NOT NULL,
+    PRIMARY KEY (location, date)
+);
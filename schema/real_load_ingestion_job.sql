@@ -0,0 +1,18 @@
+-- Background real load upload jobs, shared by all workers so that any of them answers a status poll and the
+-- per-location limit of unfinished jobs holds across them (see ingestionJobs.py). Apply before deploying.
+-- Times are epoch seconds.
+
+CREATE TABLE IF NOT EXISTS real_load_ingestion_job (
+    job_id             VARCHAR(32)      NOT NULL PRIMARY KEY,
+    location           INTEGER          NOT NULL,
+    status             VARCHAR(16)      NOT NULL,
+    rows_parsed        INTEGER          NOT NULL,
+    rows_written       INTEGER          NOT NULL,
+    rows_to_write      INTEGER          NOT NULL,
+    errors             TEXT             NOT NULL,
+    updated_at         DOUBLE PRECISION NOT NULL,
+    writing_started_at DOUBLE PRECISION,
+    finished_at        DOUBLE PRECISION
+);
+
+CREATE INDEX IF NOT EXISTS ix_real_load_ingestion_job_location ON real_load_ingestion_job (location);
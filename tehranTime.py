@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytz
+from beartype.typing import Tuple
+
+TEHRAN_TZ = pytz.timezone("Asia/Tehran")
+
+DAY_SECONDS = 24 * 60 * 60
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = 719163
+"""Gregorian ordinal of 1970-01-01."""
+
+_PROBED_YEARS = (1900, 2100)
+"""Years over which the transitions are probed, should pytz stop exposing its tables."""
+
+
+def probeTransitions(first_year: int, last_year: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Tehran's UTC offset transitions within years [first_year, last_year], found through the public `utcoffset`
+    only: offsets are compared a day apart, and each change is then bisected down to the second. Returns the
+    instants (epoch seconds) of the transitions, the first of which stands for the beginning of time, and the
+    offset (seconds) in force from each on. Two transitions less than a day apart would be missed."""
+    def offset(timestamp: int) -> int:
+        return int(datetime.fromtimestamp(timestamp, TEHRAN_TZ).utcoffset().total_seconds())
+
+    start = int((datetime(first_year, 1, 1) - _EPOCH).total_seconds())
+    stop = int((datetime(last_year + 1, 1, 1) - _EPOCH).total_seconds())
+    transitions = [int((datetime.min - _EPOCH).total_seconds())]
+    offsets = [offset(start)]
+    for day in range(start + DAY_SECONDS, stop, DAY_SECONDS):
+        current = offset(day)
+        if current != offsets[-1]:
+            low, high = day - DAY_SECONDS, day
+            while high - low > 1:
+                middle = (low + high) // 2
+                if offset(middle) == offsets[-1]:
+                    low = middle
+                else:
+                    high = middle
+            transitions.append(high)
+            offsets.append(current)
+
+    return np.array(transitions, dtype=np.int64), np.array(offsets, dtype=np.int64)
+
+
+def _transitionTables() -> Tuple[np.ndarray, np.ndarray]:
+    """The transitions of `probeTransitions`, read straight from pytz's tables of the whole tz database. Those
+    are private, so if a pytz release drops or reshapes them, the transitions are probed over `_PROBED_YEARS`
+    instead."""
+    transitions = getattr(TEHRAN_TZ, "_utc_transition_times", None)
+    infos = getattr(TEHRAN_TZ, "_transition_info", None)
+    if transitions is None or infos is None or len(transitions) != len(infos) or not len(transitions):
+        return probeTransitions(*_PROBED_YEARS)
+
+    return (
+        np.array([int((transition - _EPOCH).total_seconds()) for transition in transitions], dtype=np.int64),
+        np.array([int(info[0].total_seconds()) for info in infos], dtype=np.int64))
+
+
+_UTC_TRANSITIONS, _UTC_OFFSETS = _transitionTables()
+"""Instants (epoch seconds) at which Tehran's UTC offset changes, the first of which stands for the beginning of
+time, and the UTC offset (seconds) in force from each on."""
+
+_LOCAL_TRANSITIONS = _UTC_TRANSITIONS + _UTC_OFFSETS
+"""Local wall times (seconds since the local epoch) at which each offset starts, read with the new offset. Wall
+times skipped by a transition thus get the old offset, and those repeated by one get the new offset."""
+
+
+def utcOffsets(timestamps: np.ndarray) -> np.ndarray:
+    """Tehran's UTC offset (seconds) at each of an array of epoch seconds."""
+    index = np.searchsorted(_UTC_TRANSITIONS, np.asarray(timestamps, dtype=np.int64), side="right") - 1
+    return _UTC_OFFSETS[np.maximum(index, 0)]
+
+
+def localDayBounds(timestamps: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Bucket an array of epoch seconds into Tehran local days, all at once. Returns the Gregorian ordinal of each
+    local day, and the instants (epoch seconds) the day starts and ends at, end excluded. On days with a DST
+    transition, these bounds span 23 or 25 hours; when midnight itself is skipped, the day starts at the
+    transition.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    days = (timestamps + utcOffsets(timestamps)) // DAY_SECONDS
+
+    return days + _EPOCH_ORDINAL, _wallToUtc(days * DAY_SECONDS), _wallToUtc((days + 1) * DAY_SECONDS)
+
+
+def _wallToUtc(walls: np.ndarray) -> np.ndarray:
+    """The instant of each local wall time. A skipped wall time is read with the old offset, so that the
+    midnight skipped by a transition maps onto the transition itself."""
+    index = np.searchsorted(_LOCAL_TRANSITIONS, walls, side="right") - 1
+    return walls - _UTC_OFFSETS[np.maximum(index, 0)]
+
+
+def toLocalHour(value: datetime) -> int:
+    """Local hours since the epoch of a datetime, truncated to the hour. Aware datetimes are first converted to
+    Tehran time."""
+    if value.tzinfo is not None:
+        value = value.astimezone(TEHRAN_TZ).replace(tzinfo=None)
+    return int((value - _EPOCH) // timedelta(hours=1))
@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from pahbar.prediction.services.load.api.realLoad import conditionalResponses
+from pahbar.prediction.services.load.api.realLoad.loadWriteEvents import notifyLoadsWritten
+
+
+@pytest.fixture
+def loads():
+    """A client of a route serving `state["loads"]`, which counts in `state["produced"]` how often it was built."""
+    state = {"loads": [1.5, 2.5], "produced": 0}
+    app = FastAPI()
+
+    @app.get("/loads")
+    async def getLoads(request: Request):
+        async def produce():
+            state["produced"] += 1
+            return state["loads"]
+        return await conditionalResponses.conditionalJSONResponse(request, 7, "params", produce)
+
+    conditionalResponses.RESPONSE_CACHE.invalidate()
+    yield state, TestClient(app)
+    conditionalResponses.RESPONSE_CACHE.invalidate()
+
+
+def test_cached_body_is_answered_with_304(loads):
+    state, client = loads
+    etag = client.get("/loads").headers["ETag"]
+
+    assert client.get("/loads", headers={"If-None-Match": etag}).status_code == 304
+    assert state["produced"] == 1
+
+
+def test_etag_holds_without_the_cache_of_the_process_that_sent_it(loads):
+    # As when the next request reaches another worker, or this one after a restart
+    state, client = loads
+    etag = client.get("/loads").headers["ETag"]
+    conditionalResponses.RESPONSE_CACHE.invalidate()
+
+    assert client.get("/loads", headers={"If-None-Match": etag}).status_code == 304
+    assert state["produced"] == 2
+
+
+def test_written_loads_change_the_etag(loads):
+    state, client = loads
+    etag = client.get("/loads").headers["ETag"]
+    state["loads"] = [1.5, 3.0]
+    notifyLoadsWritten(7, pd.DataFrame({"datetime": [], "load_MWh": [], "source": []}))
+
+    response = client.get("/loads", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json() == [1.5, 3.0]
+    assert response.headers["ETag"] != etag
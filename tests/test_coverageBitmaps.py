@@ -0,0 +1,70 @@
+import numpy as np
+
+from pahbar.prediction.services.load.api.realLoad.coverageBitmaps import LocationCoverage
+
+# A day start, in local hours since the epoch
+DAY = 19437 * 24
+
+
+def test_marked_hours_are_present_and_others_are_not():
+    coverage = LocationCoverage()
+    coverage.mark(np.array([DAY + 1, DAY + 2, DAY + 9]), np.array([False, True, False]))
+
+    assert coverage.presentHours(DAY, DAY + 12).nonzero()[0].tolist() == [1, 2, 9]
+    assert coverage.interpolatedHours(DAY, DAY + 12).nonzero()[0].tolist() == [2]
+    assert (coverage.first_hour, coverage.last_hour) == (DAY + 1, DAY + 9)
+
+
+def test_measured_load_clears_the_interpolated_bit():
+    coverage = LocationCoverage()
+    coverage.mark(np.array([DAY + 3, DAY + 4]), np.array([True, True]))
+    coverage.mark(np.array([DAY + 3]), np.array([False]))
+
+    assert coverage.interpolatedHours(DAY, DAY + 8).nonzero()[0].tolist() == [4]
+    assert coverage.presentHours(DAY, DAY + 8).nonzero()[0].tolist() == [3, 4]
+
+
+def test_marking_nothing_leaves_the_coverage_empty():
+    coverage = LocationCoverage()
+    coverage.mark(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool))
+
+    assert coverage.origin is None and coverage.first_hour is None
+    assert not coverage.presentHours(DAY, DAY + 24).any()
+
+
+def test_earlier_hours_shift_the_origin_without_losing_bits():
+    coverage = LocationCoverage()
+    coverage.mark(np.array([DAY + 30]), np.array([False]))
+    coverage.mark(np.array([DAY - 5]), np.array([True]))
+
+    assert coverage.origin == DAY - 24
+    assert coverage.presentHours(DAY - 24, DAY + 48).nonzero()[0].tolist() == [19, 54]
+    assert coverage.interpolatedHours(DAY - 24, DAY + 48).nonzero()[0].tolist() == [19]
+    assert coverage.first_hour == DAY - 5
+
+
+def test_ranges_past_either_end_of_the_bitmaps_are_empty_there():
+    coverage = LocationCoverage()
+    coverage.mark(np.array([DAY, DAY + 23]), np.array([False, False]))
+    end = coverage.origin + len(coverage.present) * 8
+
+    assert coverage.presentHours(DAY - 48, DAY - 24).tolist() == [False] * 24
+    assert coverage.presentHours(end, end + 10).tolist() == [False] * 10
+    assert coverage.presentHours(DAY - 2, DAY + 2).tolist() == [False, False, True, False]
+
+
+def test_ranges_not_on_byte_boundaries():
+    coverage = LocationCoverage()
+    hours = DAY + np.arange(5, 20)
+    coverage.mark(hours, np.zeros(len(hours), dtype=bool))
+
+    for from_hour, to_hour in [(DAY + 3, DAY + 11), (DAY + 7, DAY + 9), (DAY + 13, DAY + 22), (DAY + 8, DAY + 16)]:
+        assert coverage.presentHours(from_hour, to_hour).tolist() == [
+            DAY + 5 <= hour < DAY + 20 for hour in range(from_hour, to_hour)]
+
+
+def test_reversed_range_is_empty():
+    coverage = LocationCoverage()
+    coverage.mark(np.array([DAY]), np.array([False]))
+
+    assert coverage.presentHours(DAY + 5, DAY).size == 0
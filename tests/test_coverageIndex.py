@@ -0,0 +1,52 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("pahbar.prediction.services.load.db.load")
+
+from pahbar.prediction.services.load.api.realLoad import coverageIndex  # noqa: E402
+from pahbar.prediction.services.load.api.realLoad.coverageBitmaps import LocationCoverage  # noqa: E402
+
+ORDINAL = datetime.date(2023, 3, 21).toordinal()
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Builds of a location's coverage, each one having the hours in `builds["hours"]` (all of its first day)."""
+    state = {"hours": np.arange(24) + coverageIndex._dayHours(ORDINAL), "count": 0}
+
+    def build(location):
+        state["count"] += 1
+        coverage = LocationCoverage()
+        coverage.mark(state["hours"], np.zeros(len(state["hours"]), dtype=bool))
+        return coverage
+
+    monkeypatch.setattr(coverageIndex, "_buildCoverage", build)
+    return state
+
+
+def test_coverage_is_kept_until_it_expires_then_rebuilt(builds):
+    index = coverageIndex.CoverageIndex(rebuild_seconds=60)
+    assert index.missingDays(1, ORDINAL, ORDINAL).size == 0
+    assert index.missingDays(1, ORDINAL, ORDINAL).size == 0
+    assert builds["count"] == 1
+
+    builds["hours"] = builds["hours"][1:]
+    index._coverages[1].built_at -= 61
+    assert index.missingDays(1, ORDINAL, ORDINAL).tolist() == [ORDINAL]
+    assert builds["count"] == 2
+
+
+def test_writes_update_the_built_coverage(builds):
+    index = coverageIndex.CoverageIndex()
+    builds["hours"] = builds["hours"][:-1]
+    assert index.missingDays(1, ORDINAL, ORDINAL).tolist() == [ORDINAL]
+
+    last_hour = datetime.datetime(2023, 3, 21, 23)
+    index.onWrite(1, pd.DataFrame({"datetime": [last_hour], "load_MWh": [1.0], "source": ["interpolated"]}))
+
+    assert index.missingDays(1, ORDINAL, ORDINAL).size == 0
+    assert index.interpolatedHours(1, ORDINAL, ORDINAL).tolist() == [coverageIndex._dayHours(ORDINAL) + 23]
+    assert builds["count"] == 1
@@ -0,0 +1,73 @@
+import datetime
+
+import jdatetime
+import numpy as np
+import pytest
+
+from pahbar.prediction.services.load.api.realLoad.dateConversion import (
+    JALALI_FIRST_YEAR, JALALI_LAST_YEAR, hoursToJalaliDatetimes, jalaliDateToOrdinal, jalaliDatesToOrdinals,
+    jalaliDatetimesToGregorian, ordinalsToJalaliDates, ordinalsToJalaliParts)
+
+YEARS = range(JALALI_FIRST_YEAR, JALALI_LAST_YEAR + 1)
+_EPOCH = datetime.date(1970, 1, 1)
+
+
+@pytest.fixture(scope="module")
+def table_days():
+    """Every day of the covered Jalali years, as jdatetime sees them: their '%Y-%m-%d' dates and ordinals."""
+    first = jdatetime.date(JALALI_FIRST_YEAR, 1, 1).togregorian().toordinal()
+    stop = jdatetime.date(JALALI_LAST_YEAR + 1, 1, 1).togregorian().toordinal()
+    ordinals = np.arange(first, stop, dtype=np.int64)
+    dates = np.array([
+        jdatetime.date.fromgregorian(date=datetime.date.fromordinal(int(ordinal))).strftime("%Y-%m-%d")
+        for ordinal in ordinals])
+    return dates, ordinals
+
+
+def test_tables_agree_with_jdatetime_on_every_covered_day(table_days):
+    dates, ordinals = table_days
+
+    assert (jalaliDatesToOrdinals(dates) == ordinals).all()
+    assert (ordinalsToJalaliDates(ordinals) == dates).all()
+
+
+def test_every_covered_day_round_trips(table_days):
+    dates, ordinals = table_days
+
+    assert (jalaliDatesToOrdinals(ordinalsToJalaliDates(ordinals)) == ordinals).all()
+    years, months, days = ordinalsToJalaliParts(ordinals)
+    assert years.min() == JALALI_FIRST_YEAR and years.max() == JALALI_LAST_YEAR
+    assert ((months >= 1) & (months <= 12) & (days >= 1) & (days <= 31)).all()
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_esfand_30_exists_only_in_leap_years(year):
+    last_day = 30 if jdatetime.date(year, 1, 1).isleap() else 29
+    expected = jdatetime.date(year, 12, last_day).togregorian().toordinal()
+
+    assert jalaliDateToOrdinal(f"{year}/12/{last_day}") == expected
+    assert jalaliDatesToOrdinals(np.array([f"{year + 1:04d}-01-01"]))[0] == expected + 1
+    assert ordinalsToJalaliDates(np.array([expected, expected + 1])).tolist() == [
+        f"{year:04d}-12-{last_day}", f"{year + 1:04d}-01-01"]
+    if last_day == 29:
+        with pytest.raises(ValueError):
+            jalaliDateToOrdinal(f"{year}/12/30")
+
+
+def test_days_outside_the_tables_fall_back_to_jdatetime():
+    for date in (jdatetime.date(JALALI_FIRST_YEAR - 1, 12, 29), jdatetime.date(JALALI_LAST_YEAR + 1, 1, 1)):
+        ordinal = date.togregorian().toordinal()
+        text = date.strftime("%Y-%m-%d")
+
+        assert jalaliDateToOrdinal(text) == ordinal
+        assert ordinalsToJalaliDates(np.array([ordinal])).tolist() == [text]
+
+
+def test_hours_round_trip_through_jalali_datetimes():
+    # 1399/12/30 (a leap day), then the new year
+    first_day = jdatetime.date(1399, 12, 30).togregorian().toordinal() - _EPOCH.toordinal()
+    hours = np.arange(first_day * 24, (first_day + 2) * 24)
+    datetimes = hoursToJalaliDatetimes(hours)
+
+    assert datetimes[0] == "1399-12-30 00:00:00" and datetimes[-1] == "1400-01-01 23:00:00"
+    assert (jalaliDatetimesToGregorian(datetimes).astype(np.int64) == hours).all()
@@ -0,0 +1,79 @@
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from pahbar.prediction.services.load.api.realLoad.instrumentation import (
+    METRICS, Histogram, InstrumentationMiddleware, MetricsRegistry, phase, phaseStart, recordPhase, recordRows)
+
+
+def test_values_land_in_the_first_bucket_bounding_them():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 1.0, 2.0):
+        histogram.observe(value)
+
+    # A value equal to a bound belongs to it, as Prometheus' 'le' means
+    assert histogram.counts == [2, 2, 1]
+    assert histogram.sum == 3.65
+
+
+def test_render_writes_cumulative_buckets_sum_count_and_counters():
+    registry = MetricsRegistry()
+    registry.describe("latency_seconds", "histogram", "Latency.")
+    registry.describe("rows_total", "counter", "Rows.")
+    registry.observe("latency_seconds", (("route", "/a"),), 0.5, buckets=(0.1, 1.0))
+    registry.observe("latency_seconds", (("route", "/a"),), 5.0, buckets=(0.1, 1.0))
+    registry.increment("rows_total", (("route", 'say "hi"\n'),), 3)
+
+    assert registry.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 0',
+        'latency_seconds_bucket{route="/a",le="1.0"} 1',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 2',
+        'latency_seconds_sum{route="/a"} 5.5',
+        'latency_seconds_count{route="/a"} 2',
+        "# HELP rows_total Rows.",
+        "# TYPE rows_total counter",
+        'rows_total{route="say \\"hi\\"\\n"} 3',
+    ]
+
+
+def test_headers_are_written_once_per_metric():
+    registry = MetricsRegistry()
+    registry.describe("latency_seconds", "histogram", "Latency.")
+    registry.observe("latency_seconds", (("route", "/a"),), 0.5)
+    registry.observe("latency_seconds", (("route", "/b"),), 0.5)
+
+    assert registry.render().count("# TYPE latency_seconds") == 1
+
+
+def test_middleware_records_requests_phases_and_rows_by_route_template():
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware)
+
+    @app.get("/instrumented/{item_id}")
+    async def getItem(item_id: int, started: float = Depends(phaseStart)):
+        recordPhase("auth", time.perf_counter() - started)
+        with phase("db_query"):
+            recordRows("db_query", item_id)
+        return {"item_id": item_id}
+
+    client = TestClient(app)
+    assert client.get("/instrumented/7").status_code == 200
+    assert client.get("/instrumented/nope").status_code == 422
+    rendered = METRICS.render()
+
+    route = 'route="/instrumented/{item_id}"'
+    assert f'realload_request_seconds_count{{{route},status="200"}} 1' in rendered
+    assert f'realload_request_seconds_count{{{route},status="422"}} 1' in rendered
+    assert f'realload_phase_seconds_count{{{route},phase="auth"}} 1' in rendered
+    assert f'realload_phase_seconds_count{{{route},phase="db_query"}} 1' in rendered
+    assert f'realload_rows_total{{{route},phase="db_query"}} 7' in rendered
+    assert f'realload_response_bytes_count{{{route}}} 2' in rendered
+
+
+def test_phases_outside_a_request_are_recorded_as_background():
+    recordRows("instrumentation_test", 2)
+
+    assert 'realload_rows_total{route="background",phase="instrumentation_test"} 2' in METRICS.render()
@@ -0,0 +1,72 @@
+import datetime
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from pahbar.prediction.services.load.api.realLoad import loadFormats
+from pahbar.prediction.services.load.api.realLoad.loadFormats import (
+    dayLoadMatrix, formatHourlyLoads, format_loads, hourlyLoadRow, serializeColumnar)
+from pahbar.prediction.services.load.api.realLoad.loadFrames import HOUR_COLUMNS
+
+# 1402/01/01 is 2023-03-21
+FIRST_ORDINAL = datetime.date(2023, 3, 21).toordinal()
+FIRST_HOUR = (FIRST_ORDINAL - datetime.date(1970, 1, 1).toordinal()) * 24
+
+
+@pytest.fixture
+def hourly():
+    """Three days of hourly loads with a missing hour, a zero and a negative load, the second day without any load,
+    as the recent load store holds them and as DB records."""
+    loads = np.random.default_rng(0).uniform(100, 1500, 72).round(3)
+    present = np.ones(72, dtype=bool)
+    present[24:48] = False
+    present[5] = False
+    loads[7], loads[60] = 0.0, -3.5
+    records = [
+        SimpleNamespace(datetime=datetime.datetime(2023, 3, 21) + datetime.timedelta(hours=hour), load_MWh=load)
+        for hour, load in enumerate(loads.tolist()) if present[hour]]
+    return loads, present, records
+
+
+def test_columnar_rows_match_the_records_format(hourly):
+    _, _, records = hourly
+    ordinals = [FIRST_ORDINAL + 2, FIRST_ORDINAL, FIRST_ORDINAL + 1]
+
+    rows = {row["date"]: [row[column] for column in HOUR_COLUMNS] for row in format_loads(records)}
+    matrix = dayLoadMatrix(records, ordinals)
+
+    assert list(rows) == ["1402-01-01", "1402-01-03"]
+    assert matrix.tolist() == [rows["1402-01-03"], rows["1402-01-01"], [0.0] * 24]
+
+
+def test_recent_store_arrays_format_as_db_records(hourly):
+    loads, present, records = hourly
+
+    assert formatHourlyLoads(FIRST_HOUR, loads, present) == format_loads(records)
+    assert np.stack([hourlyLoadRow(FIRST_HOUR + day * 24, loads[day * 24:(day + 1) * 24],
+                                   present[day * 24:(day + 1) * 24]) for day in range(3)]).tolist() == \
+        dayLoadMatrix(records, [FIRST_ORDINAL, FIRST_ORDINAL + 1, FIRST_ORDINAL + 2]).tolist()
+
+
+def test_columnar_json_keeps_the_loads_of_the_records_format(hourly, monkeypatch):
+    _, _, records = hourly
+    monkeypatch.setattr(loadFormats, "orjson", None)
+
+    body = json.loads(serializeColumnar(["1402-01-01"], dayLoadMatrix(records, [FIRST_ORDINAL])))
+
+    row = format_loads(records)[0]
+    assert body == {"dates": ["1402-01-01"], "loads": [[row[column] for column in HOUR_COLUMNS]]}
+
+
+def test_orjson_and_json_columnar_bodies_agree(hourly, monkeypatch):
+    pytest.importorskip("orjson")
+    _, _, records = hourly
+    dates = ["1402-01-01", "1402-01-02", "1402-01-03"]
+    matrix = dayLoadMatrix(records, [FIRST_ORDINAL, FIRST_ORDINAL + 1, FIRST_ORDINAL + 2])
+
+    with_orjson = serializeColumnar(dates, matrix)
+    monkeypatch.setattr(loadFormats, "orjson", None)
+
+    assert json.loads(with_orjson) == json.loads(serializeColumnar(dates, matrix))
@@ -0,0 +1,52 @@
+import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from pahbar.prediction.services.load.api.realLoad.loadRecords import hourlyRecords, localHours
+from pahbar.prediction.services.load.api.realLoad.tehranTime import TEHRAN_TZ
+
+# 1402/01/01 is 2023-03-21
+FIRST_HOUR = (datetime.date(2023, 3, 21).toordinal() - datetime.date(1970, 1, 1).toordinal()) * 24
+
+
+@pytest.mark.parametrize("value", [
+    datetime.datetime(2023, 3, 21, 5),
+    datetime.datetime(2023, 3, 21, 5, 30, 59),
+    TEHRAN_TZ.localize(datetime.datetime(2023, 3, 21, 5)).astimezone(datetime.timezone.utc),
+    np.datetime64("2023-03-21T05"),
+    "2023-03-21 05:00:00",
+    "2023-03-21T05:00:00",
+    "1402-01-01 05:00:00",
+    "1402/01/01 05:00:00",
+])
+def test_every_representation_maps_to_the_same_local_hour(value):
+    assert localHours([value]).tolist() == [FIRST_HOUR + 5]
+
+
+def test_dates_without_time_are_their_first_hour():
+    assert localHours([datetime.date(2023, 3, 21), "1402-01-01", "2023-03-21"]).tolist() == [FIRST_HOUR] * 3
+
+
+def test_mixed_representations_keep_their_order():
+    values = ["1402-01-02 00:00:00", datetime.datetime(2023, 3, 21, 23), "2023-03-21 01:00:00"]
+    assert localHours(values).tolist() == [FIRST_HOUR + 24, FIRST_HOUR + 23, FIRST_HOUR + 1]
+
+
+def test_malformed_strings_raise():
+    with pytest.raises(ValueError):
+        localHours(["yesterday"])
+
+
+def test_records_without_a_datetime_or_load_are_ignored():
+    records = [
+        SimpleNamespace(datetime=datetime.datetime(2023, 3, 21, 2), load_MWh=10.5, source="interpolated"),
+        SimpleNamespace(datetime=datetime.datetime(2023, 3, 21, 3)),
+        SimpleNamespace(datetime="1402-01-01 04:00:00", load_MWh=7.0),
+    ]
+    hours, loads, sources = hourlyRecords(records)
+
+    assert hours.tolist() == [FIRST_HOUR + 2, FIRST_HOUR + 4]
+    assert loads.tolist() == [10.5, 7.0]
+    assert sources.tolist() == ["interpolated", None]
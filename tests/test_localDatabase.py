@@ -0,0 +1,94 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import MetaData, select
+
+from pahbar.prediction.services.load.api.realLoad.benchmarks.localDatabase import (
+    createLocalDatabase, seedHourlyLoads)
+from pahbar.prediction.services.load.api.realLoad.bulkLoadWriter import REAL_HOURLY_LOAD_TABLE, RealLoadBulkWriter
+from pahbar.prediction.services.load.api.realLoad.dayDigests import DeltaFilter
+from pahbar.prediction.services.load.api.realLoad.dbProvider import useDatabase
+from pahbar.prediction.services.load.api.realLoad.loadRecords import hourlyRecords
+
+# 1402/01/01 is 2023-03-21
+FIRST_HOUR = (datetime.date(2023, 3, 21).toordinal() - datetime.date(1970, 1, 1).toordinal()) * 24
+
+
+def _storedRecords(engine, location: int) -> list:
+    """The rows of a location, as the query classes hand them to the readers."""
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    table = metadata.tables[REAL_HOURLY_LOAD_TABLE]
+    with engine.connect() as connection:
+        return connection.execute(
+            select(table).where(table.c["location"] == location).order_by(table.c["datetime"])).all()
+
+
+def test_seeded_loads_are_read_back_at_their_local_hours(tmp_path):
+    engine = createLocalDatabase(str(tmp_path / "seed.sqlite"))
+    seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, 1, 2 / 365.25, datetime.date(2023, 3, 23))
+
+    hours, loads, sources = hourlyRecords(_storedRecords(engine, 1))
+
+    assert hours.tolist() == list(range(FIRST_HOUR, FIRST_HOUR + 48))
+    assert (loads > 0).all() and set(sources.tolist()) == {"measured"}
+
+
+def test_written_loads_are_stored_like_seeded_ones(tmp_path):
+    engine = createLocalDatabase(str(tmp_path / "write.sqlite"))
+    seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, 0, 0, datetime.date(2023, 3, 23))
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+
+    with RealLoadBulkWriter(engine, metadata) as writer:
+        writer.write(2, pd.DataFrame({
+            "datetime": ["1402-01-01 00:00:00", "1402-01-02 23:00:00"], "load_MWh": [510.25, 620.5],
+            "source": "manual"}))
+
+    hours, loads, _ = hourlyRecords(_storedRecords(engine, 2))
+    assert hours.tolist() == [FIRST_HOUR, FIRST_HOUR + 47]
+    assert loads.tolist() == [510.25, 620.5]
+
+
+def test_replace_source_only_overwrites_rows_of_that_source(tmp_path):
+    engine = createLocalDatabase(str(tmp_path / "replace.sqlite"))
+    seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, 0, 0, datetime.date(2023, 3, 23))
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    with RealLoadBulkWriter(engine, metadata) as writer:
+        writer.write(3, pd.DataFrame({
+            "datetime": ["1402-01-01 00:00:00", "1402-01-01 01:00:00"], "load_MWh": [500.0, 400.0],
+            "source": ["manual", "interpolated"]}))
+
+    with RealLoadBulkWriter(engine, metadata, replace_source="interpolated") as writer:
+        written = writer.writeMask(3, pd.DataFrame({
+            "datetime": ["1402-01-01 00:00:00", "1402-01-01 01:00:00", "1402-01-01 02:00:00"],
+            "load_MWh": [1.0, 2.0, 3.0], "source": "interpolated"}))
+
+    assert written.tolist() == [False, True, True]
+    _, loads, sources = hourlyRecords(_storedRecords(engine, 3))
+    assert loads.tolist() == [500.0, 2.0, 3.0]
+    assert sources.tolist() == ["manual", "interpolated", "interpolated"]
+
+
+def test_delta_filter_reads_the_writer_transaction_over_its_connection(tmp_path):
+    engine = createLocalDatabase(str(tmp_path / "delta.sqlite"))
+    seedHourlyLoads(engine, REAL_HOURLY_LOAD_TABLE, 0, 0, datetime.date(2023, 3, 23))
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    useDatabase(engine, metadata)
+    loads = np.arange(24, dtype=float) + 100.0
+
+    with RealLoadBulkWriter(engine, metadata) as writer:
+        writer.write(4, pd.DataFrame({
+            "datetime": [f"1402-01-01 {hour:02d}:00:00" for hour in range(24)], "load_MWh": loads,
+            "source": "manual"}))
+        delta = DeltaFilter(4, writer.connection)
+        keep = delta(np.array([FIRST_HOUR // 24, FIRST_HOUR // 24 + 1]) + datetime.date(1970, 1, 1).toordinal(),
+                     np.stack([loads, loads]))
+        checked_out = engine.pool.checkedout()
+
+    assert keep.tolist() == [False, True]
+    assert delta.counts() == {"changed": 0, "unchanged": 1, "new": 1}
+    assert checked_out == 1
@@ -0,0 +1,85 @@
+import datetime
+import zoneinfo
+
+import numpy as np
+import pytest
+
+from pahbar.prediction.services.load.api.realLoad import tehranTime
+from pahbar.prediction.services.load.api.realLoad.tehranTime import (
+    TEHRAN_TZ, localDayBounds, probeTransitions, utcOffsets)
+
+
+def _timestamps(first: datetime.date, last: datetime.date, step_minutes: int = 15) -> np.ndarray:
+    start = int(datetime.datetime(first.year, first.month, first.day, tzinfo=datetime.timezone.utc).timestamp())
+    stop = int(datetime.datetime(last.year, last.month, last.day, tzinfo=datetime.timezone.utc).timestamp())
+    return np.arange(start, stop, step_minutes * 60, dtype=np.int64)
+
+
+WINDOWS = {
+    "2021 spring forward": (datetime.date(2021, 3, 19), datetime.date(2021, 3, 25)),
+    "2021 fall back": (datetime.date(2021, 9, 19), datetime.date(2021, 9, 25)),
+    "2022 last fall back": (datetime.date(2022, 9, 19), datetime.date(2022, 9, 25)),
+    "spring 2023, without DST": (datetime.date(2023, 3, 19), datetime.date(2023, 3, 25)),
+    "fall 2024, without DST": (datetime.date(2024, 9, 19), datetime.date(2024, 9, 25)),
+}
+
+
+@pytest.mark.parametrize("first, last", WINDOWS.values(), ids=WINDOWS.keys())
+def test_offsets_and_days_match_fromtimestamp(first, last):
+    timestamps = _timestamps(first, last)
+    local = [datetime.datetime.fromtimestamp(int(ts), TEHRAN_TZ) for ts in timestamps]
+
+    assert utcOffsets(timestamps).tolist() == [int(moment.utcoffset().total_seconds()) for moment in local]
+    ordinals, _, _ = localDayBounds(timestamps)
+    assert ordinals.tolist() == [moment.date().toordinal() for moment in local]
+
+
+@pytest.mark.parametrize("first, last", WINDOWS.values(), ids=WINDOWS.keys())
+def test_day_bounds_are_the_first_and_last_instants_of_each_local_day(first, last):
+    timestamps = _timestamps(first, last, step_minutes=1)
+    ordinals, starts, ends = localDayBounds(timestamps)
+
+    for ordinal in np.unique(ordinals)[1:-1]:
+        in_day = timestamps[ordinals == ordinal]
+        start, end = starts[ordinals == ordinal][0], ends[ordinals == ordinal][0]
+        assert start == in_day.min() and end == in_day.max() + 60
+        assert datetime.datetime.fromtimestamp(int(start), TEHRAN_TZ).date().toordinal() == ordinal
+        assert datetime.datetime.fromtimestamp(int(start) - 1, TEHRAN_TZ).date().toordinal() == ordinal - 1
+        assert datetime.datetime.fromtimestamp(int(end), TEHRAN_TZ).date().toordinal() == ordinal + 1
+
+
+def test_transition_days_are_23_and_25_hours_long_in_2021():
+    spring = datetime.datetime(2021, 3, 22, 12, tzinfo=datetime.timezone.utc).timestamp()
+    fall = datetime.datetime(2021, 9, 21, 12, tzinfo=datetime.timezone.utc).timestamp()
+    _, starts, ends = localDayBounds(np.array([spring, fall], dtype=np.int64))
+
+    assert ((ends - starts) // 3600).tolist() == [23, 25]
+
+
+def test_days_after_september_2022_are_24_hours_at_plus_0330():
+    timestamps = _timestamps(datetime.date(2022, 9, 23), datetime.date(2025, 1, 1), step_minutes=24 * 60)
+    _, starts, ends = localDayBounds(timestamps)
+
+    assert set(utcOffsets(timestamps).tolist()) == {12600}
+    assert set((ends - starts).tolist()) == {86400}
+
+
+def test_probed_transitions_match_pytz_tables():
+    transitions, offsets = probeTransitions(1970, 2030)
+    in_range = (tehranTime._UTC_TRANSITIONS >= transitions[1]) & (tehranTime._UTC_TRANSITIONS <= transitions[-1])
+
+    assert transitions[1:].tolist() == tehranTime._UTC_TRANSITIONS[in_range].tolist()
+    assert offsets[1:].tolist() == tehranTime._UTC_OFFSETS[in_range].tolist()
+
+
+def test_zones_without_pytz_tables_fall_back_to_probing(monkeypatch):
+    # A zoneinfo zone only has the public tzinfo API, as a pytz zone would if its private tables went away
+    monkeypatch.setattr(tehranTime, "TEHRAN_TZ", zoneinfo.ZoneInfo("Asia/Tehran"))
+    monkeypatch.setattr(tehranTime, "_PROBED_YEARS", (2020, 2023))
+
+    transitions, offsets = tehranTime._transitionTables()
+
+    in_range = (tehranTime._UTC_TRANSITIONS >= transitions[1]) & (tehranTime._UTC_TRANSITIONS <= transitions[-1])
+    assert len(transitions) == 7
+    assert transitions[1:].tolist() == tehranTime._UTC_TRANSITIONS[in_range].tolist()
+    assert offsets[1:].tolist() == tehranTime._UTC_OFFSETS[in_range].tolist()
@@ -0,0 +1,106 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from beartype import beartype
+from beartype.typing import Dict, Optional
+from fastapi import Depends
+
+from pahbar.prediction.services.auth.db import UserQueries
+from pahbar.prediction.services.auth.model import User
+from pahbar.prediction.services.auth.utils.get_current_user import get_current_user
+from .dbExecutor import runQuery
+from .dbProvider import getEngine, getMetadata
+from .instrumentation import phase, phaseStart, recordPhase
+
+
+class UserLocationCache:
+    """An in-process TTL/LRU cache of username -> location id. It is thread safe, since it's read from the event
+    loop and written from the DB threads alike.
+
+    Entries are only dropped early by `invalidateUserLocation` in this process. User locations are changed by the
+    auth service, outside of realLoad, so after such a change the old location is served until its entry
+    expires, for up to `ttl_seconds`.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: float = 60.0, enabled: bool = True):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[int]:
+        """Return the cached location of this user, or None on a miss (or when the cache is disabled)."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(username)
+            if entry is None or entry[1] < time.monotonic():
+                self._entries.pop(username, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(username)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, username: str, location: int) -> None:
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[username] = (location, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(username)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: Optional[str] = None) -> None:
+        """Drop the entry of this user, or every entry if no username is given."""
+        with self._lock:
+            if username is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(username, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+USER_LOCATION_CACHE = UserLocationCache(
+    maxsize=int(os.getenv("REALLOAD_USER_LOCATION_CACHE_SIZE", "1024")),
+    ttl_seconds=float(os.getenv("REALLOAD_USER_LOCATION_CACHE_TTL", "60")),
+    enabled=os.getenv("REALLOAD_USER_LOCATION_CACHE", "1") != "0")
+"""Shared by all realLoad routes. A changed user location is picked up within REALLOAD_USER_LOCATION_CACHE_TTL
+seconds (60 by default); set REALLOAD_USER_LOCATION_CACHE to '0' where that's not acceptable, and in tests."""
+
+
+async def getUserLocation(
+        auth_started: float = Depends(phaseStart), user: User = Depends(get_current_user)) -> int:
+    """FastAPI dependency resolving the location of the authenticated user, served from `USER_LOCATION_CACHE`
+    whenever possible. `auth_started` is resolved right before `get_current_user`, to time the authentication."""
+    recordPhase("auth", time.perf_counter() - auth_started)
+
+    location = USER_LOCATION_CACHE.get(user.username)
+    if location is None:
+        user_obj = UserQueries(getEngine(), getMetadata())
+        with phase("user_lookup"):
+            user_db = await runQuery(user_obj.get_user_by_username, user.username)
+        location = user_db.location
+        if location is not None:
+            USER_LOCATION_CACHE.put(user.username, location)
+
+    return location
+
+
+@beartype
+def invalidateUserLocation(username: Optional[str] = None) -> None:
+    """Drop the cached location of a user, or the whole cache with no username, in this process only. Code that
+    changes user locations lives in the auth service and doesn't call this, which is why entries also expire
+    after REALLOAD_USER_LOCATION_CACHE_TTL seconds; call it from any realLoad code path that changes them."""
+    USER_LOCATION_CACHE.invalidate(username)